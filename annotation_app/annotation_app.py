@@ -1,6 +1,7 @@
 import ast
 import json
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 from streamlit_tags import st_tags
@@ -73,6 +74,8 @@ def _to_list(val):
     """Ensure the returned value is a list of strings."""
     if isinstance(val, list):
         return val
+    if isinstance(val, np.ndarray):  # list column read by pandas from Parquet
+        return val.tolist()
     if isinstance(val, str):
         return [v.strip() for v in val.split(",") if v.strip()]
     if val is None or (isinstance(val, float) and pd.isna(val)):
@@ -82,11 +85,14 @@ def _to_list(val):
 
 st.title("CareerFlow JD Annotation Tool")
 
-# Upload CSV
-uploaded_file = st.file_uploader("Upload AI-annotated JD CSV", type=["csv"])
+# Upload CSV, or Parquet output with native nested columns (requires pyarrow)
+uploaded_file = st.file_uploader("Upload AI-annotated JD CSV or Parquet", type=["csv", "parquet"])
 if uploaded_file:
     if "df" not in st.session_state:
-        st.session_state.df = pd.read_csv(uploaded_file)
+        if uploaded_file.name.endswith(".parquet"):
+            st.session_state.df = pd.read_parquet(uploaded_file)
+        else:
+            st.session_state.df = pd.read_csv(uploaded_file)
     df = st.session_state.df
     idx = st.session_state.get("idx", 0)
 
@@ -209,9 +215,9 @@ if uploaded_file:
 
         edu_col1, edu_col2 = st.columns(2)
         with edu_col1:
-            degrees = st.text_input("Degrees", value=edu_data.get("degrees", ""))
+            degrees = st.text_input("Degrees", value=", ".join(_to_list(edu_data.get("degrees", ""))))
         with edu_col2:
-            fields = st.text_input("Fields of study", value=edu_data.get("fields_of_study", ""))
+            fields = st.text_input("Fields of study", value=", ".join(_to_list(edu_data.get("fields_of_study", ""))))
 
         # ---- navigation buttons (auto‑save) ----
         nav_prev, nav_next = st.columns(2)
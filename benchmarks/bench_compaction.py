@@ -0,0 +1,96 @@
+import argparse
+import glob
+import os
+import time
+
+from extractor.compaction import PROTECTED_RE, JobTextCompactor
+from utils.logger import get_logger
+from utils.tokens import estimate_tokens
+
+logger = get_logger(__name__)
+
+
+def load_corpus(jd_dir, n_postings, n_reposts):
+    """
+    Build scraper-style job texts from the sample job descriptions, taking the first line of each sample
+    as its company, together with the company's other postings: `n_postings` variants sharing every line
+    of the sample, each reposted `n_reposts` times.
+
+    Args:
+        jd_dir (str): Directory containing the sample job descriptions.
+        n_postings (int): Number of other postings per company.
+        n_reposts (int): Number of identical reposts of each other posting.
+
+    Returns:
+        tuple: (job texts keyed by sample file name, corpus of the companies' other postings)
+    """
+    samples, history = {}, []
+    for path in sorted(glob.glob(os.path.join(jd_dir, "jd_*_*.txt"))):
+        with open(path, "r", encoding="utf-8") as f:
+            description = f.read().strip()
+        company = description.splitlines()[0].strip()
+        text = f"Company: {company}.\nSalary: Not specified.\n\nDescription:\n{description}"
+        samples[os.path.basename(path)] = text
+        for i in range(n_postings):
+            history += [f"{text}\n\nReference: {company[:3].upper()}-{i}"] * (1 + n_reposts)
+    return samples, history
+
+
+def check_compaction(samples, history, n_rounds):
+    """
+    Check that compacting the same text always gives the same result, that reposts are counted once, and
+    that no requirement or responsibility line is dropped.
+
+    Args:
+        samples (dict): Job texts keyed by name, from `load_corpus`.
+        history (list): Other postings of the samples' companies, from `load_corpus`.
+        n_rounds (int): Number of times each sample is compacted.
+    """
+    compactor = JobTextCompactor()
+    n_postings = compactor.fit(history + list(samples.values()))
+    assert n_postings == len(set(history)) + len(samples), f"Reposts were counted more than once ({n_postings})"
+    for name, text in samples.items():
+        compacted = {compactor.compact(text) for _ in range(n_rounds)}
+        assert len(compacted) == 1, f"{name} compacts to {sorted(len(c) for c in compacted)} characters"
+        kept = set(compacted.pop().splitlines())
+        dropped = [line for line in text.splitlines() if line.strip() and line not in kept]
+        lost = [line for line in dropped if PROTECTED_RE.search(line)]
+        assert not lost, f"{name} lost protected lines: {lost}"
+        logger.info(f"{name:15} | {len(dropped)} lines dropped, identical over {n_rounds} compactions")
+    logger.info(f"Text compaction: {compactor.summary()}")
+
+
+def run_benchmark(samples, history, min_time):
+    """
+    Report `fit` and `compact` throughput.
+    """
+    start = time.perf_counter()
+    JobTextCompactor().fit(history)
+    logger.info(f"fit     | {len(history) / (time.perf_counter() - start):10.1f} postings/s")
+
+    compactor = JobTextCompactor()
+    compactor.fit(history)
+    texts = list(samples.values())
+    n_docs = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        for text in texts:
+            compactor.compact(text)
+        n_docs += len(texts)
+    elapsed = time.perf_counter() - start
+    tokens = sum(estimate_tokens(text) for text in texts) * n_docs / len(texts)
+    logger.info(f"compact | {n_docs / elapsed:10.1f} descriptions/s ({tokens / elapsed:.0f} tokens/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and benchmark job text compaction")
+    parser.add_argument("--jd-dir", type=str, default="examples/jds")
+    parser.add_argument("--postings", type=int, default=5, help="Other postings per sample's company")
+    parser.add_argument("--reposts", type=int, default=2, help="Identical reposts of each other posting")
+    parser.add_argument("--rounds", type=int, default=5, help="Compactions of each sample checked for equality")
+    parser.add_argument("--min-time", type=float, default=2.0, help="Seconds spent measuring compaction")
+    args = parser.parse_args()
+
+    samples, history = load_corpus(args.jd_dir, args.postings, args.reposts)
+    check_compaction(samples, history, args.rounds)
+    run_benchmark(samples, history, args.min_time)
@@ -0,0 +1,100 @@
+import argparse
+import glob
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from utils.html_utils import html_to_text, parse_html_to_text
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CONVERTERS = {"parse_html_to_text": parse_html_to_text, "html_to_text": html_to_text}
+
+
+def load_corpus(fixture_dir):
+    """
+    Load golden description fixtures.
+
+    Args:
+        fixture_dir (str): Directory containing `<name>.html` descriptions and their expected `<name>.txt` text.
+
+    Returns:
+        dict[str, tuple]: (description node, expected text or None) keyed by fixture name.
+    """
+    corpus = {}
+    for html_path in sorted(glob.glob(os.path.join(fixture_dir, "*.html"))):
+        name = os.path.splitext(os.path.basename(html_path))[0]
+        with open(html_path, "r", encoding="utf-8") as f:
+            soup = BeautifulSoup(f.read(), "html.parser")
+        node = soup.find("div", {"class": "show-more-less-html__markup"})
+        txt_path = os.path.splitext(html_path)[0] + ".txt"
+        expected = None
+        if os.path.exists(txt_path):
+            with open(txt_path, "r", encoding="utf-8") as f:
+                expected = f.read()
+        corpus[name] = (node, expected)
+    return corpus
+
+
+def check_golden(corpus, fixture_dir, update=False):
+    """
+    Check every converter against the golden texts, or rewrite them from `parse_html_to_text`.
+
+    Args:
+        corpus (dict): Output of `load_corpus`.
+        fixture_dir (str): Directory the corpus was loaded from.
+        update (bool): If True, regenerate the `.txt` files instead of checking them.
+    """
+    for name, (node, expected) in corpus.items():
+        if expected is None and not update:
+            raise FileNotFoundError(
+                f"Missing golden text {name}.txt in {fixture_dir}; generate it with --update-golden"
+            )
+        if update:
+            expected = parse_html_to_text(node)
+            with open(os.path.join(fixture_dir, f"{name}.txt"), "w", encoding="utf-8") as f:
+                f.write(expected)
+        for converter_name, convert in CONVERTERS.items():
+            assert convert(node) == expected, f"{converter_name} output differs from golden text on {name}"
+    logger.info(f"All converters match the golden text on {len(corpus)} fixtures")
+
+
+def run_benchmark(corpus, min_time, repeat):
+    """
+    Report throughput of each converter on the corpus, with each description's content repeated
+    `repeat` times to mimic long postings.
+
+    Args:
+        corpus (dict): Output of `load_corpus`.
+        min_time (float): Minimum measured time per converter, in seconds.
+        repeat (int): Number of times each description body is repeated.
+    """
+    nodes = []
+    for node, _ in corpus.values():
+        markup = "".join(str(child) for child in node.children) * repeat
+        nodes.append(BeautifulSoup(f"<div>{markup}</div>", "html.parser").div)
+
+    for converter_name, convert in CONVERTERS.items():
+        n_docs = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < min_time:
+            for node in nodes:
+                convert(node)
+            n_docs += len(nodes)
+        elapsed = time.perf_counter() - start
+        logger.info(f"{converter_name:20} | {n_docs / elapsed:10.1f} descriptions/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and benchmark HTML-to-text converters")
+    parser.add_argument("--fixture-dir", type=str, default="benchmarks/fixtures/descriptions")
+    parser.add_argument("--update-golden", action="store_true", help="Regenerate golden texts from parse_html_to_text")
+    parser.add_argument("--min-time", type=float, default=2.0, help="Seconds spent measuring each converter")
+    parser.add_argument("--repeat", type=int, default=20, help="Times each description body is repeated")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.fixture_dir)
+    check_golden(corpus, args.fixture_dir, update=args.update_golden)
+    run_benchmark(corpus, args.min_time, args.repeat)
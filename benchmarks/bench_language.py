@@ -0,0 +1,78 @@
+import argparse
+import glob
+import os
+import time
+
+from extractor.language import detect_language
+from utils.logger import get_logger
+from utils.tokens import estimate_tokens
+
+logger = get_logger(__name__)
+
+
+def load_corpus(jd_dir):
+    """
+    Load sample job descriptions, labelled by the language in their file name (`jd_<lang>_<n>.txt`).
+
+    Args:
+        jd_dir (str): Directory containing the sample job descriptions.
+
+    Returns:
+        dict[str, tuple]: (expected language, text) keyed by file name.
+    """
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(jd_dir, "jd_*_*.txt"))):
+        name = os.path.basename(path)
+        with open(path, "r", encoding="utf-8") as f:
+            corpus[name] = (name.split("_")[1], f.read())
+    return corpus
+
+
+def check_accuracy(corpus):
+    """
+    Log the detected language of every sample and the overall accuracy.
+    """
+    correct = 0
+    for name, (expected, text) in corpus.items():
+        detected = detect_language(text)
+        correct += detected == expected
+        logger.info(f"{name:20} | expected {expected} | detected {detected}")
+    logger.info(f"Accuracy: {correct}/{len(corpus)}")
+
+
+def estimate_savings(corpus):
+    """
+    Log the translation tokens saved by only translating non-English samples, counting each translated
+    job twice (input and output).
+    """
+    total = sum(2 * estimate_tokens(text) for _, text in corpus.values())
+    routed = sum(2 * estimate_tokens(text) for _, text in corpus.values() if detect_language(text) != "en")
+    saved = total - routed
+    logger.info(f"Translation tokens: {total} when translating all, {routed} when routing ({saved} saved)")
+
+
+def run_benchmark(corpus, min_time):
+    """
+    Report language detection throughput on the corpus.
+    """
+    texts = [text for _, text in corpus.values()]
+    n_docs = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        for text in texts:
+            detect_language(text)
+        n_docs += len(texts)
+    elapsed = time.perf_counter() - start
+    logger.info(f"detect_language | {n_docs / elapsed:10.1f} descriptions/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and benchmark offline language detection")
+    parser.add_argument("--jd-dir", type=str, default="examples/jds")
+    parser.add_argument("--min-time", type=float, default=2.0, help="Seconds spent measuring detection")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.jd_dir)
+    check_accuracy(corpus)
+    estimate_savings(corpus)
+    run_benchmark(corpus, args.min_time)
@@ -0,0 +1,247 @@
+import argparse
+import glob
+import os
+import re
+import resource
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+import requests
+
+from main import run_scraping_pipeline
+from scraper.http_client import HttpClient
+from utils.llm_loader import get_llm
+from utils.logger import get_logger
+from utils.metrics import Metrics
+from utils.rate_limiter import HostRateLimiter
+from utils.replay import (
+    ReplayAdapter,
+    ReplayChatModel,
+    load_run_options,
+    save_http_fixture,
+)
+from utils.stats import percentile
+
+logger = get_logger(__name__)
+
+SEARCH_URL = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search?keywords={}&location={}&start={}"
+POSTING_URL = "https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{}"
+# Options saved with recorded fixtures that the benchmark's own arguments cover; the others are passed through
+BENCHMARK_OPTIONS = ("title", "location", "max_pages", "batch_size", "token_budget", "near_duplicate_threshold")
+POSTING_TEMPLATE = (
+    '<html><body><a class="topcard__org-name-link">{company}</a><div class="salary">{salary}</div>'
+    "{description}</body></html>"
+)
+
+
+def _prepared_url(url):
+    # Fixtures are keyed by the URL requests actually sends, i.e. with spaces percent-encoded
+    return requests.Request("GET", url).prepare().url
+
+
+def synthesize_fixtures(fixture_dir, title, location, n_jobs, page_size=10, source_dir="benchmarks/fixtures"):
+    """
+    Build HTTP fixtures for `n_jobs` synthetic postings from the committed search-page and description fixtures.
+
+    Search pages reuse the job cards of `search_pages/paris_ml_page_0.html` with fresh job IDs, and postings
+    cycle through the `descriptions/*.html` bodies, each description posted by one company. The page after the last job is empty, so pagination stops.
+
+    Args:
+        fixture_dir (str): Fixture root directory to write into.
+        title (str): Job title searched.
+        location (str): Location searched.
+        n_jobs (int): Number of synthetic jobs.
+        page_size (int): Number of results per search page.
+        source_dir (str): Directory holding the `search_pages` and `descriptions` fixtures.
+    """
+    with open(os.path.join(source_dir, "search_pages", "paris_ml_page_0.html"), "r", encoding="utf-8") as f:
+        card = f.read().split("<li>")[1]
+    descriptions = []
+    for path in sorted(glob.glob(os.path.join(source_dir, "descriptions", "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            descriptions.append(f.read())
+
+    job_ids = [str(4_000_000_000 + i) for i in range(n_jobs)]
+    for start in range(0, n_jobs + page_size, page_size):
+        page_ids = job_ids[start : start + page_size]
+        body = "".join("<li>" + re.sub(r"jobPosting:\d+", f"jobPosting:{job_id}", card) for job_id in page_ids)
+        save_http_fixture(fixture_dir, _prepared_url(SEARCH_URL.format(title, location, start)), 200, body)
+    for i, job_id in enumerate(job_ids):
+        body = POSTING_TEMPLATE.format(
+            company=f"Company {i % len(descriptions)}",
+            salary=f"€{40 + i % 50}k/yr",
+            description=descriptions[i % len(descriptions)],
+        )
+        save_http_fixture(fixture_dir, _prepared_url(POSTING_URL.format(job_id)), 200, body)
+
+
+def run_benchmark(args, work_dir):
+    """
+    Run the full pipeline against replayed fixtures and log throughput, latency and memory figures.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+        work_dir (str): Scratch directory for caches and output.
+    """
+    http_client = HttpClient(
+        rate_limiter=HostRateLimiter(args.requests_per_second),
+        pool_size=max(10, args.max_workers),
+        backoff_base=args.backoff_base,
+    )
+    http_client.mount(
+        ReplayAdapter(
+            args.fixture_dir,
+            latency=args.http_latency,
+            latency_jitter=args.http_jitter,
+            error_rate=args.http_error_rate,
+            throttle_rate=args.http_throttle_rate,
+            seed=args.seed,
+        )
+    )
+    if args.llm_backend == "simulated":
+        llm = get_llm(
+            "simulated",
+            latency=args.llm_latency,
+            latency_sigma=args.llm_jitter / args.llm_latency if args.llm_latency else 0.0,
+            tokens_per_second=args.llm_tokens_per_second,
+            requests_per_minute=args.llm_server_rpm or None,
+            tokens_per_minute=args.llm_server_tpm or None,
+            throttle_rate=args.llm_throttle_rate,
+            malformed_rate=args.llm_malformed_rate,
+            seed=args.seed,
+        )
+    else:
+        llm = ReplayChatModel(
+            fixture_dir=args.fixture_dir,
+            latency=args.llm_latency,
+            latency_jitter=args.llm_jitter,
+            error_rate=args.llm_error_rate,
+            seed=args.seed,
+            synthesize_missing=args.synthesize_llm,
+        )
+    out_csv = os.path.join(work_dir, "jobs.csv")
+    metrics = Metrics() if args.profile else None
+    # Replayed completions only match prompts batched the way the recording batched them
+    run_options = {} if args.synthesize else load_run_options(args.fixture_dir)
+    for name in BENCHMARK_OPTIONS:
+        if name in run_options and getattr(args, name) != run_options[name]:
+            logger.info(f"Using the recorded {name}={run_options[name]!r} instead of {getattr(args, name)!r}")
+            setattr(args, name, run_options[name])
+    pipeline_options = {name: value for name, value in run_options.items() if name not in BENCHMARK_OPTIONS}
+    # Hits within a run depend on which concurrent batches complete first, which changes the replayed prompts
+    replay_recorded = args.llm_backend == "replay" and not args.synthesize_llm
+    if replay_recorded:
+        logger.info("Near-duplicate reuse and the extraction cache are off when replaying recorded completions")
+        args.near_duplicate_threshold = 0
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    run_scraping_pipeline(
+        title=args.title,
+        location=args.location,
+        max_pages=args.max_pages,
+        batch_size=args.batch_size,
+        prompt_dir=args.prompt_dir,
+        out_csv=out_csv,
+        raw_cache_path=os.path.join(work_dir, "raw_job_texts.sqlite"),
+        structured_cache_path=os.path.join(work_dir, "job_cache.sqlite"),
+        max_workers=args.max_workers,
+        requests_per_second=args.requests_per_second,
+        queue_depth=args.queue_depth,
+        llm=llm,
+        llm_concurrency=args.llm_concurrency,
+        token_budget=args.token_budget or None,
+        extraction_cache_path=None if replay_recorded else os.path.join(work_dir, "extractions.sqlite"),
+        near_duplicate_path=os.path.join(work_dir, "near_duplicates.sqlite") if args.near_duplicate_threshold else None,
+        near_duplicate_threshold=args.near_duplicate_threshold,
+        http_client=http_client,
+        metrics=metrics,
+        **pipeline_options,
+    )
+    elapsed = time.perf_counter() - start
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    n_jobs = len(pd.read_csv(out_csv)) if os.path.getsize(out_csv) > 1 else 0
+    http_stats = http_client.stats.summary()
+    # ru_maxrss is reported in kilobytes on Linux
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    logger.info(f"Jobs extracted     | {n_jobs} in {elapsed:.2f}s ({n_jobs / elapsed:.2f} jobs/s)")
+    logger.info(
+        f"HTTP               | {http_stats['requests']} requests, {http_stats['retries']} retries, "
+        f"p50 {http_stats['latency_p50'] * 1000:.1f} ms, p95 {http_stats['latency_p95'] * 1000:.1f} ms"
+    )
+    logger.info(
+        f"LLM                | {len(llm.latencies)} calls, p50 {percentile(llm.latencies, 0.5) * 1000:.1f} ms, "
+        f"p95 {percentile(llm.latencies, 0.95) * 1000:.1f} ms"
+    )
+    if metrics is not None:
+        metrics.observe("stage_total", elapsed)
+        metrics.write_json(args.profile)
+        logger.info(f"Profile            | saved to {args.profile}")
+    logger.info(f"Memory             | peak traced {peak_traced / 2**20:.1f} MB, max RSS {max_rss_mb:.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the full pipeline offline against recorded fixtures")
+    parser.add_argument("--fixture-dir", type=str, help="Fixtures recorded with `main.py --record-fixtures`")
+    parser.add_argument(
+        "--synthesize", type=int, default=0, help="Generate HTTP fixtures for this many synthetic jobs instead"
+    )
+    parser.add_argument("--title", type=str, default="data scientist")
+    parser.add_argument("--location", type=str, default="Paris")
+    parser.add_argument("--max-pages", type=int, default=100, help="Result offset at which pagination stops")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--token-budget", type=int, default=12000)
+    parser.add_argument("--prompt-dir", type=str, default="extractor/prompts")
+    parser.add_argument("--max-workers", type=int, default=4)
+    parser.add_argument("--requests-per-second", type=float, default=1000.0)
+    parser.add_argument("--queue-depth", type=int, default=4)
+    parser.add_argument("--http-latency", type=float, default=0.05, help="Mean simulated HTTP latency (s)")
+    parser.add_argument("--http-jitter", type=float, default=0.01, help="Std of the simulated HTTP latency (s)")
+    parser.add_argument("--http-error-rate", type=float, default=0.0, help="Probability of a 503 response")
+    parser.add_argument("--http-throttle-rate", type=float, default=0.0, help="Probability of a 429 response")
+    parser.add_argument("--backoff-base", type=float, default=0.05, help="Base retry backoff (s)")
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    parser.add_argument(
+        "--llm-backend",
+        choices=["replay", "simulated"],
+        default="replay",
+        help="Replay recorded completions, or simulate an API answering with fake extractions",
+    )
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Mean simulated LLM latency (s)")
+    parser.add_argument("--llm-jitter", type=float, default=0.1, help="Std of the simulated LLM latency (s)")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Probability of a failed LLM call (replay)")
+    parser.add_argument(
+        "--llm-tokens-per-second", type=float, default=150.0, help="Simulated generation speed (simulated)"
+    )
+    parser.add_argument("--llm-throttle-rate", type=float, default=0.0, help="Probability of a 429 (simulated)")
+    parser.add_argument(
+        "--llm-malformed-rate", type=float, default=0.0, help="Probability of a truncated completion (simulated)"
+    )
+    parser.add_argument("--llm-server-rpm", type=float, default=0, help="Simulated requests-per-minute quota (0: none)")
+    parser.add_argument("--llm-server-tpm", type=float, default=0, help="Simulated tokens-per-minute quota (0: none)")
+    parser.add_argument(
+        "--synthesize-llm",
+        action="store_true",
+        help="Answer prompts without a recorded completion with empty extractions",
+    )
+    parser.add_argument(
+        "--near-duplicate-threshold", type=float, default=None, help="Enables near-duplicate reuse (e.g. 0.9)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile", type=str, metavar="PATH", help="Save per-stage counters and timers as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        if args.synthesize:
+            args.fixture_dir = os.path.join(work_dir, "fixtures")
+            args.synthesize_llm = True
+            args.max_pages = max(args.max_pages, args.synthesize + 10)
+            synthesize_fixtures(args.fixture_dir, args.title, args.location, args.synthesize)
+        elif not args.fixture_dir:
+            parser.error("either --fixture-dir or --synthesize is required")
+        run_benchmark(args, work_dir)
@@ -0,0 +1,88 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+from scraper.search_parsers import SEARCH_PARSERS, parse_job_ids_bs4
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def load_fixtures(fixture_dir):
+    """
+    Load saved search-result pages and their golden job IDs.
+
+    Args:
+        fixture_dir (str): Directory containing `<name>.html` search pages and their expected `<name>.json` IDs.
+
+    Returns:
+        dict[str, tuple]: (page HTML, expected job IDs or None) keyed by file name.
+    """
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(fixture_dir, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+        ids_path = os.path.splitext(path)[0] + ".json"
+        expected = None
+        if os.path.exists(ids_path):
+            with open(ids_path, "r", encoding="utf-8") as f:
+                expected = json.load(f)
+        pages[os.path.basename(path)] = (html, expected)
+    return pages
+
+
+def check_golden(pages, fixture_dir, update=False):
+    """
+    Check every backend against the golden job IDs, or rewrite them from `parse_job_ids_bs4`.
+
+    Args:
+        pages (dict): Output of `load_fixtures`.
+        fixture_dir (str): Directory the pages were loaded from.
+        update (bool): If True, regenerate the `.json` files instead of checking them.
+    """
+    for page_name, (html, expected) in pages.items():
+        name = os.path.splitext(page_name)[0]
+        if expected is None and not update:
+            raise FileNotFoundError(
+                f"Missing golden IDs {name}.json in {fixture_dir}; generate them with --update-golden"
+            )
+        if update:
+            expected = parse_job_ids_bs4(html)
+            with open(os.path.join(fixture_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+                json.dump(expected, f, indent=2)
+        for backend, parse in SEARCH_PARSERS.items():
+            assert parse(html) == expected, f"Backend '{backend}' differs from the golden IDs on {page_name}"
+    logger.info(f"All {len(SEARCH_PARSERS)} backends match the golden IDs on {len(pages)} fixtures")
+
+
+def run_benchmark(pages, min_time):
+    """
+    Report pages/second of every backend.
+
+    Args:
+        pages (dict): Output of `load_fixtures`.
+        min_time (float): Minimum measured time per backend, in seconds.
+    """
+    for name, parse in SEARCH_PARSERS.items():
+        n_pages = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < min_time:
+            for html, _ in pages.values():
+                parse(html)
+            n_pages += len(pages)
+        elapsed = time.perf_counter() - start
+        logger.info(f"{name:10} | {n_pages / elapsed:10.1f} pages/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark search-result ID extraction backends")
+    parser.add_argument("--fixture-dir", type=str, default="benchmarks/fixtures/search_pages")
+    parser.add_argument("--update-golden", action="store_true", help="Regenerate golden IDs from parse_job_ids_bs4")
+    parser.add_argument("--min-time", type=float, default=2.0, help="Seconds spent measuring each backend")
+    args = parser.parse_args()
+    pages = load_fixtures(args.fixture_dir)
+    assert pages, f"No fixtures found in {args.fixture_dir}"
+    check_golden(pages, args.fixture_dir, update=args.update_golden)
+    run_benchmark(pages, args.min_time)
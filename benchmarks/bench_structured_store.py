@@ -0,0 +1,87 @@
+import argparse
+import copy
+import os
+import tempfile
+import time
+
+from extractor.structured_store import StructuredStore
+from utils.llm_backends import EMPTY_EXTRACTION
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def make_results(n_jobs):
+    """
+    Build `n_jobs` synthetic structured results with distinct job IDs.
+    """
+    results = []
+    for i in range(n_jobs):
+        structured = copy.deepcopy(EMPTY_EXTRACTION)
+        structured.update(job_id=str(4_000_000_000 + i), title=f"Data Scientist {i}")
+        results.append(structured)
+    return results
+
+
+def bench_store(results, batch_size, work_dir):
+    """
+    Log the time to fill a StructuredStore batch by batch and to look every job up again, batch by batch.
+    """
+    store = StructuredStore(os.path.join(work_dir, "job_cache.sqlite"))
+    start = time.perf_counter()
+    for i in range(0, len(results), batch_size):
+        store.put_many(results[i : i + batch_size])
+    write = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found = 0
+    for i in range(0, len(results), batch_size):
+        found += len(store.get_many(structured["job_id"] for structured in results[i : i + batch_size]))
+    read = time.perf_counter() - start
+    n_batches = max(1, len(results) // batch_size)
+    logger.info(
+        f"StructuredStore | {len(results)} jobs | write {write:.2f}s | lookups {read:.2f}s "
+        f"({1000 * read / n_batches:.3f} ms per batch of {batch_size}, {found} found)"
+    )
+    store.close()
+
+
+def bench_tinydb(results, batch_size, work_dir):
+    """
+    Same measurements with the former TinyDB cache (one scan per lookup, one file rewrite per insert).
+    """
+    try:
+        from tinydb import Query, TinyDB
+    except ImportError:
+        logger.info("TinyDB is not installed; skipping the comparison")
+        return
+    db = TinyDB(os.path.join(work_dir, "job_cache.json"))
+    query = Query()
+    start = time.perf_counter()
+    for structured in results:
+        db.insert(structured)
+    write = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found = sum(db.contains(query.job_id == structured["job_id"]) for structured in results)
+    read = time.perf_counter() - start
+    n_batches = max(1, len(results) // batch_size)
+    logger.info(
+        f"TinyDB          | {len(results)} jobs | write {write:.2f}s | lookups {read:.2f}s "
+        f"({1000 * read / n_batches:.3f} ms per batch of {batch_size}, {found} found)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the structured result cache")
+    parser.add_argument("--jobs", type=int, default=100_000, help="Number of cached jobs")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument(
+        "--tinydb-jobs", type=int, default=500, help="Number of jobs for the TinyDB comparison (0 to skip)"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        bench_store(make_results(args.jobs), args.batch_size, work_dir)
+        if args.tinydb_jobs:
+            bench_tinydb(make_results(args.tinydb_jobs), args.batch_size, work_dir)
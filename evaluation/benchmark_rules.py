@@ -0,0 +1,148 @@
+import argparse
+import json
+import time
+
+from evaluation.evaluate import load_data
+from evaluation.jd_evaluator import JDExtractionEvaluator
+from extractor.batch_planner import BatchPlanner
+from extractor.jd_extractor import JDExtractor
+from extractor.rules import RULE_FIELDS, RuleExtractor
+from utils.llm_loader import get_llm, get_rate_limits, parse_llm_options
+from utils.logger import get_logger
+from utils.tokens import estimate_tokens
+
+logger = get_logger(__name__)
+
+# Leaf fields filled by the rules, as evaluated
+RULE_EVAL_FIELDS = [
+    "salary.min",
+    "salary.max",
+    "salary.currency",
+    "required_experience.years.min",
+    "required_experience.years.max",
+    "skills.required_languages",
+    "employment_type",
+]
+
+
+def _as_strings(value):
+    """
+    Copy of an extraction with every leaf as a string, since `FieldMetric` compares lowercased strings
+    and the rules (like the ground truth) give salaries and years as numbers.
+    """
+    if isinstance(value, dict):
+        return {key: _as_strings(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_as_strings(item) for item in value]
+    return value if isinstance(value, str) else str(value)
+
+
+def run_rules(jd_texts):
+    """
+    Extract the rule fields of every job description.
+
+    Returns:
+        tuple: Predictions, per-field confidences and elapsed seconds.
+    """
+    rules = RuleExtractor()
+    predictions, confidences = [], []
+    start = time.perf_counter()
+    for text in jd_texts:
+        fields, confidence = rules.extract(text)
+        predictions.append(fields)
+        confidences.append(confidence)
+    return predictions, confidences, time.perf_counter() - start
+
+
+def run_llm(jd_texts, prompt_dir, llm_model, llm_options, batch_size, max_concurrency):
+    """
+    Extract every job description with the full LLM prompts.
+
+    Returns:
+        tuple: Predictions (empty dicts for failed jobs) and elapsed seconds.
+    """
+    requests_per_minute, tokens_per_minute = get_rate_limits(llm_model)
+    extractor = JDExtractor(
+        prompt_dir=prompt_dir,
+        llm=get_llm(llm_model, **(llm_options or {})),
+        max_concurrency=max_concurrency,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+    )
+    planner = BatchPlanner.for_extractor(extractor, max_jobs=batch_size)
+    predictions = []
+    start = time.perf_counter()
+    for batch_predictions in extractor.extract_many(planner.plan(jd_texts)):
+        predictions.extend(prediction if prediction is not None else {} for prediction in batch_predictions)
+    return predictions, time.perf_counter() - start
+
+
+def compare_rules(
+    input_csv, prompt_dir, llm_model, batch_size=5, max_concurrency=4, llm_options=None, min_confidence=0.7
+):
+    """
+    Score rule-based and LLM extraction of the rule fields against the ground truth, and log the
+    accuracy, latency and output-token trade-off.
+
+    Args:
+        input_csv (str): CSV file with `raw_job_text` and ground-truth columns.
+        prompt_dir (str): Directory with prompt templates.
+        llm_model (str): LLM model name, or None to score the rules only.
+        batch_size (int): Maximum number of job descriptions per LLM batch.
+        max_concurrency (int): Maximum number of batches sent to the LLM concurrently.
+        llm_options (Optional[dict]): Keyword arguments passed to the LLM backend.
+        min_confidence (float): Confidence under which rule fields are reported as low-confidence.
+    """
+    jd_texts, ground_truths = load_data(input_csv)
+    ground_truths = [_as_strings(ground_truth) for ground_truth in ground_truths]
+    evaluator = JDExtractionEvaluator(fields=RULE_EVAL_FIELDS)
+
+    rule_predictions, confidences, rule_seconds = run_rules(jd_texts)
+    scores = {"rules": evaluator.evaluate_batch(ground_truths, _as_strings(rule_predictions))}
+    timings = {"rules": rule_seconds}
+    if llm_model:
+        llm_predictions, llm_seconds = run_llm(
+            jd_texts, prompt_dir, llm_model, llm_options, batch_size, max_concurrency
+        )
+        scores["llm"] = evaluator.evaluate_batch(ground_truths, _as_strings(llm_predictions))
+        timings["llm"] = llm_seconds
+
+    logger.info(f"Rule fields on {len(jd_texts)} job descriptions (F1)")
+    for field in RULE_EVAL_FIELDS:
+        logger.info(f"{field:30} | " + " | ".join(f"{name}: {scores[name][field]['f1']:.3f}" for name in scores))
+    for name, seconds in timings.items():
+        logger.info(f"{name:30} | {seconds:.3f}s ({1000 * seconds / max(1, len(jd_texts)):.2f} ms/job)")
+
+    for field in RULE_FIELDS:
+        values = [confidence[field] for confidence in confidences]
+        low = sum(value < min_confidence for value in values)
+        logger.info(
+            f"Confidence {field:25} | mean {sum(values) / max(1, len(values)):.2f} | "
+            f"{low} jobs below {min_confidence}"
+        )
+    # Output tokens the LLM no longer generates when these fields come from the rules
+    saved = sum(estimate_tokens(json.dumps(fields, ensure_ascii=False)) for fields in rule_predictions)
+    logger.info(f"Output tokens moved to rules: ~{saved} ({saved / max(1, len(jd_texts)):.0f} per job)")
+    return scores, timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare rule-based and LLM extraction of the mechanical fields")
+    parser.add_argument("--input-csv", type=str, required=True, help="CSV file with raw_job_text and ground truth")
+    parser.add_argument("--prompt-dir", type=str, default="extractor/prompts", help="Directory with prompt templates")
+    parser.add_argument("--llm", type=str, default="gemini-2.0-flash", help="LLM model name ('' to score rules only)")
+    parser.add_argument("--llm-option", action="append", metavar="KEY=VALUE", help="Option passed to the LLM backend")
+    parser.add_argument("--batch-size", type=int, default=5, help="Maximum number of job descriptions per batch")
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    parser.add_argument("--min-confidence", type=float, default=0.7)
+    args = parser.parse_args()
+
+    compare_rules(
+        args.input_csv,
+        args.prompt_dir,
+        args.llm,
+        batch_size=args.batch_size,
+        max_concurrency=args.max_concurrency,
+        llm_options=parse_llm_options(args.llm_option),
+        min_confidence=args.min_confidence,
+    )
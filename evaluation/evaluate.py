@@ -1,26 +1,36 @@
 import argparse
 import ast
+import os
+import time
 
 import pandas as pd
 
 from evaluation.jd_evaluator import JDExtractionEvaluator
+from extractor.batch_planner import BatchPlanner
 from extractor.jd_extractor import JDExtractor
-from utils.llm_loader import get_llm
+from utils.llm_loader import get_llm, get_rate_limits, parse_llm_options
 from utils.logger import get_logger
+from utils.output_sink import read_parquet_table
 
 logger = get_logger(__name__)
 
 
 def load_data(csv_path):
     """
-    Load job descriptions and ground truth data from CSV.
+    Load job descriptions and ground truth data from CSV, or from a Parquet output of `main.py`.
 
     Args:
-        csv_path (str): Path to the input CSV file.
+        csv_path (str): Path to the input CSV or Parquet file.
 
     Returns:
         tuple: A list of job description texts and a list of corresponding ground truth dictionaries.
     """
+    if csv_path.endswith(".parquet"):
+        # Nested columns are native structs and lists: one vectorized read, no per-cell parsing
+        table = read_parquet_table(csv_path)
+        assert "raw_job_text" in table.column_names, "Parquet file must contain a 'raw_job_text' column"
+        return table.column("raw_job_text").to_pylist(), table.drop_columns(["raw_job_text"]).to_pylist()
+
     df = pd.read_csv(csv_path)
     assert "raw_job_text" in df.columns, "CSV must contain a 'raw_job_text' column"
 
@@ -34,7 +44,20 @@ def load_data(csv_path):
 
 
 def evaluate_predictions(
-    input_csv, prompt_dir, llm_model, fields, batch_size, save_output=False, output_csv="evaluation_output.csv"
+    input_csv,
+    prompt_dir,
+    llm_model,
+    fields,
+    batch_size,
+    save_output=False,
+    output_csv="evaluation_output.csv",
+    max_concurrency=1,
+    requests_per_minute=None,
+    tokens_per_minute=None,
+    token_budget=None,
+    llm_options=None,
+    use_rules=False,
+    output_formats=("json",),
 ):
     """
     Runs job description extraction and evaluation.
@@ -48,44 +71,94 @@ def evaluate_predictions(
         prompt_dir (str): Path to the directory containing prompt templates.
         llm_model (str): The identifier for the language model to use.
         fields (List[str]): List of field paths to evaluate (e.g., 'title', 'skills.hard_skills').
-        batch_size (int): Number of job descriptions to process per batch.
+        batch_size (int): Maximum number of job descriptions per batch.
         save_output (bool): Whether to save extracted predictions to CSV.
         output_csv (str): Path to save extracted predictions.
+        max_concurrency (int): Maximum number of batches sent to the LLM concurrently.
+        requests_per_minute (Optional[float]): LLM request budget. Defaults to the model's quota; 0 disables it.
+        tokens_per_minute (Optional[float]): LLM token budget. Defaults to the model's quota; 0 disables it.
+        token_budget (Optional[int]): Maximum estimated input + output tokens per batch, None to batch by count only.
+        llm_options (Optional[dict]): Keyword arguments passed to the LLM backend.
+        use_rules (bool): Whether to extract the mechanical fields with rules and the rest with the slim prompts.
+        output_formats (Sequence[str]): Batch output formats to evaluate ("json", "compact"); with several, their
+            F1, output tokens and latency per job are compared.
+
+    Returns:
+        dict: Per output format, the field metrics, batch output tokens per job and seconds per job.
     """
     logger.info("Loading data...")
     jd_texts, ground_truths = load_data(input_csv)
 
-    logger.info(f"Extracting predictions from {len(jd_texts)} job descriptions...")
-    llm = get_llm(llm_model)
-    extractor = JDExtractor(prompt_dir=prompt_dir, llm=llm)
-
-    predictions = []
-    for i in range(0, len(jd_texts), batch_size):
-        batch = jd_texts[i : i + batch_size]
-        logger.info(f"Processing batch {i // batch_size + 1}: jobs {i} to {i + len(batch) - 1}")
-        batch_predictions = extractor.extract(batch)
-        predictions.extend(batch_predictions)
-
-    logger.info("Running evaluation...")
+    requests_per_minute, tokens_per_minute = get_rate_limits(llm_model, requests_per_minute, tokens_per_minute)
     evaluator = JDExtractionEvaluator(fields=fields)
-    metrics = evaluator.evaluate_batch(ground_truths, predictions)
-    logger.info("\nEvaluation Metrics:")
-    for field, score in metrics.items():
-        logger.info(
-            f"{field:25} | Precision: {score['precision']:.3f} | Recall: {score['recall']:.3f} | "
-            f"F1: {score['f1']:.3f}"
+    results = {}
+    for output_format in output_formats:
+        logger.info(f"Extracting predictions from {len(jd_texts)} job descriptions ({output_format} output)...")
+        extractor = JDExtractor(
+            prompt_dir=prompt_dir,
+            llm=get_llm(llm_model, **(llm_options or {})),
+            max_concurrency=max_concurrency,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            use_rules=use_rules,
+            output_format=output_format,
         )
-
-    if save_output:
-        pd.DataFrame(predictions).to_csv(output_csv, index=False)
-        logger.info(f"Saved extracted predictions to {output_csv}")
+        planner = BatchPlanner.for_extractor(extractor, token_budget=token_budget, max_jobs=batch_size)
+
+        predictions = []
+        start_time = time.perf_counter()
+        for n, batch_predictions in enumerate(extractor.extract_many(planner.plan(jd_texts))):
+            start = len(predictions)
+            logger.info(f"Extracted batch {n + 1}: jobs {start} to {start + planner.batch_sizes[n] - 1}")
+            # Jobs whose extraction failed count as empty predictions
+            predictions.extend(prediction if prediction is not None else {} for prediction in batch_predictions)
+        elapsed = time.perf_counter() - start_time
+        logger.info(f"Batch packing: {planner.summary()}")
+        logger.info(f"Extraction calls: {extractor.stats}")
+
+        logger.info("Running evaluation...")
+        metrics = evaluator.evaluate_batch(ground_truths, predictions)
+        logger.info("\nEvaluation Metrics:")
+        for field, score in metrics.items():
+            logger.info(
+                f"{field:25} | Precision: {score['precision']:.3f} | Recall: {score['recall']:.3f} | "
+                f"F1: {score['f1']:.3f}"
+            )
+        n_jobs = max(1, len(jd_texts))
+        results[output_format] = {
+            "metrics": metrics,
+            "output_tokens_per_job": extractor.stats["batch_output_tokens"] / n_jobs,
+            "seconds_per_job": elapsed / n_jobs,
+        }
+
+        if save_output:
+            path = output_csv if len(output_formats) == 1 else f"{os.path.splitext(output_csv)[0]}_{output_format}.csv"
+            pd.DataFrame(predictions).to_csv(path, index=False)
+            logger.info(f"Saved extracted predictions to {path}")
+
+    if len(results) > 1:
+        logger.info("\nOutput format comparison:")
+        for field in fields:
+            logger.info(
+                f"{field:25} | "
+                + " | ".join(f"{name} F1: {result['metrics'][field]['f1']:.3f}" for name, result in results.items())
+            )
+        for name, result in results.items():
+            logger.info(
+                f"{name:25} | {result['output_tokens_per_job']:.0f} batch output tokens/job | "
+                f"{1000 * result['seconds_per_job']:.0f} ms/job"
+            )
+    return results
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--input-csv", type=str, required=True, help="CSV file with jd_text and ground_truth columns")
+    parser.add_argument(
+        "--input-csv", type=str, required=True, help="CSV or Parquet file with raw_job_text and ground-truth columns"
+    )
     parser.add_argument("--prompt-dir", type=str, default="extractor/prompts", help="Directory with prompt templates")
     parser.add_argument("--llm", type=str, default="gemini-2.0-flash", help="LLM model name (e.g., gemini-2.0-flash)")
+    parser.add_argument("--llm-option", action="append", metavar="KEY=VALUE", help="Option passed to the LLM backend")
     parser.add_argument(
         "--fields",
         nargs="+",
@@ -97,7 +170,31 @@ if __name__ == "__main__":
         ],
         help="Fields to evaluate using NER-style metrics",
     )
-    parser.add_argument("--batch-size", type=int, default=5, help="Number of job descriptions to process per batch")
+    parser.add_argument("--batch-size", type=int, default=5, help="Maximum number of job descriptions per batch")
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        default=0,
+        help="Maximum estimated input + output tokens per batch (0 to batch by --batch-size only)",
+    )
+    parser.add_argument(
+        "--max-concurrency", type=int, default=4, help="Maximum number of batches sent to the LLM concurrently"
+    )
+    parser.add_argument(
+        "--llm-rpm", type=float, help="LLM requests per minute (defaults to the model's quota, 0 for unlimited)"
+    )
+    parser.add_argument(
+        "--llm-tpm", type=float, help="LLM tokens per minute (defaults to the model's quota, 0 for unlimited)"
+    )
+    parser.add_argument(
+        "--rule-fields", action="store_true", help="Extract salary, experience, languages and employment type by rules"
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=["json", "compact", "both"],
+        default="json",
+        help="Batch output format of the LLM; 'both' compares F1, output tokens and latency of the two",
+    )
     parser.add_argument("--save-output", action="store_true", help="Whether to save extracted predictions to CSV")
     parser.add_argument(
         "--output-csv", type=str, default="jd_extraction_output.csv", help="Path to save extracted predictions"
@@ -112,4 +209,11 @@ if __name__ == "__main__":
         args.batch_size,
         save_output=args.save_output,
         output_csv=args.output_csv,
+        max_concurrency=args.max_concurrency,
+        requests_per_minute=args.llm_rpm,
+        tokens_per_minute=args.llm_tpm,
+        token_budget=args.token_budget or None,
+        llm_options=parse_llm_options(args.llm_option),
+        use_rules=args.rule_fields,
+        output_formats=["json", "compact"] if args.output_format == "both" else [args.output_format],
     )
@@ -0,0 +1,142 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from extractor.compact_format import COMPACT_OUTPUT_TOKENS_PER_JOB
+from utils.logger import get_logger
+from utils.tokens import estimate_tokens
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Estimated completion size of one extracted job: the fixed JSON keys plus a share of the job text
+OUTPUT_TOKENS_PER_JOB = 200
+OUTPUT_TOKENS_RATIO = 0.1
+
+
+class BatchPlanner:
+    """
+    Packs job texts into LLM requests by estimated token cost instead of by count.
+
+    A request costs the prompt template, the formatted job blocks and the expected JSON completion.
+    Jobs are added to the current batch, in input order, while the request stays within
+    `token_budget`, its completion within `max_output_tokens`, and the batch within `max_jobs` jobs.
+    A job too large to fit any batch is sent on its own.
+    """
+
+    def __init__(
+        self,
+        prompt_tokens: int,
+        token_budget: Optional[int] = None,
+        max_jobs: Optional[int] = None,
+        max_output_tokens: int = 8192,
+        format_job: Callable[[str], str] = lambda text: text,
+        output_tokens_per_job: int = OUTPUT_TOKENS_PER_JOB,
+    ):
+        """
+        Args:
+            prompt_tokens (int): Estimated tokens of the prompt template without any job.
+            token_budget (Optional[int]): Maximum estimated input + output tokens per request, unlimited if None.
+            max_jobs (Optional[int]): Maximum number of jobs per request, unlimited if None.
+            max_output_tokens (int): Maximum estimated completion tokens per request.
+            format_job (Callable[[str], str]): How a job text is wrapped in the batched prompt.
+            output_tokens_per_job (int): Fixed part of the estimated completion size of one job.
+        """
+        if token_budget is None and max_jobs is None:
+            raise ValueError("At least one of token_budget and max_jobs is required")
+        self.prompt_tokens = prompt_tokens
+        self.token_budget = token_budget
+        self.max_jobs = max_jobs
+        self.max_output_tokens = max_output_tokens
+        self.format_job = format_job
+        self.output_tokens_per_job = output_tokens_per_job
+        self.batch_sizes: List[int] = []
+        self.batch_tokens: List[int] = []
+        self.oversized = 0
+
+    @classmethod
+    def for_extractor(cls, extractor, token_budget: Optional[int] = None, max_jobs: Optional[int] = None, **kwargs):
+        """
+        Build a planner matching the extraction prompt and job formatting of a JDExtractor.
+        """
+        prompt_tokens = estimate_tokens(extractor.prompts["extract"].format(text=""))
+        if extractor.output_format == "compact":
+            kwargs.setdefault("output_tokens_per_job", COMPACT_OUTPUT_TOKENS_PER_JOB)
+        return cls(
+            prompt_tokens,
+            token_budget=token_budget,
+            max_jobs=max_jobs,
+            format_job=lambda text: extractor.format_jobs_for_batching([text]),
+            **kwargs,
+        )
+
+    def job_tokens(self, text: str) -> Tuple[int, int]:
+        """
+        Estimate the cost of one job in a batched request.
+
+        Args:
+            text (str): Raw job text.
+
+        Returns:
+            Tuple[int, int]: Estimated input and output tokens.
+        """
+        input_tokens = estimate_tokens(self.format_job(text) + "\n\n")
+        return input_tokens, self.output_tokens_per_job + int(OUTPUT_TOKENS_RATIO * input_tokens)
+
+    def _fits(self, n_jobs: int, input_tokens: int, output_tokens: int) -> bool:
+        if self.max_jobs is not None and n_jobs > self.max_jobs:
+            return False
+        if output_tokens > self.max_output_tokens:
+            return False
+        return self.token_budget is None or self.prompt_tokens + input_tokens + output_tokens <= self.token_budget
+
+    def plan(self, items: Iterable[T], text: Callable[[T], str] = lambda item: item) -> Iterator[List[T]]:
+        """
+        Group items into batches, consuming `items` lazily.
+
+        Args:
+            items (Iterable): Items to batch, e.g. job texts or (job_id, job_text) pairs.
+            text (Callable): Returns the job text of an item.
+
+        Yields:
+            list: Consecutive items forming one request.
+        """
+        batch, input_tokens, output_tokens = [], 0, 0
+        for item in items:
+            job_input, job_output = self.job_tokens(text(item))
+            if batch and not self._fits(len(batch) + 1, input_tokens + job_input, output_tokens + job_output):
+                yield self._close(batch, input_tokens + output_tokens)
+                batch, input_tokens, output_tokens = [], 0, 0
+            batch.append(item)
+            input_tokens += job_input
+            output_tokens += job_output
+            if not self._fits(len(batch), input_tokens, output_tokens):
+                self.oversized += 1
+                logger.warning(f"Job of ~{job_input} tokens exceeds the batch token budget; sending it alone")
+        if batch:
+            yield self._close(batch, input_tokens + output_tokens)
+
+    def _close(self, batch: List[T], job_tokens: int) -> List[T]:
+        tokens = self.prompt_tokens + job_tokens
+        self.batch_sizes.append(len(batch))
+        self.batch_tokens.append(tokens)
+        logger.info(f"Planned batch #{len(self.batch_sizes)}: {len(batch)} jobs, ~{tokens} tokens")
+        return batch
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: Number of batches and jobs, mean/max jobs and estimated tokens per batch,
+            budget fill ratio and number of jobs exceeding the budget on their own.
+        """
+        n_batches = len(self.batch_sizes)
+        mean_tokens = sum(self.batch_tokens) / n_batches if n_batches else 0.0
+        return {
+            "batches": n_batches,
+            "jobs": sum(self.batch_sizes),
+            "jobs_per_batch": round(sum(self.batch_sizes) / n_batches, 2) if n_batches else 0.0,
+            "max_jobs_per_batch": max(self.batch_sizes, default=0),
+            "tokens_per_batch": round(mean_tokens),
+            "max_tokens_per_batch": max(self.batch_tokens, default=0),
+            "budget_fill": round(mean_tokens / self.token_budget, 3) if self.token_budget else 0.0,
+            "oversized_jobs": self.oversized,
+        }
@@ -0,0 +1,174 @@
+from typing import Dict, List, Optional
+
+from extractor.rules import RULE_ONLY_FIELDS
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Columns of a compact row after the job ref, as dot-separated paths of the extraction schema
+COMPACT_FIELDS = [
+    "title",
+    "industry",
+    "employment_type",
+    "employment_contract",
+    "required_experience.years.min",
+    "required_experience.years.max",
+    "required_experience.level",
+    "salary.min",
+    "salary.max",
+    "salary.currency",
+    "skills.hard_skills",
+    "skills.soft_skills",
+    "skills.required_languages",
+    "skills.nice_to_have",
+    "education.degrees",
+    "education.fields_of_study",
+]
+# Columns when years, required languages and employment type come from the rules (`--rule-fields`)
+SEMANTIC_COMPACT_FIELDS = [
+    field
+    for field in COMPACT_FIELDS
+    if not any(field == rule or field.startswith(f"{rule}.") for rule in RULE_ONLY_FIELDS)
+]
+NUMERIC_FIELDS = {"required_experience.years.min", "required_experience.years.max", "salary.min", "salary.max"}
+LEVELS = {"", "Internship", "Entry", "Junior", "Mid", "Senior"}
+
+SEPARATOR = "|"
+END_MARKER = "END"
+# Rough output cost of a compact row, against ~200 tokens for the JSON object of a job
+COMPACT_OUTPUT_TOKENS_PER_JOB = 80
+
+
+def _parse_number(value: str, field: str) -> int:
+    if value in ("", "-"):
+        return -1
+    try:
+        number = float(value.replace(" ", "").replace(",", ""))
+    except ValueError:
+        raise ValueError(f"{field} is not a number: {value!r}") from None
+    return int(round(number))
+
+
+def _set_field(result: Dict, field: str, value):
+    *parents, leaf = field.split(".")
+    node = result
+    for parent in parents:
+        node = node.setdefault(parent, {})
+    node[leaf] = value
+
+
+def decode_row(line: str, fields: List[str] = COMPACT_FIELDS) -> Dict:
+    """
+    Decode one compact row (`<job ref>|<value>|...`, one value per field) into the nested result dict.
+
+    Args:
+        line (str): Row without its line break.
+        fields (List[str]): Dot-separated paths of the columns after the job ref.
+
+    Returns:
+        dict: Result in the shape of the JSON extraction, with its `job_ref`; fields without a column are
+        "not specified" ("" or -1).
+
+    Raises:
+        ValueError: If the number of columns, the job ref, a numeric value or the level is invalid.
+    """
+    values = [value.strip() for value in line.split(SEPARATOR)]
+    if len(values) != len(fields) + 1:
+        raise ValueError(f"expected {len(fields) + 1} columns, got {len(values)}")
+    if not values[0].isdigit():
+        raise ValueError(f"invalid job ref: {values[0]!r}")
+
+    # Start from the full schema in its usual key order, "not specified" everywhere
+    result: Dict = {"job_ref": int(values[0])}
+    for field in COMPACT_FIELDS:
+        _set_field(result, field, -1 if field in NUMERIC_FIELDS else "")
+    for field, value in zip(fields, values[1:]):
+        if field in NUMERIC_FIELDS:
+            value = _parse_number(value, field)
+        elif field == "required_experience.level" and value not in LEVELS:
+            raise ValueError(f"invalid level: {value!r}")
+        _set_field(result, field, value)
+    return result
+
+
+class CompactStreamParser:
+    """
+    Incremental parser for a streamed compact completion: one `|`-separated row per job, then an
+    `END` line. It exposes the same interface as `JsonListStreamParser`, so that rows are matched to
+    jobs the same way. Text before the first row (e.g. a Markdown code fence) is ignored; rows that
+    fail validation are skipped and counted.
+    """
+
+    def __init__(self, fields: List[str] = COMPACT_FIELDS):
+        """
+        Args:
+            fields (List[str]): Dot-separated paths of the columns after the job ref.
+        """
+        self.fields = fields
+        self.started = False
+        self.finished = False
+        self.skipped = 0
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """
+        Consume the next chunk of the completion.
+
+        Args:
+            chunk (str): Text generated since the previous call.
+
+        Returns:
+            list[dict]: Rows completed by this chunk, decoded, in order.
+        """
+        if self.finished:
+            return []
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split("\n")
+        completed = []
+        for line in lines:
+            item = self._parse_line(line.strip())
+            if item is not None:
+                completed.append(item)
+            if self.finished:
+                break
+        return completed
+
+    def close(self) -> List[Dict]:
+        """
+        Signal the end of the completion. A last line not followed by a line break is only accepted if it
+        is the `END` line: a row there may have been cut in the middle of a value.
+
+        Returns:
+            list[dict]: Always empty; rows are only returned once their line is complete.
+        """
+        line, self._buffer = self._buffer.strip(), ""
+        if line == END_MARKER:
+            self._parse_line(line)
+        elif line and self.started and not self.finished:
+            self.skipped += 1
+            logger.warning("Skipping unterminated last compact row")
+        return []
+
+    def _parse_line(self, line: str) -> Optional[Dict]:
+        if line == END_MARKER:
+            self.finished = self.started
+            return None
+        if not self.started:
+            if SEPARATOR not in line or not line.split(SEPARATOR, 1)[0].strip().isdigit():
+                return None
+            self.started = True
+        if not line or line.startswith("```"):
+            return None
+        try:
+            return decode_row(line, self.fields)
+        except ValueError as e:
+            self.skipped += 1
+            logger.warning(f"Skipping malformed compact row: {e}")
+            return None
+
+    @property
+    def truncated(self) -> bool:
+        """
+        Whether rows were received but never the `END` line, e.g. because the completion hit its token limit.
+        """
+        return self.started and not self.finished
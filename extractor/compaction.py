@@ -0,0 +1,275 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from extractor.extraction_cache import normalize_job_text
+from utils.logger import get_logger
+from utils.tokens import estimate_tokens
+
+logger = get_logger(__name__)
+
+# Lines that never carry extractable information (English and French postings)
+BOILERPLATE_PATTERNS = [
+    # Equal-opportunity and diversity statements
+    r"equal (employment )?opportunit",
+    r"without regard to",
+    r"regardless of (race|gender|age|sex|religion|origin|background)",
+    r"committed to (diversity|inclusion|creating an inclusive)",
+    r"value diversity",
+    r"égalité des chances",
+    r"situation de handicap",
+    r"charte de la diversité",
+    # Benefits blurbs
+    r"\b(health|dental|vision|medical) (insurance|coverage)",
+    r"paid time off|gym membership|wellness program",
+    r"\bmutuelle\b|tickets? restaurants?|carte swile|\bRTT\b|indemnité kilométrique",
+    # Cookie and legal footers
+    r"\bcookies?\b",
+    r"privacy (policy|notice|statement)|terms of (use|service)",
+    r"politique de confidentialité|données personnelles|\bRGPD\b|\bGDPR\b|personal data",
+    # LinkedIn page artifacts
+    r"^show (more|less)$",
+]
+BOILERPLATE_RE = re.compile("|".join(f"(?:{pattern})" for pattern in BOILERPLATE_PATTERNS), re.IGNORECASE)
+
+# Lines that may hold fields we extract (salary, experience, requirements, responsibilities, skills,
+# education, languages)
+PROTECTED_RE = re.compile(
+    r"salar|salaire|rémunération|remuneration|compensation|package|€|\$|£|\d\s?k\b|"
+    r"\byears?\b|\bans\b|experience|expérience|"
+    r"requir|requis|exig|must|mandatory|indispensable|"
+    r"knowledge|connaissance|proficien|familiar|expertise|understanding|command of|maîtrise|ability|able to|"
+    r"responsib|duties|you will|vous (serez|allez)|missions?\b|tâches|"
+    r"skill|compétence|qualification|stack|"
+    r"degree|diplôme|bachelor|master|ph\.?d|doctorat|ingénieur|engineer|"
+    r"english|anglais|french|français|fluent|courant|bilingu",
+    re.IGNORECASE,
+)
+# Section headings whose lines are all kept (requirements, responsibilities) or no longer protected
+PROTECTED_SECTION_RE = re.compile(
+    r"qualification|requirement|responsibilit|what you('ll| will) do|your role|who you are|about you|profile|"
+    r"profil|missions?|compétences|prérequis|votre rôle",
+    re.IGNORECASE,
+)
+OTHER_SECTION_RE = re.compile(
+    r"about (us|the company)|who we are|what we offer|our offer|benefits|perks|why join|"
+    r"à propos|qui sommes-nous|nous vous offrons|avantages",
+    re.IGNORECASE,
+)
+# Maximum length of a line taken for a section heading
+MAX_HEADING_LENGTH = 60
+# `Company:` line prepended by the scraper
+COMPANY_LINE_RE = re.compile(r"^Company: (.+)\.$", re.MULTILINE)
+
+
+def company_of(text: str) -> Optional[str]:
+    """
+    Returns:
+        Optional[str]: Lowercased company of a job text, from the `Company:` line prepended by the scraper,
+        or None if the text has none.
+    """
+    match = COMPANY_LINE_RE.search(text)
+    return match.group(1).strip().lower() if match else None
+
+
+def _line_key(line: str, company: str) -> bytes:
+    normalized = re.sub(r"\s+", " ", line).strip().lower()
+    return hashlib.blake2b(f"{company}\n{normalized}".encode("utf-8"), digest_size=8).digest()
+
+
+def _posting_key(text: str) -> bytes:
+    return hashlib.blake2b(normalize_job_text(text).lower().encode("utf-8"), digest_size=16).digest()
+
+
+class JobTextCompactor:
+    """
+    Shrinks job texts before extraction by dropping lines that carry no extractable information.
+
+    Two kinds of lines are removed: known boilerplate (equal-opportunity statements, benefits blurbs,
+    cookie/legal footers), and long lines found in at least `min_repeats` other postings of the same
+    company, such as its "about us" paragraph. Repeated lines are learned incrementally with `observe_many`,
+    counting each posting once however often it was reposted; the counts live in SQLite, so they grow
+    across runs without re-reading the raw texts. `compact` does not learn. Lines mentioning salary,
+    experience, requirements, responsibilities, skills, education or languages, and every line of a
+    requirements or responsibilities section, are kept.
+    """
+
+    def __init__(self, path: str = ":memory:", min_repeats: int = 3, min_repeated_length: int = 80):
+        """
+        Args:
+            path (str): Path to the SQLite database of line counts, created if missing. Defaults to an
+                in-memory database, forgotten when the compactor is discarded.
+            min_repeats (int): Number of other postings of the same company a line must appear in to be
+                dropped as repeated.
+            min_repeated_length (int): Minimum length of a line to be dropped as repeated, so that short
+                section headings shared by many postings are kept.
+        """
+        self.path = path
+        self.min_repeats = min_repeats
+        self.min_repeated_length = min_repeated_length
+        self.stats = {
+            "jobs": 0,
+            "jobs_without_company": 0,
+            "tokens_before": 0,
+            "tokens_after": 0,
+            "boilerplate_lines": 0,
+            "repeated_lines": 0,
+            "protected_lines": 0,
+        }
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in (
+            "CREATE TABLE IF NOT EXISTS postings (posting BLOB PRIMARY KEY)",
+            "CREATE TABLE IF NOT EXISTS line_counts (line BLOB PRIMARY KEY, count INTEGER NOT NULL)",
+        ):
+            self._conn.execute(statement)
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """
+        Returns:
+            int: Number of distinct postings counted so far.
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+
+    def _long_line_keys(self, text: str, company: str) -> Set[bytes]:
+        return {_line_key(line, company) for line in text.splitlines() if len(line.strip()) >= self.min_repeated_length}
+
+    def observe(self, text: str) -> bool:
+        """
+        Count the long lines of a posting (each at most once per posting) towards its company's repeated
+        lines. Postings without a company, or whose normalized text was already observed, are skipped.
+
+        Returns:
+            bool: Whether the posting was counted.
+        """
+        return self.observe_many([text]) == 1
+
+    def observe_many(self, texts: Iterable[str]) -> int:
+        """
+        Same as `observe` for several postings, in a single transaction.
+
+        Returns:
+            int: Number of postings counted.
+        """
+        counted = 0
+        with self._lock, self._conn:
+            for text in texts:
+                company = company_of(text)
+                if company is None:
+                    continue
+                inserted = self._conn.execute(
+                    "INSERT OR IGNORE INTO postings (posting) VALUES (?)", (_posting_key(text),)
+                ).rowcount
+                if not inserted:
+                    continue
+                self._conn.executemany(
+                    "INSERT INTO line_counts (line, count) VALUES (?, 1) "
+                    "ON CONFLICT(line) DO UPDATE SET count = count + 1",
+                    ((key,) for key in self._long_line_keys(text, company)),
+                )
+                counted += 1
+        return counted
+
+    def fit(self, texts: Iterable[str]) -> int:
+        """
+        Learn repeated lines from a corpus, e.g. all raw texts cached so far.
+
+        Returns:
+            int: Number of distinct postings counted.
+        """
+        return self.observe_many(texts)
+
+    def _line_counts(self, keys: List[bytes]) -> Dict[bytes, int]:
+        counts = {}
+        with self._lock:
+            # Stay under SQLite's default limit of 999 host parameters
+            for i in range(0, len(keys), 500):
+                chunk = keys[i : i + 500]
+                rows = self._conn.execute(
+                    f"SELECT line, count FROM line_counts WHERE line IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                counts.update(rows)
+        return counts
+
+    def _observed(self, text: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM postings WHERE posting = ?", (_posting_key(text),)).fetchone()
+        return row is not None
+
+    def compact(self, text: str) -> str:
+        """
+        Drop boilerplate and repeated lines from a job text.
+
+        Args:
+            text (str): Raw job text.
+
+        Returns:
+            str: Compacted job text.
+        """
+        company = company_of(text)
+        line_counts = {}
+        if company is None:
+            self.stats["jobs_without_company"] += 1
+        else:
+            line_counts = self._line_counts(sorted(self._long_line_keys(text, company)))
+        # An observed posting counts its own lines once, which must not make them repeated
+        own_count = 1 if company is not None and self._observed(text) else 0
+        kept = []
+        in_protected_section = False
+        for line in text.splitlines():
+            stripped = line.strip()
+            if not stripped:
+                kept.append("")
+                continue
+            if len(stripped) <= MAX_HEADING_LENGTH:
+                if PROTECTED_SECTION_RE.search(stripped):
+                    in_protected_section = True
+                elif OTHER_SECTION_RE.search(stripped):
+                    in_protected_section = False
+            boilerplate = BOILERPLATE_RE.search(stripped) is not None
+            repeated = (
+                company is not None
+                and len(stripped) >= self.min_repeated_length
+                and line_counts.get(_line_key(line, company), 0) - own_count >= self.min_repeats
+            )
+            if (boilerplate or repeated) and (in_protected_section or PROTECTED_RE.search(stripped)):
+                self.stats["protected_lines"] += 1
+            elif boilerplate:
+                self.stats["boilerplate_lines"] += 1
+                continue
+            elif repeated:
+                self.stats["repeated_lines"] += 1
+                continue
+            kept.append(line)
+
+        compacted = re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()
+        self.stats["jobs"] += 1
+        self.stats["tokens_before"] += estimate_tokens(text)
+        self.stats["tokens_after"] += estimate_tokens(compacted)
+        return compacted
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: Line and token counts so far, with the overall token reduction ratio.
+        """
+        before = self.stats["tokens_before"]
+        reduction = 1 - self.stats["tokens_after"] / before if before else 0.0
+        return {**self.stats, "token_reduction": round(reduction, 3)}
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
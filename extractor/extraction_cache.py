@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Share of `max_entries` evicted beyond the overflow, so that a full cache does not evict on every insert
+EVICTION_SLACK = 0.01
+
+
+def normalize_job_text(text: str) -> str:
+    """
+    Canonical form of a job text for cache lookups: Unicode NFKC with whitespace runs collapsed,
+    so reposts differing only in formatting share an entry.
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def extraction_key(text: str, prompt: str, model: str) -> str:
+    """
+    Content address of one extraction.
+
+    Args:
+        text (str): Raw job text.
+        prompt (str): Content of every prompt template the extraction goes through.
+        model (str): LLM model name.
+
+    Returns:
+        str: SHA-256 hex digest of the normalized text, prompt and model.
+    """
+    digest = hashlib.sha256()
+    for part in (normalize_job_text(text), prompt, model):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    SQLite cache of structured extractions keyed by `extraction_key`.
+
+    Entries older than `ttl` seconds are treated as missing, and once the cache holds more than
+    `max_entries` the least recently used entries are evicted. Values are stored as JSON, so every
+    lookup returns a fresh copy that callers may mutate.
+    """
+
+    def __init__(self, path: str, max_entries: Optional[int] = 100_000, ttl: Optional[float] = None):
+        """
+        Args:
+            path (str): Path to the SQLite database file, created if missing.
+            max_entries (Optional[int]): Maximum number of entries kept, unbounded if None.
+            ttl (Optional[float]): Lifetime of an entry in seconds, unlimited if None.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extractions "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL, last_used REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS extractions_last_used ON extractions (last_used)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._size = self._count()
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Args:
+            key (str): Extraction key.
+
+        Returns:
+            Optional[Dict]: A copy of the cached extraction, or None on a miss or an expired entry.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value, created_at FROM extractions WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+                self.evictions += 1
+                self._size -= 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE extractions SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict):
+        """
+        Store an extraction. Once the cache holds more than `max_entries`, the least recently used entries
+        are evicted, with some slack so that the next inserts do not evict again.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            is_new = self._conn.execute("SELECT 1 FROM extractions WHERE key = ?", (key,)).fetchone() is None
+            self._conn.execute(
+                "INSERT INTO extractions (key, value, created_at, last_used) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, created_at = excluded.created_at, "
+                "last_used = excluded.last_used",
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            self._size += is_new
+            if self.max_entries is not None and self._size > self.max_entries:
+                # Recount, as other processes may share the database
+                self._size = self._count()
+                n_evict = self._size - self.max_entries + int(self.max_entries * EVICTION_SLACK)
+                if n_evict > 0:
+                    evicted = self._conn.execute(
+                        "DELETE FROM extractions WHERE key IN "
+                        "(SELECT key FROM extractions ORDER BY last_used LIMIT ?)",
+                        (n_evict,),
+                    ).rowcount
+                    self.evictions += evicted
+                    self._size -= evicted
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: Hit/miss/eviction counts and hit rate since the cache was opened.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
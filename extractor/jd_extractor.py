@@ -1,10 +1,32 @@
 import os
-from typing import Dict, List
+import random
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
-from langchain_google_genai import ChatGoogleGenerativeAI
 
+from extractor.compact_format import (
+    COMPACT_FIELDS,
+    SEMANTIC_COMPACT_FIELDS,
+    CompactStreamParser,
+)
+from extractor.extraction_cache import ExtractionCache, extraction_key
+from extractor.language import detect_language
+from extractor.rules import RuleExtractor, merge_rule_fields
+from extractor.stream_parser import JsonListStreamParser
+from utils.concurrency import ordered_map
+from utils.llm_loader import get_llm
+from utils.logger import get_logger
+from utils.metrics import NULL_METRICS, Metrics
 from utils.prompt_loader import load_prompt
+from utils.rate_limiter import LLMRateLimiter, parse_retry_after
+from utils.tokens import estimate_tokens
+
+logger = get_logger(__name__)
 
 
 class JDExtractor:
@@ -12,7 +34,22 @@ class JDExtractor:
     Extracts structured job information using LangChain and prompt templates.
     """
 
-    def __init__(self, prompt_dir: str, llm=None, use_translation: bool = False):
+    def __init__(
+        self,
+        prompt_dir: str,
+        llm=None,
+        use_translation: bool = False,
+        max_concurrency: int = 1,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        cache: Optional[ExtractionCache] = None,
+        use_rules: bool = False,
+        output_format: str = "json",
+        metrics: Optional[Metrics] = None,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+    ):
         """
         Initialize JDExtractor with prompt directory and optional LLM model.
 
@@ -20,10 +57,55 @@ class JDExtractor:
             prompt_dir (str): Path to the directory containing prompt templates.
             llm (BaseLanguageModel, optional): Custom LLM instance. Defaults to Gemini 2.0 Flash.
             use_translation (bool): Whether to enable translation step. Defaults to False.
+            max_concurrency (int): Maximum number of batches `extract_many` keeps in flight.
+            requests_per_minute (Optional[float]): LLM request budget shared by all calls, unlimited if None.
+            tokens_per_minute (Optional[float]): LLM token budget (estimated prompt + completion), unlimited if None.
+            cache (Optional[ExtractionCache]): Content-addressed cache checked before any LLM call.
+            use_rules (bool): Whether to fill salary, years of experience, required languages and employment
+                type with `RuleExtractor` and ask the LLM only for the other fields (slimmer prompts).
+            output_format (str): Completion format of batched extraction: "json" (a list of objects) or
+                "compact" (one `|`-separated row per job, decoded into the same dicts; fewer output tokens).
+            metrics (Optional[Metrics]): Run metrics: LLM calls and retries, estimated input/output tokens,
+                extraction cache hits and misses, `llm_call` timer.
+            max_retries (int): Number of retries of an LLM call that raised (e.g. a 429), before a batch is
+                bisected or fails.
+            backoff_base (float): Base retry delay in seconds, doubled on every retry.
+            backoff_max (float): Upper bound of the retry delay in seconds.
         """
-        self.llm = llm or ChatGoogleGenerativeAI(model="gemini-2.0-flash")
+        self.llm = llm or get_llm("gemini-2.0-flash")
+        if output_format not in ("json", "compact"):
+            raise ValueError(f"Unsupported output format: {output_format}")
+        self.output_format = output_format
+        self.rules = RuleExtractor() if use_rules else None
         self.prompts = self._load_prompts(prompt_dir)
         self.use_translation = use_translation
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = (
+            LLMRateLimiter(requests_per_minute, tokens_per_minute) if requests_per_minute or tokens_per_minute else None
+        )
+        self._prompt_tokens = {name: estimate_tokens(prompt.format(text="")) for name, prompt in self.prompts.items()}
+        self.cache = cache
+        self.metrics = metrics or NULL_METRICS
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._cache_prompt = "\0".join(
+            self.prompts[step].format(text="") for step in self._steps("batch") + self._steps("single")
+        )
+        self.stats = {
+            "batches": 0,
+            "llm_retries": 0,
+            "partial_batches": 0,
+            "bisections": 0,
+            "single_fallbacks": 0,
+            "failed_jobs": 0,
+            "translation_calls_saved": 0,
+            "translation_tokens_saved": 0,
+            "batch_output_tokens": 0,
+        }
+        self.language_counts = Counter()
+        self._stats_lock = threading.Lock()
+        self._cache_model = self._model_name(self.llm)
 
     def _load_prompts(self, prompt_dir: str) -> Dict[str, object]:
         """
@@ -31,36 +113,392 @@ class JDExtractor:
         Returns:
             dict[str, ChatPromptTemplate]: Dictionary of prompt templates.
         """
+        extraction = "jd_extraction_semantic" if self.rules is not None else "jd_extraction"
+        batching = "compact_batching" if self.output_format == "compact" else "batching"
         return {
-            "extract": load_prompt(os.path.join(prompt_dir, "jd_extraction_batching.txt")),
+            "extract": load_prompt(os.path.join(prompt_dir, f"{extraction}_{batching}.txt")),
             "translate": load_prompt(os.path.join(prompt_dir, "translation_batching.txt")),
+            "extract_single": load_prompt(os.path.join(prompt_dir, f"{extraction}.txt")),
+            "translate_single": load_prompt(os.path.join(prompt_dir, "translation.txt")),
         }
 
     def format_jobs_for_batching(self, job_texts: List[str]) -> str:
         """
-        Wrap job descriptions with batch delimiters.
+        Wrap job descriptions with batch delimiters and number them with a `JOB REF` line (from 1).
         Args:
             job_texts (list[str]): List of job description texts.
         Returns:
             str: Combined formatted batch text.
         """
-        return "\n\n".join(f"### JOB START ###\n{text.strip()}\n### JOB END ###" for text in job_texts)
+        return "\n\n".join(
+            f"### JOB START ###\nJOB REF: {ref}\n{text.strip()}\n### JOB END ###"
+            for ref, text in enumerate(job_texts, start=1)
+        )
+
+    def _steps(self, mode: str) -> List[str]:
+        """
+        Prompt names used to extract a batch ("batch") or a single job ("single").
+        """
+        steps = ["translate", "extract"] if self.use_translation else ["extract"]
+        return steps if mode == "batch" else [f"{step}_single" for step in steps]
+
+    def _count(self, stat: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[stat] += n
+
+    def _record_llm_call(self, step: str, text: str, output: str):
+        if self.metrics.enabled:
+            self.metrics.inc("llm_calls")
+            self.metrics.inc("llm_input_tokens", self._prompt_tokens[step] + estimate_tokens(text))
+            self.metrics.inc("llm_output_tokens", estimate_tokens(output))
+
+    def _call_with_retries(self, step: str, call):
+        """
+        Run an LLM call, retrying it up to `max_retries` times if it raises.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return call()
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                self._before_retry(step, attempt, e)
 
-    def extract(self, job_texts: List[str]) -> List[Dict]:
+    def _before_retry(self, step: str, attempt: int, error: Exception):
+        """
+        Sleep before retrying a failed LLM call: full-jitter exponential backoff, never shorter than the
+        `Retry-After` of a rate-limit error.
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        logger.warning(f"LLM call '{step}' failed ({error}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+        self._count("llm_retries")
+        self.metrics.inc("llm_retries")
+        time.sleep(delay)
+
+    @staticmethod
+    def _model_name(llm) -> str:
+        return str(getattr(llm, "model", None) or getattr(llm, "model_name", None) or type(llm).__name__)
+
+    def extract(self, job_texts: List[str], cache_texts: Optional[List[str]] = None) -> List[Optional[Dict]]:
         """
         Perform translation (if enabled) and extraction on a batch of job descriptions.
+
+        Jobs found in the extraction cache are not sent to the LLM. Jobs missing from the LLM response
+        (invalid JSON, truncated list, unknown job refs) are retried in a new batch if the response
+        yielded some results, or by splitting the batch in halves otherwise, down to single jobs,
+        which are extracted with the single-job prompt.
         Args:
             job_texts (list[str]): List of raw job descriptions.
+            cache_texts (Optional[list[str]]): Texts keying each job in the extraction cache, e.g. the raw
+                texts of compacted `job_texts`, so that entries do not depend on compaction. Defaults to
+                `job_texts`.
         Returns:
-            list[dict]: Extracted structured results for each job.
+            list[dict | None]: Extracted structured results for each job, in input order; None for a job
+            whose extraction failed.
         """
+        results = [None] * len(job_texts)
+        for i, structured in self.extract_stream(job_texts, cache_texts):
+            results[i] = structured
+        return results
+
+    def extract_stream(
+        self, job_texts: List[str], cache_texts: Optional[List[str]] = None
+    ) -> Iterator[Tuple[int, Optional[Dict]]]:
+        """
+        Same as `extract`, but yields each job's result as soon as it is available: cached jobs first,
+        then each job object as soon as the LLM has finished generating it.
+
+        Args:
+            job_texts (list[str]): List of raw job descriptions.
+            cache_texts (Optional[list[str]]): Texts keying each job in the extraction cache (see `extract`).
+
+        Yields:
+            Tuple[int, dict | None]: Index of the job in `job_texts` and its result (None if it failed).
+            Every index is yielded exactly once.
+        """
+        if self.cache is None:
+            yield from self._stream_merged(job_texts)
+            return
+
+        keys = [extraction_key(text, self._cache_prompt, self._cache_model) for text in cache_texts or job_texts]
+        missing = []
+        for i, key in enumerate(keys):
+            cached = self.cache.get(key)
+            if cached is None:
+                self.metrics.inc("extraction_cache_misses")
+                missing.append(i)
+            else:
+                self.metrics.inc("extraction_cache_hits")
+                yield i, cached
+
+        for j, structured in self._stream_merged([job_texts[i] for i in missing]):
+            if structured is not None:
+                self.cache.put(keys[missing[j]], structured)
+            yield missing[j], structured
+
+    def _stream_merged(self, job_texts: List[str]) -> Iterator[Tuple[int, Optional[Dict]]]:
+        """
+        `_stream_bisecting`, with the rule-extracted fields merged into each result when rules are enabled.
+        Non-English jobs are translated once here, so a batch that is bisected is not translated again.
+        """
+        prompt_texts = job_texts
+        if self.use_translation and job_texts:
+            prompt_texts = self._translate_non_english(job_texts, mode="batch" if len(job_texts) > 1 else "single")
+        for i, structured in self._stream_bisecting(prompt_texts):
+            if structured is not None and self.rules is not None:
+                merge_rule_fields(structured, self.rules.extract(job_texts[i])[0])
+            yield i, structured
+
+    def _stream_bisecting(self, job_texts: List[str]) -> Iterator[Tuple[int, Optional[Dict]]]:
+        if not job_texts:
+            return
+        if len(job_texts) == 1:
+            yield 0, self._extract_single(job_texts[0])
+            return
+
+        done = set()
+        for i, structured in self._stream_batch(job_texts):
+            done.add(i)
+            yield i, structured
+        remaining = [i for i in range(len(job_texts)) if i not in done]
+        if not remaining:
+            return
+
+        if done:
+            self._count("partial_batches")
+            logger.warning(f"LLM response covered {len(done)} of {len(job_texts)} jobs; retrying the others")
+            groups = [remaining]
+        else:
+            self._count("bisections")
+            logger.warning(f"Invalid response for a batch of {len(job_texts)} jobs; retrying in halves")
+            middle = len(job_texts) // 2
+            groups = [remaining[:middle], remaining[middle:]]
+        for group in groups:
+            for j, structured in self._stream_bisecting([job_texts[i] for i in group]):
+                yield group[j], structured
+
+    def _stream_batch(self, job_texts: List[str]) -> Iterator[Tuple[int, Dict]]:
+        """
+        Extract a batch with one streamed LLM call, yielding each result as soon as its JSON object is
+        complete, matched to its job by `job_ref`. Results without any `job_ref` are only accepted, at
+        the end, if there is exactly one per job. Jobs without a valid result are not yielded.
+        """
+        self._count("batches")
         batched_text = self.format_jobs_for_batching(job_texts)
+        self._wait_for_budget(batched_text, ["extract"])
+
+        done = set()
+        for attempt in range(self.max_retries + 1):
+            parser = self._stream_parser()
+            unreferenced, output = [], []
+            try:
+                with self.metrics.timer("llm_call"):
+                    for chunk in (self.prompts["extract"] | self.llm).stream({"text": batched_text}):
+                        output.append(chunk.content)
+                        for item in parser.feed(chunk.content):
+                            if not isinstance(item, dict):
+                                continue
+                            if "job_ref" not in item:
+                                unreferenced.append(item)
+                                continue
+                            try:
+                                i = int(item.pop("job_ref")) - 1
+                            except (TypeError, ValueError):
+                                i = -1
+                            if not 0 <= i < len(job_texts) or i in done:
+                                logger.warning(
+                                    f"Ignoring result with an unknown or duplicate job_ref in a batch of "
+                                    f"{len(job_texts)}"
+                                )
+                                continue
+                            done.add(i)
+                            yield i, item
+                break
+            except Exception as e:
+                if done:
+                    # Results already yielded stand; the other jobs are retried as a partial batch
+                    logger.warning(f"LLM call failed after {len(done)} of {len(job_texts)} jobs ({e})")
+                    break
+                if attempt == self.max_retries:
+                    raise
+                self._before_retry("extract", attempt, e)
+                self._wait_for_budget(batched_text, ["extract"])
+
+        parser.close()
+        output = "".join(output)
+        self._count("batch_output_tokens", estimate_tokens(output))
+        self._record_llm_call("extract", batched_text, output)
+        if parser.truncated:
+            logger.warning(f"Truncated LLM response after {len(done)} of {len(job_texts)} jobs")
+        if not done and not parser.truncated and len(unreferenced) == len(job_texts):
+            yield from enumerate(unreferenced)
+
+    def _stream_parser(self):
+        if self.output_format == "json":
+            return JsonListStreamParser()
+        return CompactStreamParser(SEMANTIC_COMPACT_FIELDS if self.rules is not None else COMPACT_FIELDS)
 
-        if self.use_translation:
-            translate_chain = self.prompts["translate"] | self.llm | StrOutputParser()
-            extract_chain = self.prompts["extract"] | self.llm | JsonOutputParser()
-            full_chain = translate_chain | extract_chain
+    def _extract_single(self, job_text: str) -> Optional[Dict]:
+        """
+        Extract one job with the single-job prompt.
+
+        Returns:
+            Optional[dict]: Extracted result, or None if the response is not a valid JSON object.
+        """
+        self._count("single_fallbacks")
+        self._wait_for_budget(job_text, ["extract_single"])
+
+        with self.metrics.timer("llm_call"):
+            message = self._call_with_retries(
+                "extract_single", lambda: (self.prompts["extract_single"] | self.llm).invoke({"text": job_text})
+            )
+        self._record_llm_call("extract_single", job_text, getattr(message, "content", message))
+        try:
+            result = JsonOutputParser().invoke(message)
+        except ValueError as e:
+            result, error = None, e
         else:
-            full_chain = self.prompts["extract"] | self.llm | JsonOutputParser()
+            error = "not a JSON object"
+            if isinstance(result, list) and len(result) == 1:
+                result = result[0]
+        if not isinstance(result, dict):
+            self._count("failed_jobs")
+            logger.error(f"Extraction failed for a single job ({error})")
+            return None
+        result.pop("job_ref", None)
+        return result
+
+    def _translate_non_english(self, job_texts: List[str], mode: str = "batch") -> List[str]:
+        """
+        Translate the jobs that are not detected as English, in one call, and merge the translations
+        back in input order. English jobs skip the translation prompt entirely.
+
+        Args:
+            job_texts (list[str]): Raw job descriptions.
+            mode (str): "batch" for the batched translation prompt, "single" for a single job.
+
+        Returns:
+            list[str]: Job texts to extract from, translated where needed.
+        """
+        languages = [detect_language(text) for text in job_texts]
+        with self._stats_lock:
+            self.language_counts.update(languages)
+        foreign = [i for i, language in enumerate(languages) if language != "en"]
+        prompt = "translate" if mode == "batch" else "translate_single"
+        saved = sum(2 * estimate_tokens(text) for text, language in zip(job_texts, languages) if language == "en")
+        if not foreign:
+            self._count("translation_calls_saved")
+            saved += self._prompt_tokens[prompt]
+        self._count("translation_tokens_saved", saved)
+        if not foreign:
+            return list(job_texts)
+
+        to_translate = [job_texts[i] for i in foreign]
+        text = self.format_jobs_for_batching(to_translate) if mode == "batch" else to_translate[0]
+        self._wait_for_budget(text, [prompt])
+        with self.metrics.timer("llm_call"):
+            translated = self._call_with_retries(
+                prompt, lambda: (self.prompts[prompt] | self.llm | StrOutputParser()).invoke({"text": text})
+            )
+        self._record_llm_call(prompt, text, translated)
+        if mode == "single":
+            return [translated]
+
+        blocks = split_batched_jobs(translated)
+        if len(blocks) == len(foreign) and all(ref is None for ref, _ in blocks):
+            blocks = [(ref, block) for ref, (_, block) in enumerate(blocks, start=1)]
+        by_ref = {ref: block for ref, block in blocks if ref is not None}
+        merged = list(job_texts)
+        for ref, i in enumerate(foreign, start=1):
+            if ref in by_ref:
+                merged[i] = by_ref[ref]
+            else:
+                logger.warning(f"Translation missing for job ref {ref}; extracting from the original text")
+        return merged
+
+    def extract_many(
+        self, batches: Iterable[Union[List[str], Tuple[List[str], List[str]]]], return_exceptions: bool = False
+    ) -> Iterator[Union[List[Optional[Dict]], Exception]]:
+        """
+        Extract several batches concurrently, keeping up to `max_concurrency` LLM calls in flight.
+
+        Batches are consumed lazily and results are yielded in input order, as soon as they and all
+        previous ones are done.
+
+        Args:
+            batches (Iterable): Batches of raw job descriptions, or (job_texts, cache_texts) pairs (see `extract`).
+            return_exceptions (bool): If True, a failed batch yields its exception instead of raising it.
 
-        return full_chain.invoke({"text": batched_text})
+        Yields:
+            list[dict | None] | Exception: Extracted results of each batch, in the order of `batches`.
+        """
+        extract = self._extract_or_error if return_exceptions else self._extract_batch
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="extract") as executor:
+            yield from ordered_map(extract, batches, executor, self.max_concurrency)
+
+    def _extract_batch(self, batch: Union[List[str], Tuple[List[str], List[str]]]) -> List[Optional[Dict]]:
+        return self.extract(*batch) if isinstance(batch, tuple) else self.extract(batch)
+
+    def _extract_or_error(
+        self, batch: Union[List[str], Tuple[List[str], List[str]]]
+    ) -> Union[List[Optional[Dict]], Exception]:
+        try:
+            return self._extract_batch(batch)
+        except Exception as e:
+            return e
+
+    def _wait_for_budget(self, batched_text: str, steps: List[str]):
+        """
+        Reserve the requests and estimated tokens of one call chain in the rate budgets.
+        Completions are assumed to be about as long as the input text.
+        """
+        if self.rate_limiter is None:
+            return
+        text_tokens = estimate_tokens(batched_text)
+        tokens = sum(self._prompt_tokens[step] + 2 * text_tokens for step in steps)
+        waited = self.rate_limiter.acquire(tokens, requests=len(steps))
+        if waited > 0.1:
+            logger.info(f"Waited {waited:.1f}s for the LLM rate budget")
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """
+    Seconds a rate-limit error asks to wait: its `retry_after` attribute, or the `Retry-After` header of
+    the HTTP response attached to it (OpenAI-compatible and Google clients), if any.
+    """
+    retry_after = getattr(error, "retry_after", None)
+    if isinstance(retry_after, (int, float)):
+        return float(retry_after)
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    try:
+        return parse_retry_after(headers.get("Retry-After")) if headers is not None else None
+    except AttributeError:
+        return None
+
+
+JOB_BLOCK_PATTERN = re.compile(r"### JOB START ###(.*?)### JOB END ###", re.DOTALL)
+JOB_REF_PATTERN = re.compile(r"^[ \t]*JOB REF:[ \t]*(\d+)[ \t]*$", re.MULTILINE)
+
+
+def split_batched_jobs(text: str) -> List[Tuple[Optional[int], str]]:
+    """
+    Split a batched text (e.g. the output of the batched translation prompt) back into jobs.
+
+    Args:
+        text (str): Jobs wrapped in `### JOB START ###` / `### JOB END ###` delimiters.
+
+    Returns:
+        list[tuple[int | None, str]]: `JOB REF` number (None if the block has none) and text of each job,
+        without the `JOB REF` line.
+    """
+    jobs = []
+    for block in JOB_BLOCK_PATTERN.findall(text):
+        match = JOB_REF_PATTERN.search(block)
+        ref = int(match.group(1)) if match else None
+        if match:
+            block = block[: match.start()] + block[match.end() :]
+        jobs.append((ref, block.strip()))
+    return jobs
@@ -0,0 +1,71 @@
+import re
+from collections import Counter
+from typing import Dict
+
+# Most frequent function words of each language; they make up a large share of any prose and
+# rarely appear in other languages, so counting them identifies the language of a posting.
+STOPWORDS = {
+    "en": (
+        "the and of to in for with on is are you our we will be as or an at by this that from your have "
+        "has it not can who what all about their they more work team experience"
+    ),
+    "fr": (
+        "le la les des du de et en un une pour dans sur avec est sont vous nous notre nos votre vos qui que "
+        "au aux par ce cette ou plus être pas sera travail équipe expérience poste l d qu"
+    ),
+    "de": (
+        "der die das und zu den von mit ist für im dem nicht ein eine auf sie wir unser unsere ihre bei "
+        "oder als auch sich werden uns du team erfahrung"
+    ),
+    "es": (
+        "el la los las de del y en un una para con por que es son se al su sus nuestro nuestra tu como "
+        "más o experiencia equipo trabajo"
+    ),
+    "it": (
+        "il lo la gli le di del della e in un una per con che è sono si al alla nostro nostra tu come più "
+        "o esperienza lavoro squadra"
+    ),
+    "nl": (
+        "de het een en van in op met voor is zijn wij je jij ons onze bij als of te dat die niet ook "
+        "ervaring werk team"
+    ),
+}
+STOPWORD_SETS = {language: frozenset(words.split()) for language, words in STOPWORDS.items()}
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+UNKNOWN = "unknown"
+
+
+def language_scores(text: str, max_chars: int = 3000) -> Dict[str, int]:
+    """
+    Count the stopwords of each supported language in (the beginning of) a text.
+
+    Args:
+        text (str): Text to score.
+        max_chars (int): Only the first `max_chars` characters are scored, which is enough for a posting.
+
+    Returns:
+        dict[str, int]: Number of stopword occurrences per language code.
+    """
+    words = Counter(WORD_PATTERN.findall(text[:max_chars].lower()))
+    return {language: sum(words[word] for word in stopwords) for language, stopwords in STOPWORD_SETS.items()}
+
+
+def detect_language(text: str, min_hits: int = 5, min_ratio: float = 1.5) -> str:
+    """
+    Identify the language of a text offline, by stopword counts.
+
+    Args:
+        text (str): Text to identify.
+        min_hits (int): Minimum number of stopwords of the best language.
+        min_ratio (float): Minimum ratio between the best and second-best language scores.
+
+    Returns:
+        str: Language code (e.g. "en", "fr"), or "unknown" if the text is too short or ambiguous.
+    """
+    ranked = sorted(language_scores(text).items(), key=lambda item: item[1], reverse=True)
+    (best, best_hits), (_, second_hits) = ranked[0], ranked[1]
+    if best_hits < min_hits or best_hits < min_ratio * second_hits:
+        return UNKNOWN
+    return best
@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from extractor.extraction_cache import normalize_job_text
+from extractor.rules import extract_experience_years
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Mersenne prime used by the universal hash family of the MinHash permutations
+_PRIME = (1 << 31) - 1
+# Seniority words of English and French titles; a near duplicate must mention the same ones
+LEVEL_RE = re.compile(
+    r"\b(?:intern(?:ship)?|stagiaire|alternance|apprentice|graduate|junior|jr|mid-level|intermediate|senior|sr|"
+    r"confirmée?|expérimentée?|lead|principal|staff|head|director|directeur|directrice|manager|chief)\b",
+    re.IGNORECASE,
+)
+
+
+def _normalized(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def role_cues(text: str, title: Optional[str] = None) -> Dict:
+    """
+    Cues of a posting that a near duplicate must share to reuse its result: seniority words, required years of
+    experience and, if given and found in the text, the extracted job title.
+
+    Args:
+        text (str): Job text.
+        title (Optional[str]): Job title extracted from the text.
+
+    Returns:
+        dict: JSON-serializable cues.
+    """
+    title = _normalized(title) if isinstance(title, str) else ""
+    return {
+        "levels": sorted({level.lower() for level in LEVEL_RE.findall(text)}),
+        "years": extract_experience_years(text)[0],
+        "title": title if title and title in _normalized(text) else "",
+    }
+
+
+def role_mismatch(cues: Dict, text: str) -> Optional[str]:
+    """
+    Returns:
+        Optional[str]: The first cue of an indexed posting ("title", "level" or "years") that `text` does not
+        share, or None if it shares them all.
+    """
+    other = role_cues(text)
+    if cues["title"] and cues["title"] not in _normalized(text):
+        return "title"
+    if cues["levels"] != other["levels"]:
+        return "level"
+    if cues["years"] != other["years"]:
+        return "years"
+    return None
+
+
+def shingles(text: str, size: int = 5) -> np.ndarray:
+    """
+    Hash the word `size`-grams of a normalized text.
+
+    Args:
+        text (str): Job text.
+        size (int): Number of words per shingle.
+
+    Returns:
+        np.ndarray: Unique 31-bit shingle hashes (int64).
+    """
+    words = re.findall(r"\w+", normalize_job_text(text).lower())
+    grams = {" ".join(words[i : i + size]) for i in range(max(1, len(words) - size + 1))}
+    hashes = [
+        int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=4).digest(), "little") % _PRIME
+        for gram in grams
+    ]
+    return np.unique(np.array(hashes, dtype=np.int64))
+
+
+class NearDuplicateIndex:
+    """
+    Persistent MinHash-LSH index of job texts, used to find postings that are near-identical to an
+    already extracted one (reposts differing only in a location line, a date or a reference number).
+
+    Each text is summarised by `num_perm` MinHash values whose agreement rate estimates the Jaccard
+    similarity of the texts' word 5-grams. Signatures are split into `bands` bands; texts sharing
+    any band are candidates, and a candidate is a match if its estimated similarity reaches `threshold` and
+    the texts share their `role_cues`, so that a senior variant of a posting, or one asking for more years
+    of experience, is not a match. Signatures, cues and band buckets live in SQLite, so the index grows
+    across runs.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.9, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        """
+        Args:
+            path (str): Path to the SQLite database file, created if missing.
+            threshold (float): Minimum estimated Jaccard similarity of a near duplicate.
+            num_perm (int): Number of MinHash values per signature; must be a multiple of `bands`.
+            bands (int): Number of LSH bands. More bands find less similar candidates.
+            seed (int): Seed of the hash permutations; must not change for an existing index.
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=num_perm).astype(np.int64)
+        self._b = rng.randint(0, _PRIME, size=num_perm).astype(np.int64)
+        self.lookups = 0
+        self.matches = 0
+        self.rejected = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in (
+            "CREATE TABLE IF NOT EXISTS signatures (job_id TEXT PRIMARY KEY, signature BLOB NOT NULL, added_at REAL, "
+            "cues TEXT)",
+            "CREATE TABLE IF NOT EXISTS bands (band INTEGER, bucket BLOB, job_id TEXT, PRIMARY KEY (band, bucket, job_id))",
+            "CREATE INDEX IF NOT EXISTS bands_job_id ON bands (job_id)",
+        ):
+            self._conn.execute(statement)
+        if "cues" not in {row[1] for row in self._conn.execute("PRAGMA table_info(signatures)")}:
+            # Jobs indexed without cues can no longer match
+            self._conn.execute("ALTER TABLE signatures ADD COLUMN cues TEXT")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: MinHash signature of a text (`num_perm` int64 values).
+        """
+        hashes = shingles(text)
+        if not hashes.size:
+            return np.full(self.num_perm, _PRIME, dtype=np.int64)
+        # a * x < 2**62, so the permutations never overflow int64
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1)
+
+    def _buckets(self, signature: np.ndarray):
+        for band in range(self.bands):
+            rows = signature[band * self.rows : (band + 1) * self.rows]
+            yield band, hashlib.blake2b(rows.tobytes(), digest_size=8).digest()
+
+    def find(self, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Find the most similar indexed job, if it is a near duplicate sharing the text's role cues.
+
+        Args:
+            text (str): Job text.
+
+        Returns:
+            Optional[Tuple[str, float]]: Job ID and estimated similarity of the best match, or None.
+        """
+        signature = self.signature(text)
+        with self._lock:
+            self.lookups += 1
+            candidates = set()
+            for band, bucket in self._buckets(signature):
+                rows = self._conn.execute(
+                    "SELECT job_id FROM bands WHERE band = ? AND bucket = ?", (band, bucket)
+                ).fetchall()
+                candidates.update(row[0] for row in rows)
+
+            best = None
+            for job_id in candidates:
+                row = self._conn.execute(
+                    "SELECT signature, cues FROM signatures WHERE job_id = ?", (job_id,)
+                ).fetchone()
+                similarity = float(np.mean(np.frombuffer(row[0], dtype=np.int64) == signature))
+                if similarity < self.threshold or (best is not None and similarity <= best[1]):
+                    continue
+                mismatch = role_mismatch(json.loads(row[1]), text) if row[1] else "cues"
+                if mismatch is not None:
+                    logger.info(f"Not reusing {job_id} (similarity {similarity:.2f}): {mismatch} cue differs")
+                    self.rejected += 1
+                    continue
+                best = (job_id, similarity)
+            self.matches += best is not None
+        return best
+
+    def add(self, job_id: str, text: str, title: Optional[str] = None):
+        """
+        Index a job text, replacing any previous entry for the same ID.
+
+        Args:
+            job_id (str): Job ID.
+            text (str): Job text.
+            title (Optional[str]): Job title extracted from the text, which near duplicates must contain.
+        """
+        signature = self.signature(text)
+        cues = json.dumps(role_cues(text, title))
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM bands WHERE job_id = ?", (job_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO signatures (job_id, signature, added_at, cues) VALUES (?, ?, ?, ?)",
+                (job_id, signature.tobytes(), time.time(), cues),
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO bands (band, bucket, job_id) VALUES (?, ?, ?)",
+                ((band, bucket, job_id) for band, bucket in self._buckets(signature)),
+            )
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: Number of lookups, near-duplicate matches, and similar candidates rejected because
+            their role cues differ, since the index was opened.
+        """
+        with self._lock:
+            return {"lookups": self.lookups, "matches": self.matches, "rejected": self.rejected}
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,357 @@
+import copy
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from extractor.language import detect_language
+
+CURRENCY_CODES = {
+    "€": "EUR",
+    "$": "USD",
+    "£": "GBP",
+    "eur": "EUR",
+    "euro": "EUR",
+    "euros": "EUR",
+    "usd": "USD",
+    "gbp": "GBP",
+    "chf": "CHF",
+}
+
+SALARY_KEYWORDS_RE = re.compile(r"salar|salaire|rémunération|remuneration|compensation|\bpay\b|package", re.IGNORECASE)
+CURRENCY_RE = re.compile(r"€|\$|£|\b(?:eur|euros?|usd|gbp|chf)\b", re.IGNORECASE)
+# `Salary:` line prepended by the scraper, after its optional `Company:` line
+SCRAPER_SALARY_RE = re.compile(r"\s*(?:Company: .*\n)?Salary: (.*)", re.IGNORECASE)
+AMOUNT_RE = re.compile(r"(\d{1,3}(?:[ ,.\u00a0\u202f]\d{3})+|\d+(?:[.,]\d+)?)\s*(k\b)?", re.IGNORECASE)
+
+
+# 401(k) retirement plans are not salaries in thousands
+RETIREMENT_PLAN_RE = re.compile(r"\b401\s?\(?k\)?", re.IGNORECASE)
+# Ranges whose "k" only follows the upper bound ("45-55k€")
+SHARED_THOUSANDS_RE = re.compile(r"(\d+(?:[.,]\d+)?)(\s*(?:-|–|à|to)\s*\d+(?:[.,]\d+)?\s*k\b)", re.IGNORECASE)
+
+
+def _parse_amount(number: str, thousands: str) -> float:
+    digits = re.sub(r"[ ,.\u00a0\u202f](?=\d{3}\b)", "", number).replace(",", ".")
+    value = float(digits)
+    return value * 1000 if thousands else value
+
+
+def _salary_of_line(line: str, min_amount: float, max_amount: float) -> Optional[Dict]:
+    line = SHARED_THOUSANDS_RE.sub(r"\1k\2", RETIREMENT_PLAN_RE.sub("", line))
+    amounts = [_parse_amount(number, thousands) for number, thousands in AMOUNT_RE.findall(line)]
+    amounts = [amount for amount in amounts if min_amount <= amount <= max_amount]
+    if not amounts:
+        return None
+    currency_match = CURRENCY_RE.search(line)
+    currency = CURRENCY_CODES[currency_match.group(0).lower()] if currency_match else ""
+    low, high = amounts[0], amounts[1] if len(amounts) > 1 else amounts[0]
+    return {"min": int(min(low, high)), "max": int(max(low, high)), "currency": currency}
+
+
+def find_salary(
+    text: str, min_amount: float = 1000, max_amount: float = 1_000_000
+) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Find the salary range of a posting and where it was found: the scraper's `Salary:` line first, then
+    lines mentioning a salary keyword, then lines only mentioning a currency ("bare currency"), which
+    are often funding rounds, revenues or benefits rather than salaries.
+
+    Amounts outside [`min_amount`, `max_amount`] (years of experience, hourly rates, funding, ...) and
+    401(k) plans are ignored.
+
+    Args:
+        text (str): Job text.
+        min_amount (float): Smallest amount accepted as a salary.
+        max_amount (float): Largest amount accepted as a salary.
+
+    Returns:
+        Tuple[Optional[dict], Optional[str]]: `min`, `max` and `currency` in the extraction schema, and
+        the source, "salary_line", "keyword" or "currency"; (None, None) if no salary is found.
+    """
+    salary_line = SCRAPER_SALARY_RE.match(text)
+    if salary_line:
+        salary = _salary_of_line(salary_line.group(1), min_amount, max_amount)
+        if salary is not None:
+            return salary, "salary_line"
+    lines = text.splitlines()
+    for source, pattern in (("keyword", SALARY_KEYWORDS_RE), ("currency", CURRENCY_RE)):
+        for line in lines:
+            if pattern.search(line):
+                salary = _salary_of_line(line, min_amount, max_amount)
+                if salary is not None:
+                    return salary, source
+    return None, None
+
+
+def extract_salary(text: str, min_amount: float = 1000, max_amount: float = 1_000_000) -> Optional[Dict]:
+    """
+    Extract the salary range of a posting from the scraper's `Salary:` line or lines mentioning a salary
+    keyword, without an LLM. See `find_salary`.
+
+    Args:
+        text (str): Job text.
+        min_amount (float): Smallest amount accepted as a salary.
+        max_amount (float): Largest amount accepted as a salary.
+
+    Returns:
+        Optional[dict]: `min`, `max` and `currency` in the extraction schema, or None if no salary is found.
+    """
+    salary, source = find_salary(text, min_amount, max_amount)
+    return salary if source in ("salary_line", "keyword") else None
+
+
+WORD_NUMBERS = {
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+    "ten": 10,
+    "un": 1,
+    "une": 1,
+    "deux": 2,
+    "trois": 3,
+    "quatre": 4,
+    "cinq": 5,
+    "sept": 7,
+    "huit": 8,
+    "neuf": 9,
+    "dix": 10,
+}
+# "stage" alone also means "phase" in English ("early-stage startup")
+_FRENCH_INTERNSHIP = r"\bstagiaire\b|\b(?:un|le|votre|du|en) stage\b|\bstage (?:de|d'|en|pfe)\b"
+_NUMBER = r"(\d{1,2}|" + "|".join(WORD_NUMBERS) + r")"
+EXPERIENCE_RE = re.compile(r"experience|expérience|exp\b|track record|background", re.IGNORECASE)
+YEARS_RANGE_RE = re.compile(
+    rf"(?:between|entre)?\s*{_NUMBER}\s*(?:-|–|to|à|a|and|et)\s*{_NUMBER}\s*\+?\s*(?:years?|yrs?|ans|années)",
+    re.IGNORECASE,
+)
+YEARS_MIN_RE = re.compile(
+    rf"(?:(?:at least|minimum( of)?|min\.?|over|more than|plus de|au moins)\s*)?{_NUMBER}\s*(\+)?\s*(?:years?|yrs?|ans|années)",
+    re.IGNORECASE,
+)
+ENTRY_LEVEL_RE = re.compile(
+    rf"\bintern(ship)?\b|{_FRENCH_INTERNSHIP}|first (job|experience)|premi[eè]re expérience|"
+    r"new grad|recent graduate|jeune diplômé|alternance|apprentice",
+    re.IGNORECASE,
+)
+
+# Working languages, as named in English and French postings
+LANGUAGES = {
+    "English": r"english|anglais",
+    "French": r"french|français|francais",
+    "German": r"german|allemand",
+    "Spanish": r"spanish|espagnol",
+    "Italian": r"italian|italien",
+    "Dutch": r"dutch|néerlandais",
+    "Portuguese": r"portuguese|portugais",
+    "Chinese": r"chinese|mandarin|chinois",
+    "Japanese": r"japanese|japonais",
+    "Arabic": r"arabic|arabe",
+}
+LANGUAGE_RES = {name: re.compile(rf"\b(?:{pattern})\b", re.IGNORECASE) for name, pattern in LANGUAGES.items()}
+LANGUAGE_CUE_RE = re.compile(
+    r"fluen|proficien|native|bilingu|speak|spoken|written|language|communicat|\b[abc][12]\b|"
+    r"courant|maîtrise|maitrise|langue|parlé|écrit|niveau|lu,? écrit",
+    re.IGNORECASE,
+)
+OPTIONAL_RE = re.compile(
+    r"a plus|is a bonus|bonus|nice to have|preferred|appreciated|ideally|"
+    r"un plus|apprécié|appreciee|souhaité|idéalement|serait un atout|un atout",
+    re.IGNORECASE,
+)
+DETECTED_LANGUAGE_NAMES = {
+    "en": "English",
+    "fr": "French",
+    "de": "German",
+    "es": "Spanish",
+    "it": "Italian",
+    "nl": "Dutch",
+}
+
+EMPLOYMENT_TYPES = {
+    "Full-time": r"full[- ]time|temps plein|temps complet",
+    "Part-time": r"part[- ]time|temps partiel|mi-temps",
+    "Internship": rf"\binternship\b|\bintern\b|{_FRENCH_INTERNSHIP}",
+    "Contract": r"\bfreelance\b|\bcontractor\b|contract (?:position|role|basis)|\bfixed[- ]term\b|\bcdd\b",
+}
+EMPLOYMENT_TYPE_RES = {name: re.compile(pattern, re.IGNORECASE) for name, pattern in EMPLOYMENT_TYPES.items()}
+
+# Fields filled by RuleExtractor, as dot-separated paths of the extraction schema
+RULE_FIELDS = ["salary", "required_experience.years", "skills.required_languages", "employment_type"]
+# Rule fields the LLM is not asked for when rules are enabled. The salary still is, as an amount found only next
+# to a currency (funding, revenue, bonuses, ...) is left to the LLM
+RULE_ONLY_FIELDS = [field for field in RULE_FIELDS if field != "salary"]
+
+
+def _clauses(text: str) -> List[str]:
+    # Sentences and list items, so that "a plus" only discards the clause it belongs to
+    return [clause for clause in re.split(r"\n|(?<=[.;!?])\s+|•", text) if clause.strip()]
+
+
+def _to_number(token: str) -> int:
+    return int(token) if token.isdigit() else WORD_NUMBERS[token.lower()]
+
+
+def extract_experience_years(text: str) -> Tuple[Dict, float]:
+    """
+    Extract the required years of experience of a posting.
+
+    Args:
+        text (str): Job text.
+
+    Returns:
+        Tuple[dict, float]: `min` and `max` years in the extraction schema (-1 if not specified) and the
+        confidence of the result.
+    """
+    candidates = []
+    for line in _clauses(text):
+        if not EXPERIENCE_RE.search(line) or OPTIONAL_RE.search(line):
+            continue
+        match = YEARS_RANGE_RE.search(line)
+        if match:
+            low, high = sorted((_to_number(match.group(1)), _to_number(match.group(2))))
+            candidates.append((low, high))
+            continue
+        match = YEARS_MIN_RE.search(line)
+        if match:
+            candidates.append((_to_number(match.group(2)), -1))
+
+    candidates = [(low, high) for low, high in candidates if 0 <= low <= 30]
+    if candidates:
+        # The strongest requirement wins when a posting lists several (e.g. per skill)
+        low, high = max(candidates)
+        return {"min": low, "max": high}, 0.9 if len(set(candidates)) == 1 else 0.7
+    if ENTRY_LEVEL_RE.search(text):
+        return {"min": 0, "max": -1}, 0.7
+    return {"min": -1, "max": -1}, 0.6
+
+
+def extract_required_languages(text: str) -> Tuple[str, float]:
+    """
+    Extract the required working languages of a posting: languages named on a line about language
+    skills, excluding those listed as a plus, or else the language the posting is written in.
+
+    Args:
+        text (str): Job text.
+
+    Returns:
+        Tuple[str, float]: Comma-separated language names and the confidence of the result.
+    """
+    required = []
+    for line in _clauses(text):
+        if not LANGUAGE_CUE_RE.search(line) or OPTIONAL_RE.search(line):
+            continue
+        required.extend(name for name, pattern in LANGUAGE_RES.items() if pattern.search(line) and name not in required)
+    if required:
+        return ", ".join(required), 0.9
+
+    detected = DETECTED_LANGUAGE_NAMES.get(detect_language(text))
+    return (detected, 0.6) if detected else ("", 0.3)
+
+
+def extract_employment_type(text: str) -> Tuple[str, float]:
+    """
+    Extract the employment type of a posting (Full-time, Part-time, Contract or Internship).
+
+    Args:
+        text (str): Job text.
+
+    Returns:
+        Tuple[str, float]: Employment type ("" if not specified) and the confidence of the result.
+    """
+    found = [name for name, pattern in EMPLOYMENT_TYPE_RES.items() if pattern.search(text)]
+    if len(found) == 1:
+        return found[0], 0.85
+    if found:
+        # Internships often also mention "full-time"; any other mix is ambiguous
+        return ("Internship", 0.7) if "Internship" in found else (found[0], 0.4)
+    return "", 0.5
+
+
+class RuleExtractor:
+    """
+    Fills the mechanical fields of the extraction schema (salary, years of experience, required languages,
+    employment type) with regular expressions and dictionaries, without an LLM.
+
+    Each field comes with a confidence in [0, 1]; fields below `min_confidence` are counted in `stats`,
+    so that low-confidence postings can be spotted.
+    """
+
+    def __init__(self, min_confidence: float = 0.7):
+        """
+        Args:
+            min_confidence (float): Confidence under which a field counts as low-confidence.
+        """
+        self.min_confidence = min_confidence
+        self.stats = {"jobs": 0, "low_confidence_fields": 0}
+        self._lock = threading.Lock()
+
+    def extract(self, text: str) -> Tuple[Dict, Dict[str, float]]:
+        """
+        Extract the rule fields of a job text.
+
+        Args:
+            text (str): Raw job text, including the `Company:` and `Salary:` lines prepended by the scraper.
+
+        Returns:
+            Tuple[dict, Dict[str, float]]: The fields in the extraction schema's nesting, without the salary
+            if its amount was only found next to a currency, and their confidence keyed by the paths of
+            `RULE_FIELDS`.
+        """
+        salary, source = find_salary(text)
+        salary_line = SCRAPER_SALARY_RE.match(text)
+        if source == "salary_line":
+            salary_confidence = 0.95 if salary["currency"] else 0.8
+        elif source == "keyword":
+            salary_confidence = 0.8
+        elif source == "currency":
+            # Amounts next to a currency alone are as often funding or revenue figures: always low-confidence
+            salary_confidence = min(0.5, 0.9 * self.min_confidence)
+        else:
+            salary = {"min": -1, "max": -1, "currency": ""}
+            salary_confidence = 0.9 if salary_line and salary_line.group(1).lower().startswith("not specified") else 0.7
+        years, years_confidence = extract_experience_years(text)
+        languages, languages_confidence = extract_required_languages(text)
+        employment_type, employment_type_confidence = extract_employment_type(text)
+
+        fields = {
+            "salary": salary,
+            "required_experience": {"years": years},
+            "skills": {"required_languages": languages},
+            "employment_type": employment_type,
+        }
+        if source == "currency":
+            # Not merged over the LLM's salary
+            del fields["salary"]
+        confidence = dict(
+            zip(RULE_FIELDS, (salary_confidence, years_confidence, languages_confidence, employment_type_confidence))
+        )
+        with self._lock:
+            self.stats["jobs"] += 1
+            self.stats["low_confidence_fields"] += sum(value < self.min_confidence for value in confidence.values())
+        return fields, confidence
+
+
+def merge_rule_fields(structured: Dict, fields: Dict) -> Dict:
+    """
+    Merge rule-extracted fields into an LLM result, in place: nested dicts are merged key by key, so the
+    LLM's other keys (e.g. `required_experience.level`) are kept.
+
+    Args:
+        structured (dict): LLM extraction result.
+        fields (dict): Output of `RuleExtractor.extract`.
+
+    Returns:
+        dict: `structured`, updated.
+    """
+    for key, value in fields.items():
+        if isinstance(value, dict) and isinstance(structured.get(key), dict):
+            merge_rule_fields(structured[key], value)
+        else:
+            structured[key] = copy.deepcopy(value)
+    return structured
@@ -0,0 +1,92 @@
+import json
+from typing import Dict, List
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class JsonListStreamParser:
+    """
+    Incremental parser for a streamed top-level JSON list of objects.
+
+    Text is fed chunk by chunk as the LLM generates it; every object of the list is returned as soon
+    as its closing brace arrives. Anything before the opening `[` (e.g. a Markdown code fence) is
+    ignored, as are items that are not objects. Objects that fail to parse are skipped and counted.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.finished = False
+        self.skipped = 0
+        self._item: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """
+        Consume the next chunk of the completion.
+
+        Args:
+            chunk (str): Text generated since the previous call.
+
+        Returns:
+            list[dict]: Objects completed by this chunk, in list order.
+        """
+        completed = []
+        for char in chunk:
+            if self.finished:
+                break
+            if not self.started:
+                self.started = char == "["
+                continue
+            if self._depth == 0:
+                # Between items: only the start of an object or the end of the list matter
+                if char == "{":
+                    self._item, self._depth = ["{"], 1
+                elif char == "]":
+                    self.finished = True
+                continue
+
+            self._item.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    item = self._parse("".join(self._item))
+                    if item is not None:
+                        completed.append(item)
+        return completed
+
+    def close(self) -> List[Dict]:
+        """
+        Signal the end of the completion. Objects are complete at their closing brace, so none is pending.
+        """
+        return []
+
+    def _parse(self, text: str):
+        try:
+            item = json.loads(text)
+        except json.JSONDecodeError as e:
+            self.skipped += 1
+            logger.warning(f"Skipping malformed object in streamed JSON list: {e}")
+            return None
+        return item
+
+    @property
+    def truncated(self) -> bool:
+        """
+        Whether the list was opened but never closed, e.g. because the completion hit its token limit.
+        """
+        return self.started and not self.finished
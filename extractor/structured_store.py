@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# SQLite's default limit on the number of parameters of a statement is 999
+_MAX_VARIABLES = 900
+
+
+class StructuredStore:
+    """
+    SQLite-backed store of structured extraction results keyed by job ID.
+
+    Results are stored as JSON under an indexed primary key, so lookups cost a B-tree search instead of
+    a scan of every cached result, and each batch of results is committed in one transaction. Use
+    `":memory:"` as path for a store that only lives as long as the run.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path to the SQLite database file, created if missing.
+        """
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS structured (job_id TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM structured").fetchone()[0]
+
+    def __contains__(self, job_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM structured WHERE job_id = ?", (job_id,)).fetchone() is not None
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Args:
+            job_id (str): LinkedIn job ID.
+
+        Returns:
+            Optional[dict]: Cached result, or None if the job is not cached.
+        """
+        return self.get_many([job_id]).get(job_id)
+
+    def get_many(self, job_ids: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Look up several jobs at once.
+
+        Args:
+            job_ids (Iterable[str]): LinkedIn job IDs.
+
+        Returns:
+            Dict[str, dict]: Cached results keyed by job ID; jobs that are not cached are missing.
+        """
+        job_ids = list(dict.fromkeys(job_ids))
+        found = {}
+        for start in range(0, len(job_ids), _MAX_VARIABLES):
+            chunk = job_ids[start : start + _MAX_VARIABLES]
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT job_id, value FROM structured WHERE job_id IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall()
+            found.update((job_id, json.loads(value)) for job_id, value in rows)
+        return found
+
+    def put(self, structured: Dict):
+        """
+        Persist one result, replacing any previous result for the same job ID.
+        """
+        self.put_many([structured])
+
+    def put_many(self, results: Iterable[Dict]):
+        """
+        Persist several results in a single transaction.
+
+        Args:
+            results (Iterable[dict]): Structured results, each with a `job_id` key.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO structured (job_id, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                (
+                    (str(structured["job_id"]), json.dumps(structured, ensure_ascii=False), now)
+                    for structured in results
+                ),
+            )
+
+    def iter_items(self, chunk_size: int = 500) -> Iterator[Tuple[str, Dict]]:
+        """
+        Stream all cached (job_id, result) pairs in insertion order.
+
+        Args:
+            chunk_size (int): Number of rows read from the database at a time.
+
+        Yields:
+            Tuple[str, dict]: A (job_id, result) pair.
+        """
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, job_id, value FROM structured WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, chunk_size),
+                ).fetchall()
+            if not rows:
+                return
+            for rowid, job_id, value in rows:
+                yield job_id, json.loads(value)
+            last_rowid = rows[-1][0]
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+def load_tinydb_documents(json_path: str) -> List[Dict]:
+    """
+    Read the documents of a TinyDB JSON file (`{"<table>": {"<doc id>": {...}}}`) without TinyDB.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        tables = json.load(f)
+    return [document for table in tables.values() for _, document in sorted(table.items(), key=lambda x: int(x[0]))]
+
+
+def migrate_json_cache(json_path: str, store: StructuredStore) -> int:
+    """
+    Import a legacy TinyDB `job_cache.json` into a store. Documents without a job ID are skipped; for a
+    job ID present several times, the last document wins.
+
+    Args:
+        json_path (str): Path to the legacy TinyDB cache.
+        store (StructuredStore): Destination store.
+
+    Returns:
+        int: Number of results imported.
+    """
+    documents = [document for document in load_tinydb_documents(json_path) if document.get("job_id")]
+    store.put_many(documents)
+    logger.info(f"Migrated {len(documents)} structured results from {json_path} to {store.path}")
+    return len(documents)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate a legacy TinyDB structured cache to the SQLite store")
+    parser.add_argument("--json-path", type=str, default="cache/job_cache.json", help="Legacy TinyDB cache")
+    parser.add_argument("--db-path", type=str, default="cache/job_cache.sqlite", help="Destination SQLite store")
+    args = parser.parse_args()
+
+    migrate_json_cache(args.json_path, StructuredStore(args.db_path))
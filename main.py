@@ -1,14 +1,41 @@
 import argparse
+import copy
+import itertools
 import os
+import tempfile
+import time
+from collections import deque
 
 import pandas as pd
 from dotenv import load_dotenv
-from tinydb import Query, TinyDB
 
+from extractor.batch_planner import BatchPlanner
+from extractor.compaction import JobTextCompactor
+from extractor.extraction_cache import ExtractionCache
 from extractor.jd_extractor import JDExtractor
+from extractor.near_duplicates import NearDuplicateIndex
+from extractor.rules import RuleExtractor, extract_salary, merge_rule_fields
+from extractor.structured_store import StructuredStore
+from extractor.structured_store import migrate_json_cache as migrate_structured_cache
+from scraper.http_client import HttpClient
 from scraper.linkedin_scraper import LinkedInScraper
-from utils.llm_loader import get_llm
+from scraper.raw_store import RawTextStore, migrate_json_cache
+from scraper.seen_store import SeenJobStore
+from utils.concurrency import ReorderBuffer, prefetch
+from utils.llm_loader import get_llm, get_rate_limits, parse_llm_options
 from utils.logger import get_logger
+from utils.metrics import NULL_METRICS, Metrics
+from utils.output_sink import OUTPUT_COLUMNS, open_output_sink
+from utils.rate_limiter import HostRateLimiter
+from utils.replay import (
+    RecordingAdapter,
+    RecordingChatModel,
+    ReplayAdapter,
+    ReplayChatModel,
+    load_run_options,
+    save_run_options,
+)
+from utils.tokens import estimate_tokens
 
 logger = get_logger(__name__)
 load_dotenv()
@@ -21,88 +48,393 @@ def run_scraping_pipeline(
     batch_size,
     prompt_dir,
     out_csv="scraped_jobs.csv",
-    raw_cache_path="cache/raw_job_texts.json",
-    structured_cache_path="cache/job_cache.json",
+    raw_cache_path="cache/raw_job_texts.sqlite",
+    structured_cache_path="cache/job_cache.sqlite",
     llm_name=None,
     save_raw_job_text=False,
     use_translation=False,
     load_from_cache=False,
+    max_workers=1,
+    requests_per_second=2.0,
+    queue_depth=4,
+    queries=None,
+    seen_cache_path=None,
+    incremental=False,
+    report_disappeared=False,
+    llm=None,
+    http_client=None,
+    llm_concurrency=1,
+    llm_requests_per_minute=None,
+    llm_tokens_per_minute=None,
+    token_budget=None,
+    extraction_cache_path=None,
+    extraction_cache_size=100_000,
+    extraction_cache_ttl=None,
+    compact_text=True,
+    compaction_path=None,
+    near_duplicate_path=None,
+    near_duplicate_threshold=None,
+    rederive_salary=True,
+    rule_fields=False,
+    output_format="json",
+    resume_output=False,
+    output_file_format=None,
+    metrics=None,
 ):
     """
     Orchestrate scraping, caching, and structured extraction of job descriptions.
 
     Workflow:
       1. Initialize scraper with raw cache settings.
-      2. Fetch or load raw job texts in batches.
+      2. Fetch or load raw job texts in batches on a background thread, overlapping with extraction.
       3. Use JDExtractor (with optional translation) to extract structured info.
-      4. Cache structured results in TinyDB to avoid re-processing.
+      4. Cache structured results in SQLite to avoid re-processing.
       5. Save all extracted entries to a CSV file.
 
     Args:
         title (str): Job title to search (e.g., "Data Scientist").
         location (str): Job location to search (e.g., "Paris").
         max_pages (int): Maximum paginated pages to retrieve job IDs.
-        batch_size (int): Number of job descriptions to process per batch.
+        batch_size (int): Maximum number of job descriptions per LLM request (also the scraping batch size).
         prompt_dir (str): Directory containing LangChain prompt templates.
         out_csv (str): Output CSV path for structured results.
-        raw_cache_path (Optional[str]): Path to JSON cache of raw job texts, or None to disable.
-        structured_cache_path (Optional[str]): Path to TinyDB JSON cache for structured results, or None to disable.
+        raw_cache_path (Optional[str]): Path to the SQLite store of raw job texts, or None to disable.
+        structured_cache_path (Optional[str]): Path to the SQLite store of structured results, or None to disable.
+            A legacy TinyDB cache with the same name and a `.json` extension is imported on first use.
         llm_name (Optional[str]): Identifier for the LLM model to use (e.g., "gemini-2.0-flash").
         save_raw_job_text (bool): If True, include the original job text in the CSV output.
         use_translation (bool): If True, translate non-English JDs to English before extraction.
         load_from_cache (bool): If True, skip live scraping and load raw texts from cache.
+        max_workers (int): Maximum number of job descriptions fetched concurrently.
+        requests_per_second (float): Request rate allowed per LinkedIn host, shared by all fetch workers.
+        queue_depth (int): Maximum number of scraped batches waiting for extraction.
+        queries (Optional[List[Tuple[str, str]]]): Several (title, location) searches to run as one job,
+            replacing `title` and `location`. Jobs are deduplicated across queries and the output gets a
+            `matched_queries` column.
+        seen_cache_path (Optional[str]): Path to the SQLite record of job IDs seen by previous runs, or None to disable.
+        incremental (bool): If True, only process jobs whose result no previous run has saved (requires
+            `seen_cache_path`).
+        report_disappeared (bool): If True with `incremental`, crawl all pages and save the jobs that are no longer
+            listed next to the output file.
+        llm (Optional[BaseLanguageModel]): LLM instance to use instead of loading `llm_name`.
+        http_client (Optional[HttpClient]): HTTP client for the scraper, e.g. one recording or replaying fixtures.
+        llm_concurrency (int): Maximum number of batches sent to the LLM concurrently.
+        llm_requests_per_minute (Optional[float]): LLM request budget. Defaults to the quota of `llm_name`; 0 disables it.
+        llm_tokens_per_minute (Optional[float]): LLM token budget. Defaults to the quota of `llm_name`; 0 disables it.
+        token_budget (Optional[int]): Maximum estimated input + output tokens per LLM request; jobs are packed
+            up to this budget and `batch_size`. If None, batches are formed by count only.
+        extraction_cache_path (Optional[str]): Path to the SQLite extraction cache keyed by raw job text, prompt and
+            model.
+        extraction_cache_size (Optional[int]): Maximum number of cached extractions (least recently used evicted).
+        extraction_cache_ttl (Optional[float]): Lifetime of a cached extraction in seconds, unlimited if None.
+        compact_text (bool): If True, drop boilerplate and lines repeated across postings before extraction.
+        compaction_path (Optional[str]): Path to the SQLite line counts learned by compaction, which grow with every
+            scraped batch and are kept across runs. If None, counts are kept in memory for the run.
+        near_duplicate_path (Optional[str]): Path to the SQLite near-duplicate index. If set with
+            `near_duplicate_threshold`, jobs nearly identical to an already extracted one, with the same title,
+            seniority and years of experience, reuse its result instead of calling the LLM.
+        near_duplicate_threshold (Optional[float]): Minimum estimated Jaccard similarity of a near duplicate; None
+            (the default) or 0 disables near-duplicate reuse.
+        rederive_salary (bool): If True, the salary of a reused result is re-extracted from the job text by rules
+            (the other rule fields always are); otherwise the original's salary is kept.
+        rule_fields (bool): If True, salary, years of experience, required languages and employment type are
+            extracted by rules (also for reused results), and the LLM is only asked for the other fields.
+        output_format (str): Batch completion format, "json" or "compact" (positional rows, fewer output tokens).
+        resume_output (bool): If True, continue `out_csv` from its last checkpoint instead of overwriting it.
+        output_file_format (Optional[str]): "csv", "jsonl" or "parquet" (typed nested columns, requires pyarrow);
+            None to infer it from the extension of `out_csv`.
+        metrics (Optional[Metrics]): Run metrics (counters and per-stage timers) to record, e.g. for `--profile`.
     """
-    llm = get_llm(llm_name)
+    metrics = metrics or NULL_METRICS
+    llm = llm or get_llm(llm_name)
 
-    os.makedirs(os.path.dirname(raw_cache_path), exist_ok=True)
+    raw_store = RawTextStore(raw_cache_path) if raw_cache_path else None
+    if raw_store is not None:
+        # One-shot import of the legacy JSON cache sitting next to an empty store
+        legacy_raw_cache_path = os.path.splitext(raw_cache_path)[0] + ".json"
+        if os.path.exists(legacy_raw_cache_path) and not len(raw_store):
+            migrate_json_cache(legacy_raw_cache_path, raw_store)
+    seen_store = SeenJobStore(seen_cache_path) if seen_cache_path else None
     scraper = LinkedInScraper(
         title=title,
         location=location,
         max_pages=max_pages,
         batch_size=batch_size,
-        raw_cache_path=raw_cache_path,
+        raw_store=raw_store,
         load_from_cache=load_from_cache,
+        max_workers=max_workers,
+        requests_per_second=requests_per_second,
+        queries=queries,
+        http_client=http_client,
+        seen_store=seen_store,
+        incremental=incremental,
+        report_disappeared=report_disappeared,
+        metrics=metrics,
     )
-    scraper.start_scraping()
-    extractor = JDExtractor(prompt_dir, llm=llm, use_translation=use_translation)
-    db = TinyDB(structured_cache_path)
-    db_query = Query()
+    if http_client is not None and metrics.enabled:
+        http_client.metrics = metrics
+    requests_per_minute, tokens_per_minute = get_rate_limits(llm_name, llm_requests_per_minute, llm_tokens_per_minute)
+    extractor = JDExtractor(
+        prompt_dir,
+        llm=llm,
+        use_translation=use_translation,
+        max_concurrency=llm_concurrency,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+        cache=(
+            ExtractionCache(extraction_cache_path, max_entries=extraction_cache_size, ttl=extraction_cache_ttl)
+            if extraction_cache_path
+            else None
+        ),
+        use_rules=rule_fields,
+        output_format=output_format,
+        metrics=metrics,
+    )
+    compactor = None
+    if compact_text:
+        compactor = JobTextCompactor(compaction_path or ":memory:")
+        if raw_store is not None and not len(compactor):
+            # One-shot import of the postings scraped before the line counts were kept; later runs only count
+            # the batches they scrape
+            logger.info(
+                f"Learned repeated lines from {compactor.fit(text for _, text in raw_store.iter_items())} "
+                "cached postings"
+            )
+    near_duplicates = (
+        NearDuplicateIndex(near_duplicate_path, threshold=near_duplicate_threshold)
+        if near_duplicate_path and near_duplicate_threshold
+        else None
+    )
+    # Reused results get the rule fields of their own text
+    reuse_rules = extractor.rules or RuleExtractor()
+    reuse_stats = {"jobs": 0, "tokens": 0}
+    planner = BatchPlanner.for_extractor(extractor, token_budget=token_budget, max_jobs=batch_size)
+    # Without a cache path, results are still kept for the run, so near duplicates can reuse them
+    db = StructuredStore(structured_cache_path or ":memory:")
+    if structured_cache_path:
+        legacy_structured_cache_path = os.path.splitext(structured_cache_path)[0] + ".json"
+        if os.path.exists(legacy_structured_cache_path) and not len(db):
+            migrate_structured_cache(legacy_structured_cache_path, db)
+
+    columns = (
+        OUTPUT_COLUMNS + (["raw_job_text"] if save_raw_job_text else []) + (["matched_queries"] if queries else [])
+    )
+    sink = open_output_sink(out_csv, columns=columns, resume=resume_output, file_format=output_file_format)
+    # Results are written in the order jobs were scraped, whatever order they complete in
+    sequence = itertools.count()
+    order = ReorderBuffer()
+    ready = []
+
+    def emit(seq, structured):
+        ready.extend(order.add(seq, with_queries(structured) if structured is not None else None))
+
+    def flush():
+        with metrics.timer("output_write"):
+            sink.write_batch(ready)
+        if seen_store is not None:
+            # Only jobs whose result is persisted count as seen: failed jobs are retried by the next run
+            seen_store.mark_processed(structured["job_id"] for structured in ready)
+        ready.clear()
 
-    results = []
+    def with_queries(structured):
+        if not queries:
+            return structured
+        return {**structured, "matched_queries": "; ".join(scraper.job_queries.get(structured["job_id"], []))}
 
-    for i, batch in enumerate(scraper):
-        logger.info(f"Processing batch #{i + 1} with {len(batch)} jobs")
+    # (batch number, job IDs, texts, prompt texts, sequence numbers) of the batches handed to the extractor
+    pending = deque()
 
-        # Split job IDs and texts
-        job_ids, job_texts = zip(*batch)
+    def pairs_to_extract():
+        scraped = metrics.iter_timed("stage_scrape_wait", prefetch(scraper, max_queue_size=queue_depth))
+        for i, batch in enumerate(scraped):
+            logger.info(f"Scraped batch #{i + 1} with {len(batch)} jobs")
+            if compactor is not None:
+                # Count the batch's lines before compacting it, so that even a first run learns repeated lines
+                compactor.observe_many(text for _, text in batch)
+            with metrics.timer("structured_cache_io"):
+                cached = db.get_many(jid for jid, _ in batch)
+            for jid, text in batch:
+                if jid in sink.written_ids:
+                    continue
+                seq = next(sequence)
+                # Filter out already cached
+                if jid in cached:
+                    metrics.inc("structured_cache_hits")
+                    logger.info(f"Cached result for job ID {jid}")
+                    emit(seq, cached[jid])
+                    continue
+                metrics.inc("structured_cache_misses")
+                prompt_text = text
+                if compactor is not None:
+                    prompt_text = compactor.compact(text)
+                    logger.info(
+                        f"Compacted job ID {jid}: {estimate_tokens(text)} -> {estimate_tokens(prompt_text)} tokens"
+                    )
+                if near_duplicates is not None:
+                    reused = reuse_near_duplicate(jid, text, prompt_text)
+                    if reused is not None:
+                        emit(seq, reused)
+                        continue
+                yield jid, text, prompt_text, seq
+            flush()
 
-        # Filter out already cached
-        ids_to_extract, texts_to_extract = [], []
-        for jid, text in zip(job_ids, job_texts):
-            if db.contains(db_query.job_id == jid):
-                logger.info(f"Cached result for job ID {jid}")
-                results.append(db.get(db_query.job_id == jid))
+    def reuse_near_duplicate(jid, text, prompt_text):
+        # Signatures are computed on raw texts, so that matches do not depend on what compaction learned
+        match = near_duplicates.find(text)
+        original = db.get(match[0]) if match else None
+        if original is None:
+            return None
+        logger.info(f"Job ID {jid} is a near duplicate of {match[0]} (similarity {match[1]:.2f}); reusing its result")
+        structured = copy.deepcopy(original)
+        structured["job_id"] = jid
+        structured.pop("raw_job_text", None)
+        if save_raw_job_text:
+            structured["raw_job_text"] = text
+        fields = reuse_rules.extract(text)[0]
+        if rederive_salary:
+            # The original's salary may be another posting's: without one in this text, leave it unspecified
+            fields["salary"] = extract_salary(text) or {"min": -1, "max": -1, "currency": ""}
+        else:
+            fields.pop("salary", None)
+        merge_rule_fields(structured, fields)
+        with metrics.timer("structured_cache_io"):
+            db.put(structured)
+        metrics.inc("near_duplicate_reuses")
+        reuse_stats["jobs"] += 1
+        reuse_stats["tokens"] += 2 * estimate_tokens(prompt_text)
+        return structured
+
+    def batches_to_extract():
+        for i, batch in enumerate(planner.plan(pairs_to_extract(), text=lambda job: job[2])):
+            ids_to_extract, texts_to_extract, prompt_texts, seqs = map(list, zip(*batch))
+            pending.append((i, ids_to_extract, texts_to_extract, prompt_texts, seqs))
+            # Extractions are cached by raw text, which, unlike the compacted text, does not change as the line
+            # counts grow
+            yield prompt_texts, texts_to_extract
+
+    extracted_batches = metrics.iter_timed(
+        "stage_extract_wait", extractor.extract_many(batches_to_extract(), return_exceptions=True)
+    )
+    try:
+        for extracted_batch in extracted_batches:
+            i, ids_to_extract, texts_to_extract, prompt_texts, seqs = pending.popleft()
+            outcomes = [None] * len(seqs)
+            if isinstance(extracted_batch, Exception):
+                metrics.inc("failed_batches")
+                logger.error(f"Batch #{i + 1} failed: {extracted_batch}")
             else:
-                ids_to_extract.append(jid)
-                texts_to_extract.append(text)
+                try:
+                    for j, (jid, text, structured) in enumerate(zip(ids_to_extract, texts_to_extract, extracted_batch)):
+                        if structured is None:
+                            metrics.inc("failed_jobs")
+                            logger.error(f"Extraction failed for job ID {jid}")
+                            continue
+                        structured["job_id"] = jid
+                        if save_raw_job_text:
+                            structured["raw_job_text"] = text
+                        outcomes[j] = structured
+                    # One transaction per batch
+                    with metrics.timer("structured_cache_io"):
+                        db.put_many(structured for structured in outcomes if structured is not None)
+                    if near_duplicates is not None:
+                        for structured, text in zip(outcomes, texts_to_extract):
+                            if structured is not None:
+                                near_duplicates.add(structured["job_id"], text, structured.get("title"))
+                except Exception as e:
+                    metrics.inc("failed_batches")
+                    logger.error(f"Batch #{i + 1} failed: {e}")
+                    outcomes = [None] * len(seqs)
+            for seq, structured in zip(seqs, outcomes):
+                emit(seq, structured)
+            flush()
+    finally:
+        flush()
+        sink.close()
+
+    if compactor is not None:
+        logger.info(f"Text compaction: {compactor.summary()}")
+    packing = planner.summary()
+    logger.info(f"Batch packing: {packing}")
+    if near_duplicates is not None:
+        calls_avoided = reuse_stats["jobs"] / packing["jobs_per_batch"] if packing["jobs_per_batch"] else 0.0
+        logger.info(
+            f"Near duplicates: reused {reuse_stats['jobs']} results ({near_duplicates.summary()}), "
+            f"avoiding ~{reuse_stats['tokens']} LLM tokens and ~{calls_avoided:.1f} LLM calls"
+        )
+    logger.info(f"Extraction calls: {extractor.stats}")
+    if extractor.rules is not None:
+        logger.info(f"Rule fields: {extractor.rules.stats}")
+    if use_translation:
+        logger.info(f"Detected languages: {dict(extractor.language_counts)}")
+    if extractor.cache is not None:
+        logger.info(f"Extraction cache: {extractor.cache.summary()}")
+
+    logger.info(f"Saved {sink.rows} job entries to {out_csv}")
+
+    if scraper.disappeared_job_ids:
+        disappeared_csv = os.path.splitext(out_csv)[0] + "_disappeared.csv"
+        disappeared = [
+            {"query": query, "job_id": job_id}
+            for query, job_ids in scraper.disappeared_job_ids.items()
+            for job_id in job_ids
+        ]
+        pd.DataFrame(disappeared, columns=["query", "job_id"]).to_csv(disappeared_csv, index=False)
+        logger.info(f"Saved {len(disappeared)} disappeared job IDs to {disappeared_csv}")
+
+
+def build_fixture_clients(mode, fixture_dir, llm_name, requests_per_second, max_workers):
+    """
+    Build an HTTP client and LLM that record live traffic to, or replay it from, a fixture directory.
+
+    Args:
+        mode (str): "record" or "replay".
+        fixture_dir (str): Fixture root directory.
+        llm_name (str): LLM model wrapped when recording.
+        requests_per_second (float): Request rate limit per host when recording.
+        max_workers (int): Number of concurrent fetch workers, used to size the connection pool.
+
+    Returns:
+        Tuple[HttpClient, BaseChatModel]: HTTP client and LLM to pass to `run_scraping_pipeline`.
+    """
+    pool_size = max(10, max_workers)
+    if mode == "record":
+        http_client = HttpClient(rate_limiter=HostRateLimiter(requests_per_second), pool_size=pool_size)
+        http_client.mount(RecordingAdapter(fixture_dir, pool_connections=pool_size, pool_maxsize=pool_size))
+        return http_client, RecordingChatModel(inner=get_llm(llm_name), fixture_dir=fixture_dir)
+    http_client = HttpClient(rate_limiter=HostRateLimiter(1000.0), pool_size=pool_size)
+    http_client.mount(ReplayAdapter(fixture_dir))
+    return http_client, ReplayChatModel(fixture_dir=fixture_dir)
+
+
+def load_queries(path):
+    """
+    Read (title, location) queries from a text file with one `title | location` per line.
+    Blank lines and lines starting with `#` are ignored.
+
+    Args:
+        path (str): Path to the query file.
 
-        if not texts_to_extract:
-            continue
+    Returns:
+        List[Tuple[str, str]]: Parsed queries, in file order.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return [parse_query(line) for line in f if line.strip() and not line.lstrip().startswith("#")]
 
-        try:
-            extracted_batch = extractor.extract(texts_to_extract)
-            for jid, text, structured in zip(ids_to_extract, texts_to_extract, extracted_batch):
-                structured["job_id"] = jid
-                if save_raw_job_text:
-                    structured["raw_job_text"] = text
-                results.append(structured)
-                db.insert(structured)
-        except Exception as e:
-            logger.error(f"Batch #{i + 1} failed: {e}")
 
-    df = pd.DataFrame(results)
-    df.to_csv(out_csv, index=False)
-    logger.info(f"Saved {len(df)} job entries to {out_csv}")
+def parse_query(value):
+    """
+    Parse a `title | location` query string.
+
+    Args:
+        value (str): Query string.
+
+    Returns:
+        Tuple[str, str]: (title, location).
+    """
+    title, sep, location = value.partition("|")
+    if not sep or not title.strip() or not location.strip():
+        raise ValueError(f"Invalid query '{value.strip()}', expected 'title | location'")
+    return title.strip(), location.strip()
 
 
 if __name__ == "__main__":
@@ -112,14 +444,34 @@ if __name__ == "__main__":
     parser.add_argument("--max-pages", type=int, default=600)
     parser.add_argument("--prompt-dir", type=str, default="extractor/prompts")
     parser.add_argument("--output", type=str, default="scraped_jobs.csv")
-    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=20,
+        help="Maximum number of jobs per LLM request and per scraping batch (default 20, was 5 before --token-budget)",
+    )
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        default=12000,
+        help="Maximum estimated input + output tokens per LLM request (0 to batch by --batch-size only)",
+    )
     parser.add_argument("--cache-dir", type=str, default="cache", help="Base directory for all cache files")
     parser.add_argument("--disable-raw-cache", action="store_true", help="Disable caching of raw scraped job texts")
     parser.add_argument(
         "--disable-structured-cache", action="store_true", help="Disable caching of structured extracted jobs"
     )
     parser.add_argument(
-        "--llm", type=str, default="gemini-2.0-flash", help="LLM model name (currently only gemini supported)"
+        "--llm",
+        type=str,
+        default="gemini-2.0-flash",
+        help="LLM model name: a gemini model, fake, simulated or openai-compatible:<model>",
+    )
+    parser.add_argument(
+        "--llm-option",
+        action="append",
+        metavar="KEY=VALUE",
+        help="Option passed to the LLM backend (e.g. latency=1.5 for simulated, base_url=... for openai-compatible)",
     )
     parser.add_argument(
         "--save-raw-job-text", action="store_true", help="Whether to include raw job text in the output CSV"
@@ -129,26 +481,208 @@ if __name__ == "__main__":
         action="store_true",
         help="Whether to translate job descriptions to English before extraction",
     )
+    parser.add_argument(
+        "--extraction-cache-size", type=int, default=100_000, help="Maximum number of cached LLM extractions"
+    )
+    parser.add_argument(
+        "--extraction-cache-ttl-days", type=float, help="Days after which a cached LLM extraction is recomputed"
+    )
+    parser.add_argument(
+        "--no-compaction", action="store_true", help="Send job texts to the LLM without removing boilerplate"
+    )
+    parser.add_argument(
+        "--rule-fields",
+        action="store_true",
+        help="Extract salary, experience years, required languages and employment type with rules, not the LLM",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profile.json",
+        metavar="PATH",
+        help="Record per-stage counters and timers and save a JSON summary (default path: profile.json)",
+    )
+    parser.add_argument(
+        "--profile-prometheus", type=str, metavar="PATH", help="Also save the profile in Prometheus text format"
+    )
+    parser.add_argument(
+        "--output-file-format",
+        choices=["csv", "jsonl", "parquet"],
+        help="Format of the output file (default: from its extension; parquet requires pyarrow)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the output file from its last checkpoint instead of overwriting it",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=["json", "compact"],
+        default="json",
+        help="LLM batch output format: JSON objects, or compact '|'-separated rows (fewer output tokens)",
+    )
+    parser.add_argument(
+        "--near-duplicate-threshold",
+        type=float,
+        default=None,
+        help="Similarity above which a job reuses the result of a near-identical one with the same title, seniority "
+        "and years of experience (e.g. 0.9; off by default)",
+    )
     parser.add_argument("--load-from-cache", action="store_true", help="Whether to load job descriptions from cache")
+    parser.add_argument(
+        "--max-workers", type=int, default=1, help="Maximum number of job descriptions fetched concurrently"
+    )
+    parser.add_argument("--requests-per-second", type=float, default=2.0, help="Request rate limit per LinkedIn host")
+    parser.add_argument(
+        "--query",
+        type=parse_query,
+        action="append",
+        help="A 'title | location' search; repeat to run several queries as one job (overrides --title/--location)",
+    )
+    parser.add_argument(
+        "--queries-file",
+        type=str,
+        help="File with one 'title | location' query per line (overrides --title/--location)",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true", help="Only scrape and extract jobs not seen by previous runs"
+    )
+    parser.add_argument(
+        "--report-disappeared",
+        action="store_true",
+        help="With --incremental, crawl all pages and save the jobs no longer listed",
+    )
+    parser.add_argument(
+        "--llm-concurrency", type=int, default=4, help="Maximum number of batches sent to the LLM concurrently"
+    )
+    parser.add_argument(
+        "--llm-rpm", type=float, help="LLM requests per minute (defaults to the model's quota, 0 for unlimited)"
+    )
+    parser.add_argument(
+        "--llm-tpm", type=float, help="LLM tokens per minute (defaults to the model's quota, 0 for unlimited)"
+    )
+    fixtures_group = parser.add_mutually_exclusive_group()
+    fixtures_group.add_argument(
+        "--record-fixtures", type=str, help="Record HTTP responses and LLM completions into this directory"
+    )
+    fixtures_group.add_argument(
+        "--replay-fixtures", type=str, help="Replay HTTP responses and LLM completions from this directory (offline)"
+    )
+    parser.add_argument(
+        "--queue-depth", type=int, default=4, help="Maximum number of scraped batches waiting for extraction"
+    )
 
     args = parser.parse_args()
 
+    queries = (load_queries(args.queries_file) if args.queries_file else []) + (args.query or [])
+
     # Derive cache paths from cache directory and disable flags
     cache_dir = args.cache_dir
-    raw_cache = None if args.disable_raw_cache else os.path.join(cache_dir, "raw_job_texts.json")
-    structured_cache = None if args.disable_structured_cache else os.path.join(cache_dir, "job_cache.json")
-
-    run_scraping_pipeline(
-        title=args.title,
-        location=args.location,
-        max_pages=args.max_pages,
-        prompt_dir=args.prompt_dir,
-        out_csv=args.output,
-        raw_cache_path=raw_cache,
-        structured_cache_path=structured_cache,
-        batch_size=args.batch_size,
-        llm_name=args.llm,
-        save_raw_job_text=args.save_raw_job_text,
-        use_translation=args.use_translation,
-        load_from_cache=args.load_from_cache,
+    fixture_dir = args.record_fixtures or args.replay_fixtures
+    if fixture_dir:
+        # LLM fixtures are keyed by the batched prompt: start from empty caches, so that which jobs get
+        # batched (and how their text is compacted) does not depend on earlier runs. The extraction cache
+        # and near-duplicate index are off too, since their hits within a run depend on which concurrent
+        # batches completed first.
+        cache_dir = tempfile.mkdtemp(prefix="careerflow-fixtures-")
+        args.near_duplicate_threshold = 0
+        logger.info(f"Using empty caches in {cache_dir} for the fixture run, without extraction cache")
+        run_options = {
+            "title": args.title,
+            "location": args.location,
+            "max_pages": args.max_pages,
+            "queries": queries or None,
+            "batch_size": args.batch_size,
+            "token_budget": args.token_budget or None,
+            "use_translation": args.use_translation,
+            "compact_text": not args.no_compaction,
+            "near_duplicate_threshold": args.near_duplicate_threshold,
+            "rule_fields": args.rule_fields,
+            "output_format": args.output_format,
+        }
+        if args.record_fixtures:
+            save_run_options(fixture_dir, run_options)
+        else:
+            recorded_options = load_run_options(fixture_dir)
+            for name, value in recorded_options.items():
+                if run_options.get(name) != value:
+                    logger.warning(
+                        f"Fixtures were recorded with {name}={value!r}, replaying with {run_options.get(name)!r}"
+                    )
+    raw_cache = None if args.disable_raw_cache else os.path.join(cache_dir, "raw_job_texts.sqlite")
+    structured_cache = None if args.disable_structured_cache else os.path.join(cache_dir, "job_cache.sqlite")
+    seen_cache = os.path.join(cache_dir, "seen_jobs.sqlite")
+    extraction_cache = (
+        None if args.disable_structured_cache or fixture_dir else os.path.join(cache_dir, "extractions.sqlite")
+    )
+    compaction_store = None if args.no_compaction else os.path.join(cache_dir, "compaction.sqlite")
+    near_duplicate_index = (
+        None
+        if args.disable_structured_cache or not args.near_duplicate_threshold
+        else os.path.join(cache_dir, "near_duplicates.sqlite")
     )
+
+    http_client, llm = None, None
+    if args.record_fixtures or args.replay_fixtures:
+        http_client, llm = build_fixture_clients(
+            "record" if args.record_fixtures else "replay",
+            fixture_dir,
+            args.llm,
+            args.requests_per_second,
+            args.max_workers,
+        )
+    elif args.llm_option:
+        llm = get_llm(args.llm, **parse_llm_options(args.llm_option))
+
+    metrics = Metrics() if args.profile or args.profile_prometheus else None
+    start = time.perf_counter()
+    try:
+        run_scraping_pipeline(
+            title=args.title,
+            location=args.location,
+            max_pages=args.max_pages,
+            prompt_dir=args.prompt_dir,
+            out_csv=args.output,
+            raw_cache_path=raw_cache,
+            structured_cache_path=structured_cache,
+            batch_size=args.batch_size,
+            llm_name=args.llm,
+            save_raw_job_text=args.save_raw_job_text,
+            use_translation=args.use_translation,
+            load_from_cache=args.load_from_cache,
+            max_workers=args.max_workers,
+            requests_per_second=args.requests_per_second,
+            queue_depth=args.queue_depth,
+            queries=queries or None,
+            seen_cache_path=seen_cache,
+            incremental=args.incremental,
+            report_disappeared=args.report_disappeared,
+            llm=llm,
+            http_client=http_client,
+            llm_concurrency=args.llm_concurrency,
+            token_budget=args.token_budget or None,
+            # replayed completions are not subject to the model's quota
+            llm_requests_per_minute=0 if args.replay_fixtures and args.llm_rpm is None else args.llm_rpm,
+            llm_tokens_per_minute=0 if args.replay_fixtures and args.llm_tpm is None else args.llm_tpm,
+            extraction_cache_path=extraction_cache,
+            extraction_cache_size=args.extraction_cache_size,
+            extraction_cache_ttl=args.extraction_cache_ttl_days * 86400 if args.extraction_cache_ttl_days else None,
+            compact_text=not args.no_compaction,
+            compaction_path=compaction_store,
+            near_duplicate_path=near_duplicate_index,
+            near_duplicate_threshold=args.near_duplicate_threshold,
+            rule_fields=args.rule_fields,
+            output_format=args.output_format,
+            resume_output=args.resume,
+            output_file_format=args.output_file_format,
+            metrics=metrics,
+        )
+    finally:
+        if metrics is not None:
+            metrics.observe("stage_total", time.perf_counter() - start)
+            if args.profile:
+                metrics.write_json(args.profile)
+                logger.info(f"Saved profile to {args.profile}")
+            if args.profile_prometheus:
+                metrics.write_prometheus(args.profile_prometheus)
+                logger.info(f"Saved Prometheus metrics to {args.profile_prometheus}")
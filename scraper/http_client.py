@@ -0,0 +1,226 @@
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+from utils.logger import get_logger
+from utils.metrics import NULL_METRICS, Metrics
+from utils.rate_limiter import HostRateLimiter, parse_retry_after
+from utils.stats import percentile
+
+logger = get_logger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    # urllib3 advertises "br" only when a brotli decoder is installed
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Connection": "keep-alive",
+}
+
+
+class RequestStats:
+    """
+    Thread-safe accumulator for HTTP request latencies, retries and throttling.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        self.latencies: List[float] = []
+        self.rate_limit_wait = 0.0
+        self.backoff_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, rate_limit_wait: float):
+        """
+        Record one HTTP attempt.
+
+        Args:
+            latency (float): Time from sending the request to receiving the full response, in seconds.
+            rate_limit_wait (float): Time spent waiting on the rate limiter before sending it, in seconds.
+        """
+        with self._lock:
+            self.requests += 1
+            self.latencies.append(latency)
+            self.rate_limit_wait += rate_limit_wait
+
+    def record_retry(self, backoff: float, throttled: bool):
+        """
+        Record a retry and the backoff slept before it.
+        """
+        with self._lock:
+            self.retries += 1
+            self.backoff_wait += backoff
+            self.throttled += int(throttled)
+
+    def record_failure(self):
+        """
+        Record a request that failed after exhausting its retries.
+        """
+        with self._lock:
+            self.failures += 1
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: Request counts, latency percentiles (seconds) and total wait times (seconds).
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "failures": self.failures,
+                "latency_p50": round(percentile(self.latencies, 0.5), 3),
+                "latency_p95": round(percentile(self.latencies, 0.95), 3),
+                "latency_total": round(sum(self.latencies), 3),
+                "rate_limit_wait": round(self.rate_limit_wait, 3),
+                "backoff_wait": round(self.backoff_wait, 3),
+            }
+
+
+class HttpClient:
+    """
+    Pooled HTTP client for the scraper.
+
+    Reuses keep-alive connections through a shared requests.Session, accepts compressed responses,
+    retries transient failures with jittered exponential backoff (honouring `Retry-After`) and slows
+    the per-host request rate down when the server starts throttling.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        pool_size: int = 10,
+        max_retries: int = 4,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        timeout: float = 10,
+        headers: Optional[Dict[str, str]] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        """
+        Args:
+            rate_limiter (Optional[HostRateLimiter]): Shared per-host limiter. Defaults to 2 requests/second per host.
+            pool_size (int): Maximum number of pooled connections per host; should be at least the number of workers.
+            max_retries (int): Number of retries after the first attempt.
+            backoff_base (float): Base backoff delay in seconds, doubled on every retry.
+            backoff_max (float): Upper bound of the backoff delay in seconds.
+            timeout (float): Per-request timeout in seconds.
+            headers (Optional[Dict[str, str]]): Extra headers sent with every request.
+            metrics (Optional[Metrics]): Run metrics (`http_requests`, `http_retries`, `http_failures` counters,
+                `http_fetch` timer). Can be replaced later through the `metrics` attribute.
+        """
+        self.rate_limiter = rate_limiter or HostRateLimiter(2.0)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.stats = RequestStats()
+        self.metrics = metrics or NULL_METRICS
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.headers.update(headers or {})
+        self.mount(HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0))
+
+    def mount(self, adapter: BaseAdapter):
+        """
+        Use a transport adapter for all HTTP and HTTPS requests, e.g. to record or replay fixtures.
+
+        Args:
+            adapter (BaseAdapter): Transport adapter.
+        """
+        self.adapter = adapter
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url: str) -> Optional[requests.Response]:
+        """
+        GET a URL, retrying transient errors.
+
+        Args:
+            url (str): URL to fetch.
+
+        Returns:
+            Optional[requests.Response]: Successful response, or None if the request failed
+            permanently or after all retries.
+        """
+        for attempt in range(self.max_retries + 1):
+            waited = self.rate_limiter.acquire(url)
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+                error = None
+            except requests.RequestException as e:
+                response, error = None, e
+            latency = time.perf_counter() - start
+            self.stats.record(latency, waited)
+            self.metrics.inc("http_requests")
+            self.metrics.observe("http_fetch", latency)
+
+            if response is not None and response.ok:
+                self.rate_limiter.speed_up(url)
+                return response
+            if response is not None and response.status_code not in RETRYABLE_STATUS_CODES:
+                logger.warning(f"GET {url} failed with status {response.status_code}")
+                return None
+            if attempt == self.max_retries:
+                break
+
+            throttled = response is not None and response.status_code == 429
+            if throttled:
+                self.rate_limiter.slow_down(url)
+            delay = self._backoff_delay(attempt, response)
+            reason = error if error is not None else f"status {response.status_code}"
+            logger.warning(f"GET {url} failed ({reason}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            self.stats.record_retry(delay, throttled)
+            self.metrics.inc("http_retries")
+            time.sleep(delay)
+
+        self.stats.record_failure()
+        self.metrics.inc("http_failures")
+        logger.error(f"GET {url} failed after {self.max_retries} retries")
+        return None
+
+    def _backoff_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """
+        Full-jitter exponential backoff, never shorter than the server's `Retry-After`.
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        retry_after = self._retry_after(response)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    @staticmethod
+    def _retry_after(response: Optional[requests.Response]) -> Optional[float]:
+        """
+        Parse a `Retry-After` header given either in seconds or as an HTTP date.
+        """
+        return parse_retry_after(response.headers.get("Retry-After") if response is not None else None)
+
+    def connections_opened(self) -> int:
+        """
+        Returns:
+            int: Number of TCP connections opened so far across all pooled hosts.
+        """
+        pool_manager = getattr(self.adapter, "poolmanager", None)
+        if pool_manager is None:
+            return 0
+        pools = pool_manager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def close(self):
+        """
+        Close all pooled connections.
+        """
+        self.session.close()
@@ -1,13 +1,21 @@
-import json
-import os
 import time
-from typing import Iterator, List, Optional, Tuple
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Iterator, List, Optional, Tuple
 
-import requests
 from bs4 import BeautifulSoup
 
-from utils.html_utils import parse_html_to_text
+from scraper.http_client import HttpClient
+from scraper.pagination import JobIdPaginator
+from scraper.raw_store import RawTextStore
+from scraper.search_parsers import get_search_parser
+from scraper.seen_store import SeenJobStore
+from utils.concurrency import ordered_map
+from utils.html_utils import html_to_text
 from utils.logger import get_logger
+from utils.metrics import NULL_METRICS, Metrics
+from utils.rate_limiter import HostRateLimiter
 
 logger = get_logger(__name__)
 
@@ -16,6 +24,9 @@ class LinkedInScraper:
     """
     Scrapes job postings from LinkedIn based on job title and location.
     Retrieves job IDs, fetches detailed job descriptions, and yields batches of job texts.
+
+    Several (title, location) queries can be run as one job: their IDs are deduplicated before any
+    description is fetched, and `job_queries` records which queries matched each job.
     """
 
     def __init__(
@@ -23,10 +34,24 @@ class LinkedInScraper:
         title: str,
         location: str,
         max_pages: int = 1,
-        delay: int = 1,
+        delay: Optional[float] = None,
         batch_size: int = 5,
         raw_cache_path: Optional[str] = None,
         load_from_cache: bool = False,
+        *,
+        max_workers: int = 1,
+        requests_per_second: float = 2.0,
+        burst: Optional[float] = None,
+        http_client: Optional[HttpClient] = None,
+        raw_store: Optional[RawTextStore] = None,
+        page_size: int = 10,
+        search_parser: str = "auto",
+        queries: Optional[List[Tuple[str, str]]] = None,
+        seen_store: Optional[SeenJobStore] = None,
+        incremental: bool = False,
+        max_known_run: int = 25,
+        report_disappeared: bool = False,
+        metrics: Optional[Metrics] = None,
     ):
         """
         Initialize the LinkedInScraper.
@@ -34,25 +59,70 @@ class LinkedInScraper:
         Args:
             title (str): Job title to search for.
             location (str): Job location.
-            max_pages (int): Number of pages to paginate through.
-            delay (int): Delay between requests (in seconds).
+            max_pages (int): Result offset at which pagination stops.
+            delay (Optional[float]): Deprecated: seconds between requests. Use `requests_per_second` instead;
+                if given, the rate limit becomes 1 / `delay` requests per second.
             batch_size (int): Number of job descriptions per batch.
-            raw_cache_path (Optional[str]): Path to cache file for job descriptions.
+            raw_cache_path (Optional[str]): Path to the SQLite raw-text store for job descriptions.
             load_from_cache (bool): Whether to load job descriptions from cache only, skip live fetch.
+            max_workers (int): Maximum number of job descriptions fetched concurrently (1 = sequential).
+            requests_per_second (float): Request rate allowed per host, shared by all workers.
+            burst (Optional[float]): Number of requests allowed back-to-back before throttling kicks in.
+            http_client (Optional[HttpClient]): Shared pooled HTTP client. Defaults to a new client
+                sized for `max_workers` and rate limited with `requests_per_second` and `burst`.
+            raw_store (Optional[RawTextStore]): Shared raw-text store. Defaults to a store opened at `raw_cache_path`.
+            page_size (int): Number of results LinkedIn returns per search page.
+            search_parser (str): Backend extracting job IDs from search pages (see `scraper.search_parsers`).
+            queries (Optional[List[Tuple[str, str]]]): (title, location) searches to run together.
+                Defaults to the single (`title`, `location`) search.
+            seen_store (Optional[SeenJobStore]): Record of job IDs seen by previous runs, updated on every run.
+            incremental (bool): Only yield jobs `seen_store` does not know yet. Results are requested newest
+                first and pagination stops after `max_known_run` consecutive known jobs.
+            max_known_run (int): Number of consecutive known jobs that ends pagination in incremental mode.
+            report_disappeared (bool): In incremental mode, crawl every page and collect in `disappeared_job_ids`
+                the jobs a query returned in previous runs but no longer returns.
+            metrics (Optional[Metrics]): Run metrics: raw cache hits and misses, `html_parse`, `raw_cache_io` and
+                `stage_job_ids` timers. Also used by the default HTTP client.
         """
         self.title = title
         self.location = location
+        self.queries = queries or [(title, location)]
         self.max_pages = max_pages
-        self.delay = delay
         self.batch_size = batch_size
+        self.page_size = page_size
+        self.parse_search_page = get_search_parser(search_parser)
         self.raw_cache_path = raw_cache_path
         self.load_from_cache = load_from_cache
+        self.max_workers = max(1, max_workers)
+        if delay is not None:
+            warnings.warn("`delay` is deprecated, use `requests_per_second` instead", DeprecationWarning, stacklevel=2)
+            if delay > 0:
+                requests_per_second = 1.0 / delay
+        self.delay = delay
+        self.metrics = metrics or NULL_METRICS
+        self.http = http_client or HttpClient(
+            rate_limiter=HostRateLimiter(requests_per_second, burst),
+            pool_size=max(10, self.max_workers),
+            metrics=self.metrics,
+        )
+        self.rate_limiter = self.http.rate_limiter
+        # An empty store is falsy (it defines __len__), so test for None
+        if raw_store is None and raw_cache_path:
+            raw_store = RawTextStore(raw_cache_path)
+        self.raw_store = raw_store
         self.job_ids = []
+        self.job_queries: Dict[str, List[str]] = {}
+        self.seen_store = seen_store
+        self.incremental = incremental and seen_store is not None
+        self.max_known_run = max_known_run
+        self.report_disappeared = report_disappeared
+        self.disappeared_job_ids: Dict[str, List[str]] = {}
         self.job_pairs = []
+        self._scraped = False
 
     def __len__(self) -> int:
         """
-        Return the number of job IDs fetched.
+        Return the number of job descriptions collected by `start_scraping`.
 
         Returns:
             int: Number of job postings found.
@@ -63,87 +133,193 @@ class LinkedInScraper:
         """
         Iterates over batches of job descriptions.
 
+        If `start_scraping` has already been called, batches come from `job_pairs`. Otherwise
+        scraping happens lazily and each batch is yielded as soon as its jobs are fetched.
+
         Yields:
             List[Tuple[str, str]]: A batch of (job_id, job_text) tuples.
         """
-        for i in range(0, len(self.job_pairs), self.batch_size):
-            yield self.job_pairs[i : i + self.batch_size]
+        if self._scraped:
+            for i in range(0, len(self.job_pairs), self.batch_size):
+                yield self.job_pairs[i : i + self.batch_size]
+            return
+
+        batch = []
+        for pair in self.iter_job_pairs():
+            batch.append(pair)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
 
     def start_scraping(self):
         """
         Start scraping job descriptions from LinkedIn or load from cache if enabled.
+        All results are kept in `job_pairs`.
         """
-        # If load_from_cache is requested and cache exists, load all and skip live fetch
-        if self.load_from_cache and self.raw_cache_path and os.path.exists(self.raw_cache_path):
-            logger.info(f"Loading all job texts from cache (skip live fetching): {self.raw_cache_path}")
-            with open(self.raw_cache_path, "r", encoding="utf-8") as f:
-                try:
-                    self.job_pairs = json.load(f)
-                    return
-                except Exception:
-                    logger.warning("Failed to parse raw cache; proceeding with live scraping.")
-
-        # Load existing cache into a lookup for reuse of individual entries
-        cached_dict = {}
-        if self.raw_cache_path and os.path.exists(self.raw_cache_path):
-            logger.info(f"Loading existing raw cache for reuse: {self.raw_cache_path}")
-            with open(self.raw_cache_path, "r", encoding="utf-8") as f:
-                try:
-                    cached_list = json.load(f)
-                    cached_dict = {jid: text for jid, text in cached_list}
-                except Exception:
-                    logger.warning("Failed to parse raw cache; proceeding without reuse.")
+        self.job_pairs = list(self.iter_job_pairs())
+
+    def iter_job_pairs(self) -> Iterator[Tuple[str, str]]:
+        """
+        Scrape job descriptions from LinkedIn, or load them from cache if enabled,
+        yielding each (job_id, job_text) pair as soon as it is available.
+        Each freshly fetched text is persisted to the raw store immediately.
+
+        Yields:
+            Tuple[str, str]: A (job_id, job_text) pair, in job ID order.
+        """
+        self._scraped = True
+
+        # If load_from_cache is requested and cache exists, stream all and skip live fetch
+        if self.load_from_cache and self.raw_store is not None and len(self.raw_store):
+            logger.info(f"Loading all job texts from cache (skip live fetching): {self.raw_store.path}")
+            outdated = self.raw_store.count_outdated()
+            if outdated:
+                logger.warning(
+                    f"{outdated} cached job texts have no Company line, so compaction cannot scope their "
+                    "repeated lines; scrape live to refresh them"
+                )
+            yield from self.raw_store.iter_items()
+            return
 
         # Fetch all job IDs
         logger.info("Starting live scrape: retrieving job IDs...")
-        self.job_ids = self.get_job_ids()
+        with self.metrics.timer("stage_job_ids"):
+            self.job_ids = self.get_job_ids()
         logger.info(f"Retrieved {len(self.job_ids)} job IDs. Processing descriptions...")
 
-        # Reuse or fetch each job description
-        self.job_pairs = []
-        for job_id in self.job_ids:
-            if job_id in cached_dict:
-                logger.info(f"Reusing cached text for job ID: {job_id}")
-                self.job_pairs.append((job_id, cached_dict[job_id]))
-            else:
-                logger.info(f"Fetching description for job ID: {job_id}")
-                job_text = self.fetch_job_description(job_id)
-                if job_text:
-                    self.job_pairs.append((job_id, job_text))
-
-        if self.raw_cache_path:
-            os.makedirs(os.path.dirname(self.raw_cache_path), exist_ok=True)
-            with open(self.raw_cache_path, "w", encoding="utf-8") as f:
-                json.dump(self.job_pairs, f, indent=2, ensure_ascii=False)
+        # Reuse or fetch each job description, keeping the original job ID order
+        for job_id, job_text in zip(self.job_ids, self._get_job_texts(self.job_ids)):
+            if job_text:
+                yield job_id, job_text
+        logger.info(f"HTTP stats: {self.http.stats.summary()}, connections opened: {self.http.connections_opened()}")
+
+    def _get_job_texts(self, job_ids: List[str]) -> Iterator[Optional[str]]:
+        """
+        Yield the text of each job, from the raw store when available, otherwise fetched live.
+        Live fetches run on up to `max_workers` threads; results are yielded in `job_ids` order.
+
+        Args:
+            job_ids (List[str]): Job IDs to resolve.
+
+        Yields:
+            Optional[str]: Job text, or None if it could not be fetched.
+        """
+
+        def get_text(job_id: str) -> Optional[str]:
+            if self.raw_store is not None:
+                with self.metrics.timer("raw_cache_io"):
+                    cached_text = self.raw_store.get(job_id)
+                if cached_text is not None:
+                    self.metrics.inc("raw_cache_hits")
+                    logger.info(f"Reusing cached text for job ID: {job_id}")
+                    return cached_text
+                self.metrics.inc("raw_cache_misses")
+            logger.info(f"Fetching description for job ID: {job_id}")
+            job_text = self.fetch_job_description(job_id)
+            if job_text and self.raw_store is not None:
+                with self.metrics.timer("raw_cache_io"):
+                    self.raw_store.put(job_id, job_text)
+            return job_text
+
+        if self.max_workers == 1:
+            yield from map(get_text, job_ids)
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            yield from ordered_map(get_text, job_ids, executor, max_in_flight=2 * self.max_workers)
 
     def get_job_ids(self) -> List[str]:
         """
-        Retrieve job posting IDs from LinkedIn search results.
+        Retrieve unique job posting IDs from LinkedIn search results for every query.
+        Pages are prefetched up to `max_workers` at a time and each query stops paginating at its
+        first empty or all-duplicate page. IDs are then deduplicated across queries, keeping the
+        order of first appearance, and the matching queries are recorded in `job_queries`.
+        In incremental mode, only IDs unknown to `seen_store` are returned.
 
         Returns:
             List[str]: List of job posting IDs.
         """
-        job_ids = []
-        start = 0
-        while start < self.max_pages:
-            url = (
-                f"https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search?"
-                f"keywords={self.title}&location={self.location}&start={start}"
+        self.job_queries = {}
+        self.disappeared_job_ids = {}
+        new_job_ids = set()
+        run_started = time.time()
+        for title, location in self.queries:
+            label = self.query_label(title, location)
+            if self.incremental:
+                watermark = self.seen_store.get_watermark(label)
+                if watermark:
+                    logger.info(
+                        f"'{label}' last ran at {time.ctime(watermark['last_run_at'])}, "
+                        f"newest job ID then: {watermark['newest_job_id']}"
+                    )
+            paginator = JobIdPaginator(
+                partial(self._fetch_search_page, title, location),
+                max_offset=self.max_pages,
+                page_size=self.page_size,
+                window=self.max_workers,
+                # Jobs processed by this run (e.g. found by an earlier query) do not count toward the known streak
+                is_known=partial(self.seen_store.is_known, before=run_started) if self.incremental else None,
+                max_known_run=0 if self.report_disappeared else self.max_known_run,
             )
-            logger.info(f"Fetching job list from: {url}")
-            response = requests.get(url, timeout=10)
-            soup = BeautifulSoup(response.text, "html.parser")
-            jobs = soup.find_all("li")
-
-            for job in jobs:
-                div = job.find("div", {"class": "base-card"})
-                if div and div.get("data-entity-urn"):
-                    job_id = div.get("data-entity-urn").split(":")[-1]
-                    job_ids.append(job_id)
-            time.sleep(self.delay)
-            start += len(jobs)
-        logger.info(f"Found {len(job_ids)} job IDs")
-        return job_ids
+            query_ids = list(paginator)
+
+            if self.incremental:
+                new_job_ids.update(
+                    job_id for job_id in query_ids if not self.seen_store.is_known(job_id, before=run_started)
+                )
+            if self.seen_store is not None:
+                self.seen_store.record_sightings(label, query_ids, run_started)
+                self.seen_store.set_watermark(label, run_started, query_ids[0] if query_ids else None, len(query_ids))
+                if self.incremental and self.report_disappeared:
+                    self.disappeared_job_ids[label] = self.seen_store.pop_disappeared(label, run_started)
+                    logger.info(f"{len(self.disappeared_job_ids[label])} jobs disappeared from '{label}'")
+
+            new_ids = 0
+            for job_id in query_ids:
+                new_ids += job_id not in self.job_queries
+                self.job_queries.setdefault(job_id, []).append(label)
+            logger.info(
+                f"Found {len(query_ids)} job IDs for '{label}' "
+                f"({new_ids} new) in {paginator.pages_fetched} pages ({paginator.duplicates} duplicates skipped)"
+            )
+        logger.info(f"Found {len(self.job_queries)} unique job IDs across {len(self.queries)} queries")
+        if self.incremental:
+            logger.info(f"{len(new_job_ids)} of them were not processed by previous runs")
+            return [job_id for job_id in self.job_queries if job_id in new_job_ids]
+        return list(self.job_queries)
+
+    @staticmethod
+    def query_label(title: str, location: str) -> str:
+        """
+        Human-readable identifier of a (title, location) query.
+        """
+        return f"{title} @ {location}"
+
+    def _fetch_search_page(self, title: str, location: str, start: int) -> Optional[List[str]]:
+        """
+        Fetch one page of search results.
+
+        Args:
+            title (str): Job title searched.
+            location (str): Location searched.
+            start (int): Result offset of the page.
+
+        Returns:
+            Optional[List[str]]: Job IDs on the page, in order, or None if the page could not be fetched.
+        """
+        url = (
+            f"https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search?"
+            f"keywords={title}&location={location}&start={start}"
+        )
+        if self.incremental:
+            url += "&sortBy=DD"  # newest first, so known jobs come last
+        logger.info(f"Fetching job list from: {url}")
+        response = self.http.get(url)
+        if response is None:
+            return None
+        with self.metrics.timer("html_parse"):
+            return self.parse_search_page(response.text)
 
     def fetch_job_description(self, job_id: str) -> Optional[str]:
         """
@@ -153,11 +329,26 @@ class LinkedInScraper:
             job_id (str): LinkedIn job ID.
 
         Returns:
-            Optional[str]: Full job text (salary + description), or None if not found.
+            Optional[str]: Full job text (company + salary + description), or None if not found.
         """
         url = f"https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{job_id}"
-        response = requests.get(url, timeout=10)
-        soup = BeautifulSoup(response.text, "html.parser")
+        response = self.http.get(url)
+        if response is None:
+            return None
+        with self.metrics.timer("html_parse"):
+            return self._parse_job_description(response.text)
+
+    @staticmethod
+    def _parse_job_description(html: str) -> Optional[str]:
+        """
+        Job text (company + salary + description) of a job posting page, or None if it has no description.
+        """
+        soup = BeautifulSoup(html, "html.parser")
+
+        try:
+            company = soup.find("a", {"class": "topcard__org-name-link"}).text.strip()
+        except Exception:
+            company = None
 
         try:
             salary = soup.find("div", {"class": "salary"}).text.strip()
@@ -168,9 +359,11 @@ class LinkedInScraper:
             desc_div = soup.find("div", {"class": "show-more-less-html__markup"})
             if not desc_div:
                 return None
-            desc = parse_html_to_text(desc_div)
+            desc = html_to_text(desc_div)
         except Exception:
             return None
 
-        # Combine salary and description with proper newlines
-        return f"Salary: {salary}.\n\nDescription:\n{desc}"
+        # Combine company, salary and description with proper newlines. The company scopes the repeated
+        # lines the compactor drops (see `extractor.compaction.company_of`)
+        header = f"Company: {company}.\n" if company else ""
+        return f"{header}Salary: {salary}.\n\nDescription:\n{desc}"
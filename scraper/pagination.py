@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional, Set
+
+from utils.concurrency import ordered_map
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class JobIdPaginator:
+    """
+    Walks search-result offsets and yields unique job IDs in result order.
+
+    Up to `window` pages are fetched concurrently ahead of the page being processed. Pagination
+    stops, and no further pages are requested, as soon as a page is empty, fails to load, or only
+    contains IDs that were already seen. For incremental runs it also stops after a run of
+    `max_known_run` consecutive IDs known from previous runs.
+    """
+
+    def __init__(
+        self,
+        fetch_page: Callable[[int], Optional[List[str]]],
+        max_offset: int,
+        page_size: int = 10,
+        window: int = 1,
+        seen: Optional[Set[str]] = None,
+        is_known: Optional[Callable[[str], bool]] = None,
+        max_known_run: int = 0,
+    ):
+        """
+        Args:
+            fetch_page (Callable[[int], Optional[List[str]]]): Returns the job IDs found at a result offset,
+                or None if the page could not be fetched.
+            max_offset (int): Offsets are requested from 0 up to (excluding) this value.
+            page_size (int): Number of results per page, i.e. the step between offsets.
+            window (int): Maximum number of pages fetched concurrently.
+            seen (Optional[Set[str]]): IDs to treat as already seen, shared across paginators to deduplicate
+                several searches. Updated in place.
+            is_known (Optional[Callable[[str], bool]]): Whether a job ID was seen by a previous run.
+            max_known_run (int): Stop after this many consecutive known IDs (0 disables the check).
+        """
+        self.fetch_page = fetch_page
+        self.max_offset = max_offset
+        self.page_size = page_size
+        self.window = max(1, window)
+        self.seen = seen if seen is not None else set()
+        self.is_known = is_known
+        self.max_known_run = max_known_run
+        self.pages_fetched = 0
+        self.duplicates = 0
+        self._known_run = 0
+
+    def __iter__(self) -> Iterator[str]:
+        offsets = range(0, self.max_offset, self.page_size)
+        if self.window == 1:
+            yield from self._dedupe(offsets, map(self.fetch_page, offsets))
+            return
+        with ThreadPoolExecutor(max_workers=self.window) as executor:
+            yield from self._dedupe(offsets, ordered_map(self.fetch_page, offsets, executor, self.window))
+
+    def _dedupe(self, offsets: range, pages: Iterator[Optional[List[str]]]) -> Iterator[str]:
+        """
+        Yield unseen IDs page by page, stopping at the first exhausted page.
+        Stopping closes `pages`, which cancels any prefetched request not yet started.
+        """
+        for offset, page in zip(offsets, pages):
+            self.pages_fetched += 1
+            if page is None:
+                logger.warning(f"Stopping pagination: could not fetch results at offset {offset}")
+                return
+            if not page:
+                logger.info(f"Stopping pagination: no results at offset {offset}")
+                return
+            new_ids = [job_id for job_id in dict.fromkeys(page) if job_id not in self.seen]
+            self.duplicates += len(page) - len(new_ids)
+            if not new_ids:
+                logger.info(f"Stopping pagination: only already-seen results at offset {offset}")
+                return
+            self.seen.update(new_ids)
+            for job_id in new_ids:
+                yield job_id
+                if self._reached_known_run(job_id):
+                    logger.info(f"Stopping pagination: {self._known_run} consecutive known jobs at offset {offset}")
+                    return
+
+    def _reached_known_run(self, job_id: str) -> bool:
+        if not self.max_known_run or self.is_known is None:
+            return False
+        self._known_run = self._known_run + 1 if self.is_known(job_id) else 0
+        return self._known_run >= self.max_known_run
@@ -0,0 +1,160 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Version of the job text layout written by the scraper. Version 2 added the `Company:` header line, which
+# scopes the repeated lines dropped by `extractor.compaction`; rows of an older version are treated as missing
+# by `get`, so live scrapes re-fetch them.
+TEXT_FORMAT = 2
+
+
+class RawTextStore:
+    """
+    SQLite-backed store of raw job texts keyed by job ID.
+
+    Each (job_id, text) pair is committed as soon as it is written, so a crash only loses the
+    jobs in flight. Lookups use the primary key index and never load the whole corpus; iteration
+    streams rows in insertion order. Each row records the `TEXT_FORMAT` it was scraped with.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path to the SQLite database file, created if missing.
+        """
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS raw_texts (job_id TEXT PRIMARY KEY, text TEXT NOT NULL, fetched_at REAL, "
+            "text_format INTEGER NOT NULL DEFAULT 1)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(raw_texts)")}
+        if "text_format" not in columns:
+            # Stores created before the column hold version 1 texts
+            self._conn.execute("ALTER TABLE raw_texts ADD COLUMN text_format INTEGER NOT NULL DEFAULT 1")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM raw_texts").fetchone()[0]
+
+    def __contains__(self, job_id: str) -> bool:
+        return self.get(job_id) is not None
+
+    def count_outdated(self) -> int:
+        """
+        Returns:
+            int: Number of texts scraped with an older `TEXT_FORMAT`.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM raw_texts WHERE text_format < ?", (TEXT_FORMAT,)
+            ).fetchone()[0]
+
+    def get(self, job_id: str) -> Optional[str]:
+        """
+        Args:
+            job_id (str): LinkedIn job ID.
+
+        Returns:
+            Optional[str]: Cached job text, or None if the job is not cached or its text has an older format.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM raw_texts WHERE job_id = ? AND text_format >= ?", (job_id, TEXT_FORMAT)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, job_id: str, text: str):
+        """
+        Persist one job text, replacing any previous text for the same ID.
+        """
+        self.put_many([(job_id, text)])
+
+    def put_many(self, pairs: Iterable[Tuple[str, str]], text_format: int = TEXT_FORMAT):
+        """
+        Persist several job texts in a single transaction.
+
+        Args:
+            pairs (Iterable[Tuple[str, str]]): (job_id, job_text) pairs.
+            text_format (int): Format of the texts, older than `TEXT_FORMAT` for imported legacy texts.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO raw_texts (job_id, text, fetched_at, text_format) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET text = excluded.text, fetched_at = excluded.fetched_at, "
+                "text_format = excluded.text_format",
+                ((job_id, text, now, text_format) for job_id, text in pairs),
+            )
+
+    def iter_items(self, chunk_size: int = 500) -> Iterator[Tuple[str, str]]:
+        """
+        Stream all cached (job_id, job_text) pairs in insertion order, including texts of an older format.
+
+        Args:
+            chunk_size (int): Number of rows read from the database at a time.
+
+        Yields:
+            Tuple[str, str]: A (job_id, job_text) pair.
+        """
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, job_id, text FROM raw_texts WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, chunk_size),
+                ).fetchall()
+            if not rows:
+                return
+            for rowid, job_id, text in rows:
+                yield job_id, text
+            last_rowid = rows[-1][0]
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_json_cache(json_path: str, store: RawTextStore) -> int:
+    """
+    Import a legacy `raw_job_texts.json` cache (a JSON list of [job_id, job_text] pairs) into a store.
+
+    Args:
+        json_path (str): Path to the legacy JSON cache.
+        store (RawTextStore): Destination store.
+
+    Returns:
+        int: Number of pairs imported.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        pairs = [(str(job_id), text) for job_id, text in json.load(f)]
+    # The JSON cache predates the `Company:` line
+    store.put_many(pairs, text_format=1)
+    logger.info(f"Migrated {len(pairs)} raw job texts from {json_path} to {store.path}")
+    return len(pairs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate a legacy JSON raw-text cache to the SQLite store")
+    parser.add_argument("--json-path", type=str, default="cache/raw_job_texts.json", help="Legacy JSON cache")
+    parser.add_argument("--db-path", type=str, default="cache/raw_job_texts.sqlite", help="Destination SQLite store")
+    args = parser.parse_args()
+
+    migrate_json_cache(args.json_path, RawTextStore(args.db_path))
@@ -0,0 +1,154 @@
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+except ImportError:  # optional faster backend
+    lxml = None
+
+SearchParser = Callable[[str], List[str]]
+
+
+def _job_id_from_urn(urn: Optional[str]) -> Optional[str]:
+    return urn.split(":")[-1] if urn else None
+
+
+def parse_job_ids_bs4(html: str) -> List[str]:
+    """
+    Reference parser: builds the full BeautifulSoup tree and reads the first `div.base-card`
+    of every `<li>`.
+
+    Args:
+        html (str): Search results page.
+
+    Returns:
+        List[str]: Job IDs in page order.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    job_ids = []
+    for job in soup.find_all("li"):
+        div = job.find("div", {"class": "base-card"})
+        if div and div.get("data-entity-urn"):
+            job_ids.append(_job_id_from_urn(div.get("data-entity-urn")))
+    return job_ids
+
+
+_LI_STRAINER = SoupStrainer("li")
+
+
+def parse_job_ids_strainer(html: str) -> List[str]:
+    """
+    Same lookup as `parse_job_ids_bs4`, but only `<li>` subtrees are added to the tree.
+    """
+    soup = BeautifulSoup(html, "html.parser", parse_only=_LI_STRAINER)
+    job_ids = []
+    for job in soup.find_all("li"):
+        div = job.find("div", {"class": "base-card"})
+        if div and div.get("data-entity-urn"):
+            job_ids.append(_job_id_from_urn(div.get("data-entity-urn")))
+    return job_ids
+
+
+class _JobCardParser(HTMLParser):
+    """
+    Event-based extractor reproducing `parse_job_ids_bs4` without building a tree.
+
+    Every `<li>` start opens a slot (in document order, like `find_all("li")`); the first
+    `div.base-card` seen while a slot is open resolves it, including for enclosing `<li>`s.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.slots: List[Optional[str]] = []
+        self._open: List[int] = []
+        self._unresolved: List[int] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "li":
+            self._open.append(len(self.slots))
+            self._unresolved.append(len(self.slots))
+            self.slots.append(None)
+        elif tag == "div" and self._unresolved:
+            attr_dict = dict(attrs)
+            if "base-card" in (attr_dict.get("class") or "").split():
+                job_id = _job_id_from_urn(attr_dict.get("data-entity-urn"))
+                for slot in self._unresolved:
+                    self.slots[slot] = job_id
+                self._unresolved = []
+
+    def handle_endtag(self, tag):
+        if tag == "li" and self._open:
+            slot = self._open.pop()
+            if slot in self._unresolved:
+                self._unresolved.remove(slot)
+
+
+def parse_job_ids_stream(html: str) -> List[str]:
+    """
+    Same result as `parse_job_ids_bs4`, computed in a single pass over the HTML parser events.
+    """
+    parser = _JobCardParser()
+    parser.feed(html)
+    parser.close()
+    return [job_id for job_id in parser.slots if job_id]
+
+
+_LXML_CARD_XPATH = "(.//div[contains(concat(' ', normalize-space(@class), ' '), ' base-card ')])[1]"
+
+
+def parse_job_ids_lxml(html: str) -> List[str]:
+    """
+    libxml2-based parser, used when lxml is installed. Returns the same IDs as `parse_job_ids_bs4`
+    on well-formed result pages (libxml2 repairs unclosed `<li>` differently from html.parser).
+    """
+    if not html.strip():
+        return []
+    root = lxml.html.fromstring(html)
+    job_ids = []
+    for job in root.iter("li"):
+        divs = job.xpath(_LXML_CARD_XPATH)
+        if divs and divs[0].get("data-entity-urn"):
+            job_ids.append(_job_id_from_urn(divs[0].get("data-entity-urn")))
+    return job_ids
+
+
+def parse_job_ids_lxml_checked(html: str) -> List[str]:
+    """
+    `parse_job_ids_lxml`, falling back to `parse_job_ids_stream` (html.parser, same result as
+    `parse_job_ids_bs4`) when lxml finds fewer job cards than the page has job URNs, e.g. none at all
+    because libxml2 repaired malformed markup differently.
+    """
+    job_ids = parse_job_ids_lxml(html)
+    if len(job_ids) < html.count("data-entity-urn"):
+        return parse_job_ids_stream(html)
+    return job_ids
+
+
+SEARCH_PARSERS: Dict[str, SearchParser] = {
+    "bs4": parse_job_ids_bs4,
+    "strainer": parse_job_ids_strainer,
+    "stream": parse_job_ids_stream,
+}
+if lxml is not None:
+    SEARCH_PARSERS["lxml"] = parse_job_ids_lxml
+    SEARCH_PARSERS["lxml_checked"] = parse_job_ids_lxml_checked
+
+
+def get_search_parser(name: str = "auto") -> SearchParser:
+    """
+    Return a search-results parser by name.
+
+    Args:
+        name (str): One of "bs4", "strainer", "stream", "lxml", "lxml_checked", or "auto" to pick lxml
+            with the html.parser fallback when installed and the streaming parser otherwise.
+
+    Returns:
+        SearchParser: Function mapping a search results page to its job IDs.
+    """
+    if name == "auto":
+        name = "lxml_checked" if "lxml" in SEARCH_PARSERS else "stream"
+    if name not in SEARCH_PARSERS:
+        raise ValueError(f"Unsupported search parser: {name} (available: {', '.join(SEARCH_PARSERS)})")
+    return SEARCH_PARSERS[name]
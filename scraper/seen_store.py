@@ -0,0 +1,154 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SeenJobStore:
+    """
+    SQLite record of which job IDs previous runs have seen, used for incremental scraping.
+
+    Keeps first/last-seen timestamps per job ID, the jobs each query returned with their last
+    sighting, and a per-query watermark (time of the last run and newest job ID it saw). A job only
+    counts as known once its result has been persisted (`mark_processed`): jobs that were listed but
+    whose fetch or extraction failed, or that a crash interrupted, are retried by the next run.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path to the SQLite database file, created if missing.
+        """
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        for statement in (
+            "CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, first_seen REAL, last_seen REAL)",
+            "CREATE TABLE IF NOT EXISTS query_jobs (query TEXT, job_id TEXT, last_seen REAL, PRIMARY KEY (query, job_id))",
+            "CREATE TABLE IF NOT EXISTS watermarks "
+            "(query TEXT PRIMARY KEY, last_run_at REAL, newest_job_id TEXT, job_count INTEGER)",
+        ):
+            self._conn.execute(statement)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+        if "processed_at" not in columns:
+            # Stores created before `mark_processed`: their jobs are retried once
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN processed_at REAL")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def is_known(self, job_id: str, before: Optional[float] = None) -> bool:
+        """
+        Args:
+            job_id (str): LinkedIn job ID.
+            before (Optional[float]): Only count jobs processed before this time, e.g. the start of the current
+                run so that jobs it processed itself are not "known".
+
+        Returns:
+            bool: Whether a run has persisted the result of this job (before `before`).
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT processed_at FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None or row[0] is None:
+            return False
+        return before is None or row[0] < before
+
+    def mark_processed(self, job_ids: Iterable[str], processed_at: Optional[float] = None):
+        """
+        Mark jobs whose result has been persisted, so that incremental runs skip them.
+
+        Args:
+            job_ids (Iterable[str]): Job IDs.
+            processed_at (Optional[float]): Timestamp of the processing. Defaults to now.
+        """
+        processed_at = processed_at if processed_at is not None else time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO jobs (job_id, first_seen, last_seen, processed_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET processed_at = excluded.processed_at",
+                ((job_id, processed_at, processed_at, processed_at) for job_id in job_ids),
+            )
+
+    def record_sightings(self, query: str, job_ids: Iterable[str], seen_at: Optional[float] = None):
+        """
+        Mark jobs as listed by a query, setting their first-seen time on the first sighting. This does not
+        make them known: see `mark_processed`.
+
+        Args:
+            query (str): Query label.
+            job_ids (Iterable[str]): Job IDs returned by the query.
+            seen_at (Optional[float]): Timestamp of the sighting. Defaults to now.
+        """
+        seen_at = seen_at if seen_at is not None else time.time()
+        rows = [(job_id, seen_at, seen_at) for job_id in job_ids]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO jobs (job_id, first_seen, last_seen) VALUES (?, ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET last_seen = excluded.last_seen",
+                rows,
+            )
+            self._conn.executemany(
+                "INSERT INTO query_jobs (query, job_id, last_seen) VALUES (?, ?, ?) "
+                "ON CONFLICT(query, job_id) DO UPDATE SET last_seen = excluded.last_seen",
+                ((query, job_id, seen) for job_id, _, seen in rows),
+            )
+
+    def pop_disappeared(self, query: str, since: float) -> List[str]:
+        """
+        Return, and forget, the jobs of a query that were not seen since a given time.
+
+        Args:
+            query (str): Query label.
+            since (float): Start time of the current run.
+
+        Returns:
+            List[str]: IDs of jobs the query no longer returns.
+        """
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT job_id FROM query_jobs WHERE query = ? AND last_seen < ? ORDER BY last_seen", (query, since)
+            ).fetchall()
+            self._conn.execute("DELETE FROM query_jobs WHERE query = ? AND last_seen < ?", (query, since))
+        return [row[0] for row in rows]
+
+    def get_watermark(self, query: str) -> Optional[Dict]:
+        """
+        Returns:
+            Optional[Dict]: `last_run_at`, `newest_job_id` and `job_count` of the query's last run, if any.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_run_at, newest_job_id, job_count FROM watermarks WHERE query = ?", (query,)
+            ).fetchone()
+        return dict(zip(("last_run_at", "newest_job_id", "job_count"), row)) if row else None
+
+    def set_watermark(self, query: str, run_at: float, newest_job_id: Optional[str], job_count: int):
+        """
+        Store the watermark of a finished query run.
+
+        Args:
+            query (str): Query label.
+            run_at (float): Start time of the run.
+            newest_job_id (Optional[str]): First (newest) job ID the run returned.
+            job_count (int): Number of job IDs the run returned.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO watermarks (query, last_run_at, newest_job_id, job_count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(query) DO UPDATE SET last_run_at = excluded.last_run_at, "
+                "newest_job_id = excluded.newest_job_id, job_count = excluded.job_count",
+                (query, run_at, newest_job_id, job_count),
+            )
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
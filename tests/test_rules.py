@@ -0,0 +1,34 @@
+import pytest
+
+from extractor.rules import RuleExtractor, extract_salary, merge_rule_fields
+
+LLM_SALARY = {"min": 45000, "max": 55000, "currency": "EUR"}
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "We raised $250,000 in seed funding",
+        "€5,000 relocation bonus",
+    ],
+)
+@pytest.mark.parametrize("header", ["", "Company: Acme.\nSalary: Not specified.\n\nDescription:\n"])
+def test_currency_only_amount_is_left_to_the_llm(header, line):
+    text = f"{header}Data Scientist\n{line}.\nYou will build forecasting models with Python."
+    fields, confidence = RuleExtractor().extract(text)
+
+    assert "salary" not in fields
+    assert confidence["salary"] < 0.7
+    assert extract_salary(text) is None
+    structured = merge_rule_fields({"title": "Data Scientist", "salary": dict(LLM_SALARY)}, fields)
+    assert structured["salary"] == LLM_SALARY
+
+
+def test_salary_with_a_cue_overrides_the_llm():
+    text = "Company: Acme.\nSalary: Not specified.\n\nDescription:\nSalary: €60,000 - €70,000 per year."
+    fields, confidence = RuleExtractor().extract(text)
+
+    assert fields["salary"] == {"min": 60000, "max": 70000, "currency": "EUR"}
+    assert confidence["salary"] >= 0.7
+    structured = merge_rule_fields({"salary": dict(LLM_SALARY)}, fields)
+    assert structured["salary"] == fields["salary"]
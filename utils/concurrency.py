@@ -0,0 +1,133 @@
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Executor
+from typing import Callable, Dict, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def ordered_map(fn: Callable[[T], R], items: Iterable[T], executor: Executor, max_in_flight: int) -> Iterator[R]:
+    """
+    Apply `fn` to `items` on `executor`, yielding results in input order.
+
+    At most `max_in_flight` calls are pending at any time, so `items` is consumed lazily and
+    memory stays bounded. Exceptions raised by `fn` propagate when their result is reached.
+    Pending calls are cancelled if the consumer stops early.
+
+    Args:
+        fn (Callable): Function to apply to each item.
+        items (Iterable): Input items, consumed lazily.
+        executor (Executor): Executor running the calls.
+        max_in_flight (int): Maximum number of submitted but not yet yielded calls.
+
+    Yields:
+        Results of `fn`, in the order of `items`.
+    """
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+_DONE = object()
+
+
+class _ProducerError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def prefetch(items: Iterable[T], max_queue_size: int) -> Iterator[T]:
+    """
+    Consume `items` on a background thread, handing them over through a bounded queue.
+
+    The producer runs ahead of the consumer by at most `max_queue_size` items, so slow
+    producers (network) and slow consumers (LLM calls) overlap while memory stays bounded.
+    Exceptions raised by the producer are re-raised in the consumer. If the consumer stops
+    early, the producer is signalled to stop at its next hand-over.
+
+    Args:
+        items (Iterable): Items to produce, typically a generator doing blocking I/O.
+        max_queue_size (int): Maximum number of produced but not yet consumed items.
+
+    Yields:
+        Items of `items`, in order.
+    """
+    buffer = queue.Queue(maxsize=max(1, max_queue_size))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as e:  # re-raised on the consumer side
+            put(_ProducerError(e))
+
+    producer = threading.Thread(target=produce, name="prefetch-producer", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _ProducerError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+
+
+class ReorderBuffer:
+    """
+    Releases items completed out of order in their sequence order (0, 1, 2, ...).
+
+    Only items waiting for an earlier one are held, so memory is bounded by the number of items in flight.
+    """
+
+    def __init__(self):
+        self._next = 0
+        self._waiting: Dict[int, object] = {}
+
+    def __len__(self) -> int:
+        return len(self._waiting)
+
+    def add(self, seq: int, item) -> List:
+        """
+        Record the item with sequence number `seq`.
+
+        Args:
+            seq (int): Sequence number, each used exactly once.
+            item: Completed item; None marks a sequence number without output (e.g. a failed job).
+
+        Returns:
+            list: Items now released, in order, without the None placeholders.
+        """
+        self._waiting[seq] = item
+        released = []
+        while self._next in self._waiting:
+            item = self._waiting.pop(self._next)
+            if item is not None:
+                released.append(item)
+            self._next += 1
+        return released
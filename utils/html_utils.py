@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Tuple
 
 from bs4 import NavigableString, Tag
 
@@ -52,3 +52,100 @@ def parse_html_to_text(bs4_node: Tag) -> str:
             cleaned.append(line)
             prev_blank = False
     return "\n".join(cleaned).strip()
+
+
+def _string_types(tag: Tag):
+    """
+    String classes `tag.get_text()` considers, e.g. only NavigableString and CData for most tags.
+    """
+    types = getattr(tag, "interesting_string_types", None)
+    return types if types is not None else Tag.MAIN_CONTENT_STRING_TYPES
+
+
+def _is_interesting(string: NavigableString, types) -> bool:
+    if isinstance(types, type):
+        return type(string) is types
+    return type(string) in types
+
+
+def _list_item_lines(list_tag: Tag) -> List[str]:
+    """
+    Render every `<li>` under `list_tag` as a "- item" line in one traversal of the list.
+
+    Equivalent to calling `li.get_text(" ", strip=True)` for each `li` in `list_tag.find_all("li")`:
+    items are ordered by their start tag, and the text of a nested item also counts for its
+    enclosing items.
+    """
+    items: List[List[str]] = []
+    open_items: List[Tuple[List[str], object]] = []
+    stack = [(iter(list_tag.contents), False)]
+    while stack:
+        children, is_item = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if is_item:
+                open_items.pop()
+        elif isinstance(child, NavigableString):
+            text = None
+            for parts, types in open_items:
+                if _is_interesting(child, types):
+                    text = child.strip() if text is None else text
+                    if text:
+                        parts.append(text)
+        elif isinstance(child, Tag):
+            is_item = child.name == "li"
+            if is_item:
+                items.append([])
+                open_items.append((items[-1], _string_types(child)))
+            stack.append((iter(child.contents), is_item))
+    return [f"- {' '.join(parts)}" for parts in items if parts]
+
+
+def html_to_text(bs4_node: Tag) -> str:
+    """
+    Parse a BeautifulSoup node into formatted text in a single traversal.
+    Produces exactly the same output as `parse_html_to_text`.
+    """
+    lines: List[str] = []
+    current_parts: List[str] = []
+
+    def end_line():
+        if current_parts:
+            lines.append(" ".join(current_parts))
+            current_parts.clear()
+
+    for child in bs4_node.children:
+        if isinstance(child, NavigableString):
+            text = child.strip()
+            if text:
+                current_parts.append(text)
+        elif isinstance(child, Tag):
+            if child.name == "p":
+                end_line()
+                para = " ".join(child.stripped_strings)
+                if para:
+                    lines.append(para)
+            elif child.name in ("ul", "ol"):
+                end_line()
+                lines.extend(_list_item_lines(child))
+            elif child.name == "br":
+                end_line()
+                lines.append("")
+            else:
+                inline = " ".join(child.stripped_strings)
+                if inline:
+                    current_parts.append(inline)
+    end_line()
+
+    cleaned: List[str] = []
+    prev_blank = False
+    for line in lines:
+        if not line:
+            if not prev_blank:
+                cleaned.append("")
+                prev_blank = True
+        else:
+            cleaned.append(line)
+            prev_blank = False
+    return "\n".join(cleaned).strip()
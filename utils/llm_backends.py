@@ -0,0 +1,184 @@
+import copy
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import Field, PrivateAttr
+
+from utils.tokens import estimate_tokens
+
+# Result of the extraction prompts with every field "not specified"
+EMPTY_EXTRACTION = {
+    "title": "",
+    "industry": "",
+    "employment_type": "",
+    "employment_contract": "",
+    "required_experience": {"years": {"min": -1, "max": -1}, "level": ""},
+    "salary": {"min": -1, "max": -1, "currency": ""},
+    "skills": {"hard_skills": "", "soft_skills": "", "required_languages": "", "nice_to_have": ""},
+    "education": {"degrees": "", "fields_of_study": ""},
+}
+
+TRANSLATION_HEADER = "The original is written in English. Here is the translated version in English:"
+SCRAPER_LINE_RE = re.compile(r"^(Company: .*|Salary: .*|Description:)$")
+COMPACT_COLUMNS_PATTERN = re.compile(r"these (\d+) columns separated by `\|`")
+JOB_WITH_REF_PATTERN = re.compile(r"^JOB REF: (\d+)\n(.*?)\n### JOB END ###", re.MULTILINE | re.DOTALL)
+
+
+def _fake_extraction(job_text: str) -> dict:
+    result = copy.deepcopy(EMPTY_EXTRACTION)
+    lines = (line.strip() for line in job_text.splitlines())
+    # Skip the translation header and the company/salary/description lines prepended by the scraper
+    first_line = next(
+        (line for line in lines if line and line != TRANSLATION_HEADER and not SCRAPER_LINE_RE.match(line)), ""
+    )
+    result["title"] = first_line[:80]
+    return result
+
+
+def fake_completion(prompt: str) -> str:
+    """
+    Deterministic answer to the repo's prompts, without any model.
+
+    Batched extraction prompts get a JSON list with one schema-valid object per `JOB REF` (or one row
+    per job and an END line for the compact format), single-job extraction prompts a single object,
+    and translation prompts their input text back.
+
+    Args:
+        prompt (str): Rendered prompt.
+
+    Returns:
+        str: Completion text.
+    """
+    jobs = JOB_WITH_REF_PATTERN.findall(prompt)
+    if prompt.startswith("You are a professional translator"):
+        if jobs:
+            return "\n\n".join(
+                f"### JOB START ###\nJOB REF: {ref}\n{TRANSLATION_HEADER}\n{text}\n### JOB END ###"
+                for ref, text in jobs
+            )
+        return f"{TRANSLATION_HEADER}\n{prompt.split('Original text:', 1)[-1].rsplit('Output:', 1)[0].strip()}"
+    columns = COMPACT_COLUMNS_PATTERN.search(prompt)
+    if jobs and columns:
+        # Compact format: job ref, title, then empty values (read as -1 for numbers)
+        padding = "|" * (int(columns.group(1)) - 2)
+        rows = [f"{ref}|{_fake_extraction(text)['title'].replace('|', ' ')}{padding}" for ref, text in jobs]
+        return "\n".join(rows + ["END"])
+    if jobs:
+        return json.dumps([{"job_ref": int(ref), **_fake_extraction(text)} for ref, text in jobs], ensure_ascii=False)
+    if "job_description:" in prompt:
+        return json.dumps(_fake_extraction(prompt.rsplit("job_description:", 1)[-1]), ensure_ascii=False)
+    # Unknown prompt with job delimiters only: one object per job
+    n_jobs = max(1, prompt.count("### JOB START ###\n"))
+    return json.dumps([copy.deepcopy(EMPTY_EXTRACTION) for _ in range(n_jobs)])
+
+
+def _prompt_text(messages: List[BaseMessage]) -> str:
+    return "\n".join(str(message.content) for message in messages)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline chat model answering instantly and deterministically with `fake_completion`.
+    """
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        content = fake_completion(_prompt_text(messages))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+
+class SimulatedRateLimitError(Exception):
+    """
+    Raised by SimulatedChatModel for an injected or quota-exceeding request, like an HTTP 429.
+    """
+
+
+class SimulatedChatModel(FakeChatModel):
+    """
+    FakeChatModel behaving like a remote API: log-normal time to first token, a fixed generation
+    speed (also when streaming), per-minute request/token quotas and injected 429s or malformed outputs.
+    """
+
+    latency: float = 0.8
+    latency_sigma: float = 0.3
+    tokens_per_second: float = 150.0
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    throttle_rate: float = 0.0
+    malformed_rate: float = 0.0
+    seed: Optional[int] = None
+    latencies: List[float] = Field(default_factory=list)
+    _rng: random.Random = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default=None)
+    _window: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any):
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._window = deque()  # (timestamp, tokens) of the requests of the last minute
+
+    @property
+    def _llm_type(self) -> str:
+        return "simulated"
+
+    def _admit(self, prompt: str):
+        """
+        Apply the quotas and 429 injection to a new request, and draw its latency and fate.
+        """
+        tokens = estimate_tokens(prompt)
+        now = time.monotonic()
+        with self._lock:
+            while self._window and now - self._window[0][0] >= 60:
+                self._window.popleft()
+            over_requests = self.requests_per_minute and len(self._window) + 1 > self.requests_per_minute
+            used_tokens = sum(window_tokens for _, window_tokens in self._window)
+            over_tokens = self.tokens_per_minute and used_tokens + tokens > self.tokens_per_minute
+            if over_requests or over_tokens or self._rng.random() < self.throttle_rate:
+                raise SimulatedRateLimitError("429 Resource has been exhausted (simulated)")
+            self._window.append((now, tokens))
+            first_token = self._rng.lognormvariate(0, self.latency_sigma) * self.latency
+            malformed = self._rng.random() < self.malformed_rate
+            cut = self._rng.random()
+        return first_token, malformed, cut
+
+    def _completion(self, prompt: str, malformed: bool, cut: float) -> str:
+        content = fake_completion(prompt)
+        if malformed:
+            # Truncated output, as when the completion hits its token limit
+            content = content[: int(len(content) * cut)]
+        return content
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        prompt = _prompt_text(messages)
+        first_token, malformed, cut = self._admit(prompt)
+        content = self._completion(prompt, malformed, cut)
+        duration = first_token + estimate_tokens(content) / self.tokens_per_second
+        time.sleep(duration)
+        with self._lock:
+            self.latencies.append(duration)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _stream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any):
+        prompt = _prompt_text(messages)
+        first_token, malformed, cut = self._admit(prompt)
+        content = self._completion(prompt, malformed, cut)
+        start = time.perf_counter()
+        time.sleep(first_token)
+        chunk_size = 64
+        for offset in range(0, len(content), chunk_size):
+            chunk = content[offset : offset + chunk_size]
+            time.sleep(estimate_tokens(chunk) / self.tokens_per_second)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+        with self._lock:
+            self.latencies.append(time.perf_counter() - start)
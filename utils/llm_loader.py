@@ -1,16 +1,131 @@
-def get_llm(model_name: str):
+import os
+from typing import Callable, Dict, Optional, Tuple
+
+# Free-tier (requests per minute, tokens per minute) quotas of the supported models
+MODEL_RATE_LIMITS = {
+    "gemini-2.0-flash": (15, 1_000_000),
+    "gemini-2.0-flash-lite": (30, 1_000_000),
+    "gemini-1.5-flash": (15, 1_000_000),
+}
+
+# Backend factories keyed by the part of the model name before ":"; they receive the part after it
+LLM_BACKENDS: Dict[str, Callable] = {}
+
+
+def register_llm_backend(name: str):
+    """
+    Register a factory `(model, **options) -> BaseChatModel` for model names `name` or `name:<model>`.
+    """
+
+    def decorator(factory: Callable) -> Callable:
+        LLM_BACKENDS[name] = factory
+        return factory
+
+    return decorator
+
+
+@register_llm_backend("gemini-2.0-flash")
+@register_llm_backend("gemini-2.0-flash-lite")
+@register_llm_backend("gemini-1.5-flash")
+def _gemini(model: str, **options):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(model=model, **options)
+
+
+@register_llm_backend("fake")
+def _fake(model: str, **options):
+    from utils.llm_backends import FakeChatModel
+
+    return FakeChatModel(**options)
+
+
+@register_llm_backend("simulated")
+def _simulated(model: str, **options):
+    from utils.llm_backends import SimulatedChatModel
+
+    return SimulatedChatModel(**options)
+
+
+@register_llm_backend("openai-compatible")
+def _openai_compatible(model: str, **options):
+    try:
+        from langchain_openai import ChatOpenAI
+    except ImportError as e:
+        raise ImportError("The openai-compatible backend requires `pip install langchain-openai`") from e
+
+    options.setdefault("base_url", os.getenv("OPENAI_BASE_URL", "http://localhost:8000/v1"))
+    # Local stand-in servers usually ignore the key, but the client requires one
+    options.setdefault("api_key", os.getenv("OPENAI_API_KEY", "not-needed"))
+    return ChatOpenAI(model=model or "default", **options)
+
+
+def get_llm(model_name: str, **options):
     """
     Return an LLM instance based on the model name.
 
+    Supported names are the Gemini models, `fake` (deterministic offline answers), `simulated`
+    (fake answers with API-like latency, quotas and failures) and `openai-compatible:<model>`
+    (a local OpenAI-compatible server at `base_url`, by default `$OPENAI_BASE_URL`).
+
     Args:
-        model_name (str): Name of the LLM to use.
+        model_name (str): Name of the LLM to use, as `<backend>` or `<backend>:<model>`.
+        **options: Keyword arguments passed to the backend's chat model.
 
     Returns:
         BaseLanguageModel: An instance of the selected LLM.
     """
-    if model_name in ["gemini-2.0-flash", "gemini-1.5-flash", "gemini-2.0-flash-lite"]:
-        from langchain_google_genai import ChatGoogleGenerativeAI
+    backend, _, model = model_name.partition(":")
+    if backend not in LLM_BACKENDS:
+        raise ValueError(f"Unsupported LLM model: {model_name} (backends: {', '.join(sorted(LLM_BACKENDS))})")
+    return LLM_BACKENDS[backend](model or backend, **options)
+
+
+def parse_llm_options(options) -> Dict:
+    """
+    Parse `KEY=VALUE` command-line options for `get_llm`, converting numeric and boolean values.
+
+    Args:
+        options (Optional[List[str]]): Options as given on the command line.
+
+    Returns:
+        dict: Keyword arguments for `get_llm`.
+    """
+    parsed = {}
+    for option in options or []:
+        key, sep, value = option.partition("=")
+        if not sep:
+            raise ValueError(f"LLM option must be KEY=VALUE: {option}")
+        key = key.strip().replace("-", "_")
+        if value.lower() in ("true", "false"):
+            parsed[key] = value.lower() == "true"
+            continue
+        for cast in (int, float):
+            try:
+                parsed[key] = cast(value)
+                break
+            except ValueError:
+                continue
+        else:
+            parsed[key] = value
+    return parsed
 
-        return ChatGoogleGenerativeAI(model=model_name)
 
-    raise ValueError(f"Unsupported LLM model: {model_name}")
+def get_rate_limits(
+    model_name: Optional[str], requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None
+) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Return the request and token budgets to use for a model.
+
+    Args:
+        model_name (Optional[str]): Name of the LLM.
+        requests_per_minute (Optional[float]): Override of the model's requests-per-minute quota (0 for unlimited).
+        tokens_per_minute (Optional[float]): Override of the model's tokens-per-minute quota (0 for unlimited).
+
+    Returns:
+        Tuple[Optional[float], Optional[float]]: Requests and tokens per minute, None meaning unlimited.
+    """
+    default_rpm, default_tpm = MODEL_RATE_LIMITS.get(model_name, (None, None))
+    rpm = default_rpm if requests_per_minute is None else requests_per_minute
+    tpm = default_tpm if tokens_per_minute is None else tokens_per_minute
+    return rpm or None, tpm or None
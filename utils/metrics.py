@@ -0,0 +1,152 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterable, Iterator, List, TypeVar
+
+from utils.stats import percentile
+
+T = TypeVar("T")
+
+# Quantiles reported for every timer
+QUANTILES = (0.5, 0.95, 0.99)
+PROMETHEUS_PREFIX = "careerflow"
+
+
+class Metrics:
+    """
+    Thread-safe counters and timers of a pipeline run.
+
+    Counters are integers incremented by name (e.g. `http_requests`); timers keep every observed
+    duration in seconds (e.g. `llm_call`), so that the summary can report percentiles. Components take
+    an optional `metrics` argument and default to `NULL_METRICS`, which records nothing.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.timers: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, n: int = 1):
+        """
+        Increment a counter.
+        """
+        with self._lock:
+            self.counters[name] += n
+
+    def observe(self, name: str, seconds: float):
+        """
+        Record one duration of a timer.
+        """
+        with self._lock:
+            self.timers[name].append(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """
+        Time the enclosed block, also when it raises.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def iter_timed(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """
+        Iterate over `iterable`, timing how long each item takes to arrive: for a pipelined stage, the time
+        its consumer waits for it.
+        """
+        start = time.perf_counter()
+        for item in iterable:
+            self.observe(name, time.perf_counter() - start)
+            yield item
+            start = time.perf_counter()
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Returns:
+            Dict[str, dict]: `counters` by name, and `timers` by name with their count, total, mean,
+            percentiles and maximum, in seconds.
+        """
+        with self._lock:
+            counters = dict(sorted(self.counters.items()))
+            timers = {name: list(values) for name, values in sorted(self.timers.items())}
+        return {
+            "counters": counters,
+            "timers": {
+                name: {
+                    "count": len(values),
+                    "total": round(sum(values), 6),
+                    "mean": round(sum(values) / len(values), 6) if values else 0.0,
+                    **{f"p{round(q * 100)}": round(percentile(values, q), 6) for q in QUANTILES},
+                    "max": round(max(values, default=0.0), 6),
+                }
+                for name, values in timers.items()
+            },
+        }
+
+    def write_json(self, path: str):
+        """
+        Write the summary to a JSON file.
+        """
+        _makedirs_for(path)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def write_prometheus(self, path: str):
+        """
+        Write the summary in the Prometheus text exposition format, e.g. for the node exporter's
+        textfile collector: counters as `<name>_total`, timers as `<name>_seconds` summaries.
+        """
+        summary = self.summary()
+        lines = []
+        for name, value in summary["counters"].items():
+            metric = _prometheus_name(f"{name}_total")
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        for name, stats in summary["timers"].items():
+            metric = _prometheus_name(f"{name}_seconds")
+            lines.append(f"# TYPE {metric} summary")
+            lines += [f'{metric}{{quantile="{q}"}} {stats[f"p{round(q * 100)}"]}' for q in QUANTILES]
+            lines += [f"{metric}_sum {stats['total']}", f"{metric}_count {stats['count']}"]
+        _makedirs_for(path)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+class NullMetrics(Metrics):
+    """
+    Metrics that record nothing, so that instrumentation costs a method call when profiling is off.
+    """
+
+    enabled = False
+
+    def inc(self, name: str, n: int = 1):
+        pass
+
+    def observe(self, name: str, seconds: float):
+        pass
+
+    def timer(self, name: str):
+        return _NULL_TIMER
+
+    def iter_timed(self, name: str, iterable: Iterable[T]) -> Iterable[T]:
+        return iterable
+
+
+_NULL_TIMER = nullcontext()
+NULL_METRICS = NullMetrics()
+
+
+def _prometheus_name(name: str) -> str:
+    return f"{PROMETHEUS_PREFIX}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}"
+
+
+def _makedirs_for(path: str):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
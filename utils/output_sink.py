@@ -0,0 +1,391 @@
+import abc
+import csv
+import io
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Columns of a structured result, i.e. the keys of the extraction schema (the single-job prompt, used as a
+# fallback for jobs a batch could not extract, also asks for the free-text fields after `education`);
+# `raw_job_text` and `matched_queries` are appended when enabled. Tabular files always use this order, `job_id` first
+OUTPUT_COLUMNS = [
+    "job_id",
+    "title",
+    "industry",
+    "employment_type",
+    "employment_contract",
+    "required_experience",
+    "salary",
+    "skills",
+    "education",
+    "job_description",
+    "responsibilities",
+    "benefits",
+    "job_posting_date",
+    "application_deadline",
+]
+
+
+class OutputSink(abc.ABC):
+    """
+    Appends structured results to an output file batch by batch, so that memory does not grow with the
+    number of jobs and an interrupted run keeps everything written so far.
+
+    After each batch the file is fsync'd and a checkpoint (`<path>.checkpoint`: rows and bytes written)
+    is atomically replaced. With `resume`, anything after the last checkpoint (a batch interrupted
+    mid-write) is truncated, and the job IDs already written are skipped, so a resumed run produces the
+    same file as an uninterrupted one.
+    """
+
+    format = ""
+    binary = False
+    # Whether keys outside `columns` are written too; tabular formats drop them with a warning
+    keeps_extra_keys = False
+
+    def __init__(self, path: str, columns: Optional[List[str]] = None, resume: bool = False):
+        """
+        Args:
+            path (str): Output file path.
+            columns (Optional[List[str]]): Columns of tabular formats, `OUTPUT_COLUMNS` by default.
+            resume (bool): Whether to continue the file from its last checkpoint instead of overwriting it.
+        """
+        self.path = path
+        self.columns = list(columns or OUTPUT_COLUMNS)
+        self.checkpoint_path = f"{path}.checkpoint"
+        # File the batches are appended to
+        self.data_path = self._data_path()
+        self.rows = 0
+        self.written_ids = set()
+        self.dropped_keys = set()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        checkpoint = self._read_checkpoint() if resume else None
+        if checkpoint is not None:
+            self.rows = checkpoint["rows"]
+            self.columns = checkpoint["columns"]
+            with open(self.data_path, "r+b") as f:
+                f.truncate(checkpoint["bytes"])
+            self.written_ids = set(self._read_ids())
+            self._file = self._open("a")
+            logger.info(f"Resuming {path} after {self.rows} rows")
+        else:
+            self._file = self._open("w")
+            self._write_header()
+            self._checkpoint()
+
+    def _data_path(self) -> str:
+        return self.path
+
+    def _open(self, mode: str):
+        if self.binary:
+            return open(self.data_path, f"{mode}b")
+        return open(self.data_path, mode, encoding="utf-8", newline="")
+
+    def _read_checkpoint(self) -> Optional[Dict]:
+        if not (os.path.exists(self.checkpoint_path) and os.path.exists(self.data_path)):
+            return None
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("format") != self.format or os.path.getsize(self.data_path) < checkpoint["bytes"]:
+            logger.warning(f"Checkpoint {self.checkpoint_path} does not match {self.data_path}; starting over")
+            return None
+        return checkpoint
+
+    def _checkpoint(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        size = os.fstat(self._file.fileno()).st_size
+        checkpoint = {"format": self.format, "rows": self.rows, "bytes": size, "columns": self.columns}
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def write_batch(self, results: Iterable[Dict]) -> int:
+        """
+        Append results not written yet, then checkpoint.
+
+        Args:
+            results (Iterable[dict]): Structured results, each with a `job_id`.
+
+        Returns:
+            int: Number of results written.
+        """
+        new = [structured for structured in results if str(structured["job_id"]) not in self.written_ids]
+        if not new:
+            return 0
+        if not self.keeps_extra_keys:
+            self._warn_dropped_keys(new)
+        self._file.write(self._encode(new))
+        self.written_ids.update(str(structured["job_id"]) for structured in new)
+        self.rows += len(new)
+        self._checkpoint()
+        return len(new)
+
+    def _warn_dropped_keys(self, results: List[Dict]):
+        columns = set(self.columns)
+        for structured in results:
+            dropped = structured.keys() - columns - self.dropped_keys
+            if dropped:
+                self.dropped_keys.update(dropped)
+                logger.warning(
+                    f"Dropping keys {sorted(dropped)} (first seen for job ID {structured['job_id']}) that are not "
+                    f"columns of {self.path}; use a .jsonl output to keep them"
+                )
+
+    def close(self):
+        """
+        Checkpoint and close the file.
+        """
+        self._checkpoint()
+        self._file.close()
+
+    def _write_header(self):
+        pass
+
+    @abc.abstractmethod
+    def _encode(self, results: List[Dict]):
+        """
+        Serialize a batch of results as the bytes or text appended to the data file.
+        """
+
+    @abc.abstractmethod
+    def _read_ids(self) -> Iterator[str]:
+        """
+        Yield the job IDs of the rows written up to the last checkpoint, for `resume`.
+        """
+
+
+class CsvSink(OutputSink):
+    """
+    CSV output with a fixed header. Nested fields are written as Python literals, as pandas does, so
+    that `evaluation.evaluate.load_data` can read them back.
+    """
+
+    format = "csv"
+
+    def _write_header(self):
+        self._file.write(self._encode_rows([self.columns]))
+
+    def _encode(self, results: List[Dict]) -> str:
+        return self._encode_rows([[_cell(structured.get(column)) for column in self.columns] for structured in results])
+
+    @staticmethod
+    def _encode_rows(rows: List[List]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    def _read_ids(self) -> Iterator[str]:
+        with open(self.path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                yield row["job_id"]
+
+
+class JsonLinesSink(OutputSink):
+    """
+    JSON Lines output: one complete result object per line, nested fields included.
+    """
+
+    format = "jsonl"
+    keeps_extra_keys = True
+
+    def _encode(self, results: List[Dict]) -> str:
+        return "".join(json.dumps(structured, ensure_ascii=False) + "\n" for structured in results)
+
+    def _read_ids(self) -> Iterator[str]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield str(json.loads(line)["job_id"])
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet output requires `pip install pyarrow`") from e
+    return pa, pq
+
+
+def arrow_schema(columns: List[str]):
+    """
+    Arrow schema of the output: nested fields as structs, comma-separated lists as list columns, salary
+    and years as integers (-1 when not specified).
+
+    Args:
+        columns (List[str]): Output columns, e.g. `OUTPUT_COLUMNS`.
+
+    Returns:
+        pyarrow.Schema: Schema with one field per column; unknown columns are strings.
+    """
+    pa, _ = _import_pyarrow()
+    strings = pa.list_(pa.string())
+    types = {
+        "required_experience": pa.struct(
+            [("years", pa.struct([("min", pa.int64()), ("max", pa.int64())])), ("level", pa.string())]
+        ),
+        "salary": pa.struct([("min", pa.int64()), ("max", pa.int64()), ("currency", pa.string())]),
+        "skills": pa.struct(
+            [
+                ("hard_skills", strings),
+                ("soft_skills", strings),
+                ("required_languages", strings),
+                ("nice_to_have", strings),
+            ]
+        ),
+        "education": pa.struct([("degrees", strings), ("fields_of_study", strings)]),
+        "responsibilities": strings,
+        "benefits": strings,
+    }
+    return pa.schema([(column, types.get(column, pa.string())) for column in columns])
+
+
+def _to_arrow_value(value, arrow_type):
+    """
+    Coerce an extracted value to `arrow_type`, with the defaults of the extraction schema for values the
+    LLM left out or returned in another shape.
+    """
+    pa, _ = _import_pyarrow()
+    if pa.types.is_struct(arrow_type):
+        value = value if isinstance(value, dict) else {}
+        return {field.name: _to_arrow_value(value.get(field.name), field.type) for field in arrow_type}
+    if pa.types.is_list(arrow_type):
+        if isinstance(value, list):
+            return [str(item).strip() for item in value if str(item).strip()]
+        # Split the way `evaluation.jd_evaluator.flatten_nested_key` does
+        return [item.strip() for item in str(value or "").split(",") if item.strip()]
+    if pa.types.is_integer(arrow_type):
+        try:
+            return int(round(float(value)))
+        except (TypeError, ValueError):
+            return -1
+    if value is None:
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+class ParquetSink(OutputSink):
+    """
+    Parquet output with native struct and list columns, so that readers load nested fields in one
+    vectorized read instead of parsing a Python literal per cell.
+
+    A Parquet file is only readable once its footer is written, so batches are appended to a staging
+    file (`<path>.batches`, one Arrow IPC message per batch) with the same checkpoints as the text
+    formats, and converted to `path` on `close()`. Resuming a finished file copies it back to staging.
+    """
+
+    format = "parquet"
+    binary = True
+    # Rows per Parquet row group when converting the staging file
+    row_group_size = 10_000
+
+    def __init__(self, path: str, columns: Optional[List[str]] = None, resume: bool = False):
+        self._pa, self._pq = _import_pyarrow()
+        staging_path = f"{path}.batches"
+        if resume and os.path.exists(path) and not os.path.exists(staging_path):
+            self._restage(path, staging_path)
+        super().__init__(path, columns=columns, resume=resume)
+
+    def _data_path(self) -> str:
+        return f"{self.path}.batches"
+
+    @property
+    def schema(self):
+        return arrow_schema(self.columns)
+
+    def _restage(self, path: str, staging_path: str):
+        parquet_file = self._pq.ParquetFile(path)
+        rows = 0
+        with open(staging_path, "wb") as f:
+            for batch in parquet_file.iter_batches(batch_size=self.row_group_size):
+                f.write(batch.serialize().to_pybytes())
+                rows += batch.num_rows
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        checkpoint = {"format": self.format, "rows": rows, "bytes": size, "columns": parquet_file.schema_arrow.names}
+        with open(f"{path}.checkpoint", "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+
+    def _encode(self, results: List[Dict]) -> bytes:
+        schema = self.schema
+        rows = [
+            {field.name: _to_arrow_value(structured.get(field.name), field.type) for field in schema}
+            for structured in results
+        ]
+        return self._pa.RecordBatch.from_pylist(rows, schema=schema).serialize().to_pybytes()
+
+    def _iter_staged_batches(self) -> Iterator:
+        schema = self.schema
+        with self._pa.OSFile(self.data_path, "rb") as f:
+            for message in self._pa.ipc.MessageReader.open_stream(f):
+                yield self._pa.ipc.read_record_batch(message, schema)
+
+    def _read_ids(self) -> Iterator[str]:
+        for batch in self._iter_staged_batches():
+            yield from batch.column("job_id").to_pylist()
+
+    def close(self):
+        """
+        Checkpoint the staging file, then write the Parquet file, one row group per `row_group_size` rows.
+        """
+        super().close()
+        tmp_path = f"{self.path}.tmp"
+        with self._pq.ParquetWriter(tmp_path, self.schema) as writer:
+            pending, pending_rows = [], 0
+            for batch in self._iter_staged_batches():
+                pending.append(batch)
+                pending_rows += batch.num_rows
+                if pending_rows >= self.row_group_size:
+                    writer.write_table(self._pa.Table.from_batches(pending, schema=self.schema))
+                    pending, pending_rows = [], 0
+            if pending:
+                writer.write_table(self._pa.Table.from_batches(pending, schema=self.schema))
+        os.replace(tmp_path, self.path)
+        os.remove(self.data_path)
+        os.remove(self.checkpoint_path)
+
+
+def read_parquet_table(path):
+    """
+    Read a Parquet output written by `ParquetSink`.
+
+    Args:
+        path: File path or file-like object.
+
+    Returns:
+        pyarrow.Table: Results with their nested struct and list columns.
+    """
+    _, pq = _import_pyarrow()
+    return pq.read_table(path)
+
+
+def _cell(value):
+    return "" if value is None else value
+
+
+OUTPUT_SINKS = {"csv": CsvSink, "jsonl": JsonLinesSink, "parquet": ParquetSink}
+
+
+def open_output_sink(
+    path: str, columns: Optional[List[str]] = None, resume: bool = False, file_format: Optional[str] = None
+) -> OutputSink:
+    """
+    Open the sink of `file_format`, by default the one matching the extension of `path`: `.jsonl`/`.ndjson`
+    for JSON Lines, `.parquet` for Parquet, CSV otherwise.
+    """
+    if file_format is None:
+        file_format = {".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}.get(
+            os.path.splitext(path)[1].lower(), "csv"
+        )
+    if file_format not in OUTPUT_SINKS:
+        raise ValueError(f"Unknown output file format: {file_format!r} (expected one of {sorted(OUTPUT_SINKS)})")
+    return OUTPUT_SINKS[file_format](path, columns=columns, resume=resume)
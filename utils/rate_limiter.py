@@ -0,0 +1,196 @@
+import email.utils
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a `Retry-After` header given either in seconds or as an HTTP date.
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the value is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Callers reserve tokens
+    up-front and sleep outside the lock, so concurrent callers are served in arrival order
+    and a request larger than the bucket simply waits longer instead of deadlocking.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate (float): Refill rate in tokens per second.
+            capacity (Optional[float]): Maximum burst size. Defaults to max(1, rate).
+        """
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Reserve tokens, blocking until they are available.
+
+        Args:
+            tokens (float): Number of tokens to consume.
+
+        Returns:
+            float: Time spent waiting, in seconds.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def set_rate(self, rate: float):
+        """
+        Change the refill rate, keeping tokens accrued so far.
+
+        Args:
+            rate (float): New refill rate in tokens per second.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+
+class HostRateLimiter:
+    """
+    Keeps one shared TokenBucket per host so that all workers hitting the same host
+    are throttled together, whatever URL path they request.
+
+    The rate of a host can be adapted at runtime (AIMD): `slow_down` cuts it multiplicatively when
+    the server throttles us, and `speed_up` restores it additively on success, up to the configured rate.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        increase_step: Optional[float] = None,
+    ):
+        """
+        Args:
+            rate (float): Requests per second allowed for each host.
+            capacity (Optional[float]): Burst size for each host bucket.
+            min_rate (Optional[float]): Lowest rate `slow_down` can reach. Defaults to rate / 20.
+            decrease_factor (float): Multiplier applied to the rate by `slow_down`.
+            increase_step (Optional[float]): Rate added back by `speed_up`. Defaults to rate / 20.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate if min_rate is not None else rate / 20
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step if increase_step is not None else rate / 20
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        """
+        Return the bucket for the host of `url`, creating it on first use.
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.capacity)
+            return self._buckets[host]
+
+    def acquire(self, url: str) -> float:
+        """
+        Block until a request to the host of `url` is allowed.
+
+        Returns:
+            float: Time spent waiting, in seconds.
+        """
+        return self.bucket(url).acquire()
+
+    def slow_down(self, url: str):
+        """
+        Multiplicatively decrease the rate of the host of `url`, e.g. after a 429 response.
+        """
+        bucket = self.bucket(url)
+        new_rate = max(self.min_rate, bucket.rate * self.decrease_factor)
+        if new_rate < bucket.rate:
+            logger.warning(f"Throttled by {urlsplit(url).netloc}; slowing down to {new_rate:.2f} requests/s")
+            bucket.set_rate(new_rate)
+
+    def speed_up(self, url: str):
+        """
+        Additively increase the rate of the host of `url` back towards the configured rate.
+        """
+        bucket = self.bucket(url)
+        if bucket.rate < self.rate:
+            bucket.set_rate(min(self.rate, bucket.rate + self.increase_step))
+
+
+class LLMRateLimiter:
+    """
+    Enforces requests-per-minute and tokens-per-minute budgets of an LLM API across threads.
+
+    Each budget is a TokenBucket refilled continuously with a burst of a tenth of the minute's budget,
+    so concurrent calls are spread out instead of exhausting the quota in the first seconds.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        """
+        Args:
+            requests_per_minute (Optional[float]): Maximum requests per minute, unlimited if None.
+            tokens_per_minute (Optional[float]): Maximum (estimated) tokens per minute, unlimited if None.
+        """
+        self.requests = self._bucket(requests_per_minute)
+        self.tokens = self._bucket(tokens_per_minute)
+
+    @staticmethod
+    def _bucket(per_minute: Optional[float]) -> Optional[TokenBucket]:
+        if not per_minute:
+            return None
+        return TokenBucket(per_minute / 60, capacity=max(1.0, per_minute / 10))
+
+    def acquire(self, tokens: float, requests: int = 1) -> float:
+        """
+        Block until `requests` calls totalling `tokens` tokens fit in the budgets.
+
+        Args:
+            tokens (float): Estimated tokens of the calls.
+            requests (int): Number of calls.
+
+        Returns:
+            float: Time spent waiting, in seconds.
+        """
+        waited = self.requests.acquire(requests) if self.requests else 0.0
+        if self.tokens:
+            waited += self.tokens.acquire(tokens)
+        return waited
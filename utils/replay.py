@@ -0,0 +1,258 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, List, Optional
+
+import requests
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field, PrivateAttr
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from utils.llm_backends import fake_completion
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+RECORDED_HEADERS = ("Content-Type", "Retry-After")
+# Pipeline options that shape the LLM prompts, saved next to recorded fixtures
+RUN_OPTIONS_FILE = "run_options.json"
+
+
+def _fixture_path(fixture_dir: str, kind: str, key: str) -> str:
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(fixture_dir, kind, f"{digest}.json")
+
+
+def _write_fixture(path: str, payload: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_fixture(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _simulate_latency(rng: random.Random, latency: float, jitter: float) -> float:
+    delay = max(0.0, rng.gauss(latency, jitter)) if jitter else latency
+    if delay:
+        time.sleep(delay)
+    return delay
+
+
+def prompt_key(messages: List[BaseMessage]) -> str:
+    """
+    Stable key of a chat prompt, used to name LLM fixtures.
+    """
+    return json.dumps([(message.type, message.content) for message in messages], ensure_ascii=False)
+
+
+def save_run_options(fixture_dir: str, options: dict):
+    """
+    Store the pipeline options a recording was made with. Prompts batch several jobs together, so a replay
+    only finds its completions when it batches (and compacts) the jobs the same way.
+    """
+    os.makedirs(fixture_dir, exist_ok=True)
+    _write_fixture(os.path.join(fixture_dir, RUN_OPTIONS_FILE), options)
+
+
+def load_run_options(fixture_dir: str) -> dict:
+    """
+    Returns:
+        dict: Pipeline options saved by `save_run_options`, or an empty dict for older recordings.
+    """
+    return _read_fixture(os.path.join(fixture_dir, RUN_OPTIONS_FILE)) or {}
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+
+
+def save_http_fixture(fixture_dir: str, url: str, status: int, body: str, headers: Optional[dict] = None):
+    """
+    Store the response served for a URL.
+
+    Args:
+        fixture_dir (str): Fixture root directory.
+        url (str): Requested URL, including its query string.
+        status (int): HTTP status code.
+        body (str): Decoded response body.
+        headers (Optional[dict]): Response headers to keep.
+    """
+    payload = {"url": url, "status": status, "headers": headers or {}, "body": body}
+    _write_fixture(_fixture_path(fixture_dir, "http", url), payload)
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    Transport adapter that performs real requests and saves every successful (or 4xx, except 429)
+    response under `<fixture_dir>/http/`.
+    """
+
+    def __init__(self, fixture_dir: str, **kwargs):
+        super().__init__(**kwargs)
+        self.fixture_dir = fixture_dir
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if response.status_code < 500 and response.status_code != 429:
+            headers = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+            save_http_fixture(self.fixture_dir, request.url, response.status_code, response.text, headers)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Transport adapter serving recorded responses without touching the network.
+
+    Adds a simulated latency to every response and can inject 503 and 429 errors at configurable
+    rates. URLs without a fixture get a 404.
+    """
+
+    def __init__(
+        self,
+        fixture_dir: str,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            fixture_dir (str): Fixture root directory.
+            latency (float): Mean simulated latency per response, in seconds.
+            latency_jitter (float): Standard deviation of the simulated latency, in seconds.
+            error_rate (float): Probability of answering 503 instead of the fixture.
+            throttle_rate (float): Probability of answering 429 instead of the fixture.
+            seed (Optional[int]): Random seed for latency and error injection.
+        """
+        super().__init__()
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            roll = self._rng.random()
+            delay_rng = random.Random(self._rng.random())
+        _simulate_latency(delay_rng, self.latency, self.latency_jitter)
+
+        if roll < self.error_rate:
+            return self._build_response(request, 503, "", {})
+        if roll < self.error_rate + self.throttle_rate:
+            return self._build_response(request, 429, "", {"Retry-After": "0"})
+        fixture = _read_fixture(_fixture_path(self.fixture_dir, "http", request.url))
+        if fixture is None:
+            logger.warning(f"No HTTP fixture for {request.url}")
+            return self._build_response(request, 404, "", {})
+        return self._build_response(request, fixture["status"], fixture["body"], fixture["headers"])
+
+    @staticmethod
+    def _build_response(request, status: int, body: str, headers: dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response._content = body.encode("utf-8")
+        response.encoding = "utf-8"
+        response.headers = CaseInsensitiveDict(headers)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# LLM
+# ---------------------------------------------------------------------------
+
+
+def save_llm_fixture(fixture_dir: str, messages: List[BaseMessage], content: str):
+    """
+    Store the completion returned for a chat prompt.
+    """
+    key = prompt_key(messages)
+    _write_fixture(_fixture_path(fixture_dir, "llm", key), {"prompt": key, "content": content})
+
+
+class RecordingChatModel(BaseChatModel):
+    """
+    Chat model wrapper that forwards calls to `inner` and saves each completion under `<fixture_dir>/llm/`.
+    """
+
+    inner: BaseChatModel
+    fixture_dir: str
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording"
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        message = self.inner.invoke(messages, stop=stop, **kwargs)
+        save_llm_fixture(self.fixture_dir, messages, message.content)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Chat model serving recorded completions, with simulated latency and error injection.
+
+    With `synthesize_missing`, prompts without a fixture are answered by `fake_completion`, which is
+    enough to exercise the pipeline on synthetic fixtures.
+    """
+
+    fixture_dir: str
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+    synthesize_missing: bool = False
+    latencies: List[float] = Field(default_factory=list)
+    _rng: random.Random = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any):
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        with self._lock:
+            roll = self._rng.random()
+            delay_rng = random.Random(self._rng.random())
+        start = time.perf_counter()
+        _simulate_latency(delay_rng, self.latency, self.latency_jitter)
+        with self._lock:
+            self.latencies.append(time.perf_counter() - start)
+        if roll < self.error_rate:
+            raise RuntimeError("Injected LLM error")
+
+        key = prompt_key(messages)
+        fixture = _read_fixture(_fixture_path(self.fixture_dir, "llm", key))
+        if fixture is not None:
+            content = fixture["content"]
+        elif self.synthesize_missing:
+            content = fake_completion("".join(str(message.content) for message in messages))
+        else:
+            raise KeyError(f"No LLM fixture for prompt in {self.fixture_dir} (prompt starts with {key[:80]!r})")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
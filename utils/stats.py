@@ -0,0 +1,18 @@
+from typing import Sequence
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile of a sequence of values.
+
+    Args:
+        values (Sequence[float]): Observed values, in any order.
+        q (float): Quantile between 0 and 1 (e.g., 0.95).
+
+    Returns:
+        float: The percentile, or 0.0 if there are no values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
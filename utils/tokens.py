@@ -0,0 +1,17 @@
+import math
+
+# Rough average for English and French prose with Gemini/GPT-style tokenizers
+CHARS_PER_TOKEN = 4.0
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text without calling a tokenizer.
+
+    Args:
+        text (str): Text to measure.
+
+    Returns:
+        int: Estimated token count.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)